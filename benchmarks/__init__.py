@@ -0,0 +1,14 @@
+"""
+Бенчмарки репозиториев и сервисов.
+
+Запускаются из корня проекта как модули:
+
+    python -m benchmarks.bench_statement_cache
+"""
+
+import sys
+
+from pathlib import Path
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,101 @@
+"""
+Кэш оценок по содержимому ответа: доля попаданий и сэкономленное время LLM.
+
+Генерирует --answers ответов на --questions вопросов: --duplicates доля -
+типовые ответы ("не знаю", скопированные определения) с разным регистром,
+пробелами и точкой в конце, остальные уникальны. Оценка без кэша - запрос
+к LLM длительностью --latency-ms (моделируется через asyncio.sleep). Выводит
+время прогона, долю попаданий, сэкономленные секунды LLM и стоимость
+вычисления ключа.
+
+    python -m benchmarks.bench_assessment_cache [--duplicates 0.3]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from app.apps.interview.entity.ai_assessment import get_assessment_key, get_score
+from app.apps.interview.utils.assessment_cache import AssessmentCache
+
+
+TYPICAL = [
+    "не знаю",
+    "Не помню",
+    "GIL - глобальная блокировка интерпретатора, которая позволяет только "
+    "одному потоку выполнять байт-код Python в каждый момент времени",
+    "Декоратор - это функция, которая принимает функцию и возвращает новую "
+    "функцию, расширяя ее поведение",
+]
+PROMPT = "Оцени ответ на вопрос собеседования"
+
+
+def vary(text: str, rng: random.Random) -> str:
+    """Типовой ответ с другим регистром, пробелами и знаком в конце"""
+    text = rng.choice([text, text.upper(), text.capitalize()])
+    return "  " * rng.randrange(2) + text + rng.choice(["", ".", "!", " ", "..."])
+
+
+def make_answers(answers: int, questions: int, duplicates: float, seed: int = 1):
+    rng = random.Random(seed)
+    result = []
+    for i in range(answers):
+        question_id = rng.randrange(questions)
+        if rng.random() < duplicates:
+            text = vary(rng.choice(TYPICAL), rng)
+        else:
+            text = f"Уникальный ответ номер {i}: " + "слово " * rng.randrange(5, 50)
+        result.append((question_id, text))
+    return result
+
+
+async def assess(answers, latency: float, cache: AssessmentCache | None) -> float:
+    """Оценивает ответы по одному, возвращает время прогона в секундах"""
+    start = time.perf_counter()
+    for question_id, text in answers:
+        key = get_assessment_key(question_id, text, PROMPT, 0.7, -1)
+        if cache is not None and cache.get(key):
+            continue
+        llm_start = time.perf_counter()
+        await asyncio.sleep(latency)
+        assessment = "Оценка 7/10"
+        if cache is not None:
+            cache.set(
+                key, assessment, get_score(assessment), time.perf_counter() - llm_start
+            )
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--answers", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--duplicates", type=float, default=0.3)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--maxsize", type=int, default=10000)
+    args = parser.parse_args()
+
+    answers = make_answers(args.answers, args.questions, args.duplicates)
+    latency = args.latency_ms / 1000
+
+    start = time.perf_counter()
+    for question_id, text in answers:
+        get_assessment_key(question_id, text, PROMPT, 0.7, -1)
+    key_us = (time.perf_counter() - start) / len(answers) * 1e6
+
+    print(f"{'client':>9} {'time, s':>8} {'hit rate':>9} {'saved LLM, s':>13}")
+    elapsed = await assess(answers, latency, None)
+    print(f"{'no cache':>9} {elapsed:>8.2f} {0:>9.1%} {0:>13.2f}")
+    cache = AssessmentCache(maxsize=args.maxsize)
+    elapsed = await assess(answers, latency, cache)
+    snapshot = cache.snapshot()
+    print(
+        f"{'cache':>9} {elapsed:>8.2f} {snapshot['hit_rate']:>9.1%} "
+        f"{snapshot['saved_llm_seconds']:>13.2f}"
+    )
+    print(f"key: {key_us:.1f} us per answer, cached assessments: {snapshot['size']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
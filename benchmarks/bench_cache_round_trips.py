@@ -0,0 +1,113 @@
+"""
+Обращения к Redis и задержка QuestionUseCase.get_question_training.
+
+Выполняет --steps запросов вопроса одним пользователем через настоящий
+QuestionUseCase (PostgreSQL из config.db и Redis из config.redis) в двух
+вариантах кэша:
+
+- separate: пользователь, стек и последний вопрос читаются тремя
+  отдельными GET, как до Cache.get_user_context;
+- context: Cache.get_user_context читает их одним обращением по tg_id.
+
+Число обращений считается по отправленным в Redis пакетам, --latency-ms
+добавляет задержку сети к каждому из них. Первый запрос (пользователя еще
+нет в кэше) выводится отдельно.
+
+    python -m benchmarks.bench_cache_round_trips [--steps 200] [--latency-ms 1]
+"""
+
+import argparse
+import asyncio
+import time
+
+from redis.asyncio.connection import AbstractConnection
+
+from app.apps.interview.entity.question import QuestionEntity
+from app.apps.interview.repository.question import SAQuestionRepoV2
+from app.apps.interview.repository.question_cache import RedisQuestionRepo
+from app.apps.interview.repository.user_question import SAUserQuestionRepoV2
+from app.apps.interview.usecase.question import QuestionUseCase
+from app.apps.user.repository.user import SAUserRepositoryV2
+from app.tools.cache import Cache, UserContext, user_id_key, user_key
+from benchmarks.database import seed_questions, temporary_database
+
+
+round_trips = 0
+
+
+def count_round_trips(latency: float):
+    send_packed_command = AbstractConnection.send_packed_command
+
+    async def send(self, command, check_health=True):
+        global round_trips
+        round_trips += 1
+        if latency:
+            await asyncio.sleep(latency)
+        return await send_packed_command(self, command, check_health)
+
+    AbstractConnection.send_packed_command = send
+
+
+class SeparateReadsCache(Cache):
+    """Cache, который читает контекст пользователя тремя обращениями"""
+
+    async def get_user_context(self, tg_id: int) -> UserContext:
+        user = await self.get_user(user_key(tg_id))
+        if user is None:
+            return UserContext(None, None, None)
+        return UserContext(
+            user=user,
+            stack=await self.get_stack(user.id),
+            last_question=await self.get_user_last_question(user.id),
+        )
+
+
+async def measure(step, steps: int) -> tuple[float, float]:
+    """Возвращает обращения к Redis и среднюю задержку в мс на шаг"""
+    global round_trips
+    round_trips = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        await step()
+    elapsed = (time.perf_counter() - start) * 1000
+    return round_trips / steps, elapsed / steps
+
+
+async def bench(name: str, cache: Cache, steps: int, questions: int):
+    async with temporary_database() as db:
+        await seed_questions(db, questions, answered=0)
+        use_case = QuestionUseCase(
+            question_entity=QuestionEntity,
+            cache_service=cache,
+            user_repo=SAUserRepositoryV2(db),
+            question_repo=SAQuestionRepoV2(db),
+            question_cache_repo=RedisQuestionRepo(cache),
+            user_question_repo=SAUserQuestionRepoV2(db),
+        )
+
+        async def step():
+            await use_case.get_question_training(user_tg_id=1)
+
+        await cache.delete(user_key(1), user_id_key(1))
+        for request, count in (("first", 1), ("next", steps)):
+            trips, latency = await measure(step, count)
+            print(f"{name:10} {request:8} {trips:12.1f} {latency:12.3f}")
+        await cache.delete(user_key(1), user_id_key(1))
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+    count_round_trips(args.latency_ms / 1000)
+
+    print(f"steps={args.steps} latency={args.latency_ms} ms")
+    print(f"{'cache':10} {'request':8} {'round trips':>12} {'latency, ms':>12}")
+    await bench("separate", SeparateReadsCache(), args.steps, args.questions)
+    await bench("context", Cache(), args.steps, args.questions)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""
+Скорость кодирования UserDto для кэша и размер записи.
+
+Сравнивает прежний путь Cache.set_user/get_user (model_dump, strftime,
+json.dumps / json.loads, model_validate) с VersionedCodec поверх
+JsonSerializer и CompactSerializer. Redis не нужен.
+
+    python -m benchmarks.bench_cache_serializer [--number 50000]
+"""
+
+import argparse
+import json
+import timeit
+
+from datetime import datetime
+from uuid import uuid4
+
+from app.apps.user.dto.user import UserDto
+from app.tools.serializer import CompactSerializer, JsonSerializer, VersionedCodec
+
+
+def legacy_dumps(user: UserDto) -> bytes:
+    user_dict = user.model_dump(mode="json")
+    user_dict["created_at"] = user.created_at.strftime("%Y-%m-%d %H:%M:%S")
+    user_dict["updated_at"] = user.updated_at.strftime("%Y-%m-%d %H:%M:%S")
+    if user.subscription:
+        user_dict["subscription"] = user.subscription.strftime("%Y-%m-%d %H:%M:%S")
+    return json.dumps(user_dict).encode()
+
+
+def legacy_loads(data: bytes, dto: type[UserDto]) -> UserDto:
+    return dto.model_validate(json.loads(data))
+
+
+def measure(func, number: int) -> float:
+    """Возвращает число вызовов в секунду"""
+    return number / timeit.timeit(func, number=number)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=50000)
+    args = parser.parse_args()
+
+    user = UserDto(
+        id=uuid4(),
+        tg_id=1234567890,
+        tg_url="https://t.me/username",
+        first_name="Иван",
+        last_name="Петров",
+        tg_username="username",
+        coins=100,
+        is_active=True,
+        is_admin=False,
+        subscription=datetime(2026, 1, 1),
+        created_at=datetime(2025, 1, 1),
+        updated_at=datetime(2025, 1, 1),
+    )
+    codecs = {
+        "legacy json": (legacy_dumps, legacy_loads),
+        "json codec": VersionedCodec(JsonSerializer()),
+        "compact codec": VersionedCodec(CompactSerializer()),
+    }
+
+    print(f"{'codec':15} {'encode/s':>10} {'decode/s':>10} {'bytes':>6}")
+    for name, codec in codecs.items():
+        dumps, loads = codec if isinstance(codec, tuple) else (codec.dumps, codec.loads)
+        data = dumps(user)
+        assert loads(data, UserDto) == user
+        encode = measure(lambda dumps=dumps: dumps(user), args.number)
+        decode = measure(
+            lambda loads=loads, data=data: loads(data, UserDto), args.number
+        )
+        print(f"{name:15} {encode:10.0f} {decode:10.0f} {len(data):6}")
+
+
+if __name__ == "__main__":
+    main()
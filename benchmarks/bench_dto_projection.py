@@ -0,0 +1,58 @@
+"""
+Загрузка ORM-объектов против выборки колонок при запросе DTO.
+
+Сравнивает чтение ответов через QueryWrapper.filter() с последующим
+AnswerDto.model_validate (полная загрузка объектов в сессию) и
+QueryWrapper.filter(dto=AnswerDto), который выбирает только колонки DTO.
+Нужен запущенный PostgreSQL из config.db.
+
+    python -m benchmarks.bench_dto_projection [--rows 10000]
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.apps.interview.dto.answer import AnswerDto
+from app.tools.repository.sql_alchemy.sql_alchemy_v2 import SARepository
+from benchmarks.database import seed_answers, temporary_database
+from model import Answer
+
+
+async def measure(coro_factory, repeat: int) -> float:
+    """Возвращает медианное время вызова в миллисекундах"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await coro_factory()
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    async with temporary_database() as db:
+        await seed_answers(db, args.rows)
+        repo = SARepository(db)
+
+        async def orm():
+            answers = await repo.query(Answer).filter(limit=args.rows)
+            return [AnswerDto.model_validate(answer) for answer in answers]
+
+        async def projection():
+            return await repo.query(Answer).filter(dto=AnswerDto, limit=args.rows)
+
+        orm_ms = await measure(orm, args.repeat)
+        projection_ms = await measure(projection, args.repeat)
+        print(f"rows={args.rows}")
+        print(f"{'orm + model_validate, ms':>26} {orm_ms:10.2f}")
+        print(f"{'projection, ms':>26} {projection_ms:10.2f}")
+        print(f"{'speedup':>26} {orm_ms / projection_ms:10.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
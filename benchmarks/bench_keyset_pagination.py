@@ -0,0 +1,73 @@
+"""
+OFFSET против keyset-пагинации на таблице answer.
+
+Для нескольких позиций в таблице измеряет время получения страницы через
+QueryWrapper.filter(limit, offset) и QueryWrapper.paginate(after=cursor).
+Нужен запущенный PostgreSQL из config.db.
+
+    python -m benchmarks.bench_keyset_pagination [--rows 1000000]
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.tools.repository.sql_alchemy.sql_alchemy_v2 import (
+    KeysetCursor,
+    SARepository,
+)
+from benchmarks.database import seed_answers, temporary_database
+from model import Answer
+
+
+async def measure(coro_factory, repeat: int) -> float:
+    """Возвращает медианное время вызова в миллисекундах"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await coro_factory()
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    async with temporary_database() as db:
+        await seed_answers(db, args.rows)
+        repo = SARepository(db)
+        print(f"rows={args.rows} page_size={args.page_size}")
+        print(f"{'position':>10} {'offset, ms':>11} {'keyset, ms':>11}")
+        for share in (0, 0.01, 0.1, 0.5, 0.99):
+            position = int(args.rows * share)
+            cursor = None
+            if position:
+                previous = await repo.query(Answer).filter(
+                    order_by=[Answer.created_at, Answer.id],
+                    limit=1,
+                    offset=position - 1,
+                )
+                cursor = KeysetCursor.encode([previous[0].created_at, previous[0].id])
+            offset_ms = await measure(
+                lambda position=position: repo.query(Answer).filter(
+                    order_by=[Answer.created_at, Answer.id],
+                    limit=args.page_size,
+                    offset=position,
+                ),
+                args.repeat,
+            )
+            keyset_ms = await measure(
+                lambda cursor=cursor: repo.query(Answer).paginate(
+                    after=cursor, page_size=args.page_size
+                ),
+                args.repeat,
+            )
+            print(f"{position:>10} {offset_ms:11.2f} {keyset_ms:11.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,154 @@
+"""
+Нагрузка на клиент сервиса LLM: сессия на запрос против пула соединений.
+
+Запускает в отдельном процессе заглушку сервиса LLM (aiohttp, ответ через
+--latency-ms) и отправляет --requests оценок при 50/200/500 одновременных
+запросах: прежним способом (новая ClientSession, то есть новое
+TCP-соединение, на каждый запрос) и через RequestService с пулом
+keep-alive соединений. Выводит пропускную способность, p50/p99 задержки и
+число TCP-соединений, по которым заглушка получила запросы. С TLS разница больше: каждое
+новое соединение платит еще и за рукопожатие.
+
+    python -m benchmarks.bench_llm_client [--concurrency 50 200 500]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import time
+
+import aiohttp
+
+from aiohttp import web
+
+from app.apps.interview.utils.request_service import RequestService
+
+
+RESPONSE = {"choices": [{"message": {"content": "Оценка 7/10"}}]}
+DATA = {"messages": [{"role": "user", "content": "answer"}], "stream": False}
+
+
+def run_stub(port: int, latency: float, ready):
+    peers = set()
+
+    async def handler(request: web.Request) -> web.Response:
+        peers.add(request.transport.get_extra_info("peername"))
+        await request.read()
+        await asyncio.sleep(latency)
+        return web.json_response(RESPONSE)
+
+    async def stats(request: web.Request) -> web.Response:
+        connections = len(peers)
+        peers.clear()
+        return web.json_response({"connections": connections})
+
+    async def serve():
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", handler)
+        app.router.add_get("/stats", stats)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port, backlog=4096).start()
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+async def send_per_call(url: str) -> dict | None:
+    """Прежняя реализация RequestService.send_request_llm"""
+    async with (
+        aiohttp.ClientSession() as session,
+        session.post(
+            url, json=DATA, headers={"Content-Type": "application/json"}
+        ) as response,
+    ):
+        return await response.json()
+
+
+async def load(send, requests: int, concurrency: int) -> tuple[float, float, float]:
+    """Возвращает запросов в секунду, p50 и p99 в мс"""
+    timings = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await send()
+            timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(requests)])
+    elapsed = time.perf_counter() - start
+    timings.sort()
+    return (
+        requests / elapsed,
+        timings[len(timings) // 2],
+        timings[int(len(timings) * 0.99) - 1],
+    )
+
+
+async def connections(base_url: str) -> int:
+    """Число соединений, по которым заглушка получила запросы с прошлого вызова"""
+    async with (
+        aiohttp.ClientSession() as session,
+        session.get(f"{base_url}/stats") as response,
+    ):
+        return (await response.json())["connections"]
+
+
+async def bench(
+    url: str, base_url: str, requests: int, concurrency: int, limit: int
+) -> list[tuple[str, float, float, float, int]]:
+    async with RequestService(url, limit=limit, limit_per_host=limit) as service:
+        clients = [
+            ("per-call", lambda: send_per_call(url)),
+            ("pooled", lambda: service.send_request_llm(DATA)),
+        ]
+        results = []
+        for name, send in clients:
+            await connections(base_url)
+            rps, p50, p99 = await load(send, requests, concurrency)
+            results.append((name, rps, p50, p99, await connections(base_url)))
+        return results
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--limit", type=int, default=500, help="размер пула")
+    args = parser.parse_args()
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    ready = multiprocessing.Event()
+    stub = multiprocessing.Process(
+        target=run_stub, args=(port, args.latency_ms / 1000, ready), daemon=True
+    )
+    stub.start()
+    ready.wait(10)
+    base_url = f"http://127.0.0.1:{port}"
+    url = f"{base_url}/v1/chat/completions"
+
+    print(
+        f"{'concurrency':>11} {'client':>9} {'req/s':>8} "
+        f"{'p50, ms':>8} {'p99, ms':>8} {'tcp conns':>10}"
+    )
+    try:
+        for concurrency in args.concurrency:
+            results = await bench(url, base_url, args.requests, concurrency, args.limit)
+            for name, rps, p50, p99, opened in results:
+                print(
+                    f"{concurrency:>11} {name:>9} {rps:>8.0f} "
+                    f"{p50:>8.1f} {p99:>8.1f} {opened:>10}"
+                )
+    finally:
+        stub.terminate()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+"""
+Клиент сервиса LLM при сбоях: без повторов и выключателя против RequestService
+с повторами, бюджетом запроса и выключателем.
+
+Запускает в отдельном процессе заглушку сервиса LLM, которая отвечает за
+--latency-ms и с заданной вероятностью возвращает 503 (тоже через
+--latency-ms, как перегруженный сервис). Два сценария по --requests
+запросов при --concurrency одновременных: кратковременные сбои
+(--error-rate) и недоступный сервис (все ответы 503). Выводит долю
+успешных ответов, p50/p99 задержки и число запросов, дошедших до сервиса.
+
+    python -m benchmarks.bench_llm_resilience [--error-rate 0.2]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import random
+import socket
+import time
+
+import aiohttp
+
+from aiohttp import web
+
+from app.apps.interview.utils.circuit_breaker import CircuitBreaker
+from app.apps.interview.utils.request_service import RequestService
+
+
+RESPONSE = {"choices": [{"message": {"content": "Оценка 7/10"}}]}
+DATA = {"messages": [{"role": "user", "content": "answer"}], "stream": False}
+
+
+def run_stub(port: int, latency: float, ready):
+    state = {"error_rate": 0.0, "received": 0}
+
+    async def handler(request: web.Request) -> web.Response:
+        state["received"] += 1
+        await request.read()
+        await asyncio.sleep(latency)
+        if random.random() < state["error_rate"]:
+            return web.json_response({"error": "overloaded"}, status=503)
+        return web.json_response(RESPONSE)
+
+    async def configure(request: web.Request) -> web.Response:
+        received = state["received"]
+        state.update(error_rate=(await request.json())["error_rate"], received=0)
+        return web.json_response({"received": received})
+
+    async def serve():
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", handler)
+        app.router.add_post("/configure", configure)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port, backlog=4096).start()
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+async def configure(base_url: str, error_rate: float) -> int:
+    """Задает долю ошибок, возвращает число запросов с прошлого вызова"""
+    async with (
+        aiohttp.ClientSession() as session,
+        session.post(f"{base_url}/configure", json={"error_rate": error_rate}) as r,
+    ):
+        return (await r.json())["received"]
+
+
+async def load(service: RequestService, requests: int, concurrency: int):
+    """Возвращает долю успешных ответов, p50 и p99 в мс"""
+    timings = []
+    ok = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal ok
+        async with semaphore:
+            start = time.perf_counter()
+            if await service.send_request_llm(DATA) is not None:
+                ok += 1
+            timings.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*[one() for _ in range(requests)])
+    timings.sort()
+    return ok / requests, timings[len(timings) // 2], timings[int(requests * 0.99) - 1]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    ready = multiprocessing.Event()
+    stub = multiprocessing.Process(
+        target=run_stub, args=(port, args.latency_ms / 1000, ready), daemon=True
+    )
+    stub.start()
+    ready.wait(10)
+    base_url = f"http://127.0.0.1:{port}"
+    url = f"{base_url}/v1/chat/completions"
+
+    clients = {
+        # выключатель с недостижимым порогом никогда не открывается
+        "plain": lambda: RequestService(
+            url, retries=0, breaker=CircuitBreaker(failure_threshold=10**9)
+        ),
+        "resilient": lambda: RequestService(
+            url, retries=2, backoff=0.05, breaker=CircuitBreaker(recovery_timeout=1)
+        ),
+    }
+    print(
+        f"{'scenario':>9} {'client':>10} {'ok':>6} {'p50, ms':>8} "
+        f"{'p99, ms':>8} {'sent':>6}"
+    )
+    try:
+        for scenario, error_rate in (("flaky", args.error_rate), ("down", 1.0)):
+            for name, make in clients.items():
+                await configure(base_url, error_rate)
+                async with make() as service:
+                    ok, p50, p99 = await load(service, args.requests, args.concurrency)
+                sent = await configure(base_url, 0)
+                print(
+                    f"{scenario:>9} {name:>10} {ok:>6.1%} {p50:>8.1f} "
+                    f"{p99:>8.1f} {sent:>6}"
+                )
+    finally:
+        stub.terminate()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,128 @@
+"""
+Всплеск оценок ответов: запросы к LLM без ограничения против AssessmentScheduler.
+
+Сервис LLM моделируется в процессе: он обрабатывает запросы с разделением
+времени, поэтому при N одновременных запросах сверх --capacity каждый
+выполняется в N / capacity раз дольше. Всплеск из --requests запросов
+приходит за --burst-ms: --subscribed доля запросов от пользователей с
+подпиской, --heavy доля от одного пользователя, отправившего пачку
+ответов, остальные от разных пользователей. Выводит p50/p99 задержки
+по группам и метрики планировщика.
+
+    python -m benchmarks.bench_llm_scheduler [--requests 2000] [--capacity 16]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from app.apps.interview.entity.ai_assessment import Priority
+from app.apps.interview.utils.scheduler import AssessmentQueueFull, AssessmentScheduler
+
+
+class SimulatedLLM:
+    """Сервис LLM, время ответа которого растет с числом запросов"""
+
+    def __init__(self, capacity: int, latency: float):
+        self._capacity = capacity
+        self._latency = latency
+        self.inflight = 0
+        self.peak = 0
+
+    async def send_request_llm(self, data: dict, **kwargs) -> dict | None:
+        self.inflight += 1
+        self.peak = max(self.peak, self.inflight)
+        try:
+            done = 0.0
+            # каждые 10 мс запрос получает долю сервиса capacity / inflight
+            while done < self._latency:
+                await asyncio.sleep(0.01)
+                done += 0.01 * min(1.0, self._capacity / self.inflight)
+        finally:
+            self.inflight -= 1
+        return {"choices": [{"message": {"content": "Оценка 7/10"}}]}
+
+    async def close(self):
+        pass
+
+
+def make_burst(requests: int, subscribed: float, heavy: float, seed: int):
+    """Запросы всплеска: (группа, пользователь, приоритет)"""
+    rng = random.Random(seed)
+    burst = []
+    for i in range(requests):
+        roll = rng.random()
+        if roll < subscribed:
+            burst.append(("subscribed", f"s{i}", Priority.SUBSCRIBED))
+        elif roll < subscribed + heavy:
+            burst.append(("heavy", "heavy", Priority.DEFAULT))
+        else:
+            burst.append(("default", f"d{i}", Priority.DEFAULT))
+    return burst
+
+
+async def run(service, burst, burst_ms: float) -> dict[str, list[float]]:
+    timings: dict[str, list[float]] = {"rejected": []}
+
+    async def one(delay, group, user_id, priority):
+        await asyncio.sleep(delay)
+        start = time.perf_counter()
+        try:
+            await service.send_request_llm({}, user_id=user_id, priority=priority)
+        except AssessmentQueueFull:
+            timings["rejected"].append(0)
+            return
+        timings.setdefault(group, []).append((time.perf_counter() - start) * 1000)
+
+    step = burst_ms / 1000 / len(burst)
+    await asyncio.gather(*[one(i * step, *request) for i, request in enumerate(burst)])
+    return timings
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)] if values else 0.0
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--capacity", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--burst-ms", type=float, default=500)
+    parser.add_argument("--subscribed", type=float, default=0.1)
+    parser.add_argument("--heavy", type=float, default=0.3)
+    parser.add_argument("--max-queue", type=int, default=5000)
+    args = parser.parse_args()
+
+    burst = make_burst(args.requests, args.subscribed, args.heavy, seed=1)
+    print(
+        f"{'client':>10} {'group':>11} {'count':>6} {'p50, ms':>9} "
+        f"{'p99, ms':>9} {'peak':>5}"
+    )
+    for name in ("unbounded", "scheduler"):
+        llm = SimulatedLLM(args.capacity, args.latency_ms / 1000)
+        service = llm
+        if name == "scheduler":
+            service = AssessmentScheduler(
+                llm, max_concurrency=args.capacity, max_queue=args.max_queue
+            )
+        timings = await run(service, burst, args.burst_ms)
+        for group in ("subscribed", "default", "heavy", "rejected"):
+            values = timings.get(group, [])
+            print(
+                f"{name:>10} {group:>11} {len(values):>6} "
+                f"{percentile(values, 0.5):>9.0f} {percentile(values, 0.99):>9.0f} "
+                f"{llm.peak:>5}"
+            )
+        if name == "scheduler":
+            wait = service.snapshot()["wait_ms"]
+            print(
+                "wait in queue p99, ms: "
+                + ", ".join(f"{key} {value['p99']:.0f}" for key, value in wait.items())
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+"""
+Время до первого текста оценки: полный ответ LLM против потокового.
+
+Запускает в отдельном процессе заглушку сервиса LLM, которая генерирует
+--tokens частей ответа с задержкой --token-ms на каждую, и измеряет время
+до первого текста (TTFT) и до конца ответа для
+RequestService.send_request_llm (ответ целиком) и stream_request_llm
+(SSE) при --concurrency одновременных оценках.
+
+    python -m benchmarks.bench_llm_streaming [--tokens 50 200] [--token-ms 20]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import socket
+import time
+
+from aiohttp import web
+
+from app.apps.interview.entity.ai_assessment import extract_delta_from_llm_chunk
+from app.apps.interview.utils.request_service import RequestService
+
+
+def run_stub(port: int, token_delay: float, ready):
+    async def handler(request: web.Request) -> web.StreamResponse:
+        data = await request.json()
+        tokens = data["max_tokens"]
+        if not data["stream"]:
+            await asyncio.sleep(tokens * token_delay)
+            content = " token" * tokens
+            return web.json_response({"choices": [{"message": {"content": content}}]})
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for _ in range(tokens):
+            await asyncio.sleep(token_delay)
+            chunk = {"choices": [{"delta": {"content": " token"}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    async def serve():
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", handler)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port, backlog=4096).start()
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+async def full(service: RequestService, tokens: int) -> tuple[float, float]:
+    start = time.perf_counter()
+    await service.send_request_llm({"max_tokens": tokens, "stream": False})
+    elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, elapsed
+
+
+async def streamed(service: RequestService, tokens: int) -> tuple[float, float]:
+    start = time.perf_counter()
+    first = None
+    async for chunk in service.stream_request_llm({"max_tokens": tokens}):
+        if first is None and extract_delta_from_llm_chunk(chunk):
+            first = (time.perf_counter() - start) * 1000
+    return first, (time.perf_counter() - start) * 1000
+
+
+def p(values: list[float], quantile: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * quantile), len(values) - 1)]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--token-ms", type=float, default=20)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    ready = multiprocessing.Event()
+    stub = multiprocessing.Process(
+        target=run_stub, args=(port, args.token_ms / 1000, ready), daemon=True
+    )
+    stub.start()
+    ready.wait(10)
+
+    print(
+        f"{'tokens':>6} {'mode':>8} {'ttft p50':>9} {'ttft p99':>9} "
+        f"{'total p50':>10} {'total p99':>10}"
+    )
+    try:
+        async with RequestService(
+            f"http://127.0.0.1:{port}/v1/chat/completions", limit=args.concurrency
+        ) as service:
+            for tokens in args.tokens:
+                for name, request in [("full", full), ("stream", streamed)]:
+                    results = await asyncio.gather(
+                        *[request(service, tokens) for _ in range(args.concurrency)]
+                    )
+                    ttft = [first for first, _ in results]
+                    total = [elapsed for _, elapsed in results]
+                    print(
+                        f"{tokens:>6} {name:>8} {p(ttft, 0.5):>9.0f} "
+                        f"{p(ttft, 0.99):>9.0f} {p(total, 0.5):>10.0f} "
+                        f"{p(total, 0.99):>10.0f}"
+                    )
+    finally:
+        stub.terminate()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+Выбор случайного вопроса для тренировки: в Python, ORDER BY random() и
+TABLESAMPLE.
+
+Сравнивает три способа:
+
+- python: get_questions_for_user + random.choice, в Python загружаются все
+  вопросы-кандидаты;
+- order by: ORDER BY answered, random() LIMIT k по всему стеку в
+  PostgreSQL - возвращается одна строка, но сортируются все кандидаты;
+- tablesample: sample_question_for_user, выборка TABLESAMPLE SYSTEM
+  примерно из SAQuestionRepoV2.sample_rows строк с запасным путем по
+  всему стеку в том же запросе.
+
+Пользователь ответил на долю --answered вопросов. Время первых двух
+способов растет с размером каталога, третьего почти не зависит от него.
+Если способ не укладывается в --timeout секунд, вместо времени выводится
+timeout. Нужен запущенный PostgreSQL из config.db.
+
+    python -m benchmarks.bench_question_sampling [--sizes 1000 100000 1000000]
+"""
+
+import argparse
+import asyncio
+import random
+
+from sqlalchemy import func, select
+
+from app.apps.interview.dto.question import QuestionDto
+from app.apps.interview.repository.question import SAQuestionRepoV2
+from benchmarks.bench_dto_projection import measure
+from benchmarks.database import seed_questions, temporary_database
+from model import Question, QuestionTechnology, Technology, User, UserQuestion
+
+
+METHODS = ("python", "order by", "tablesample")
+
+
+async def order_by_random(repo: SAQuestionRepoV2, user_id, technologies, k=1):
+    """Прежняя реализация sample_question_for_user: сортировка всего стека"""
+    stack = (
+        select(QuestionTechnology.question_id)
+        .join(Technology, QuestionTechnology.technology_id == Technology.id)
+        .where(Technology.name.in_(technologies))
+    )
+    answered = (
+        select(UserQuestion.question_id)
+        .where(UserQuestion.user_id == user_id)
+        .distinct()
+        .subquery()
+    )
+    columns = [getattr(Question, field) for field in QuestionDto.model_fields]
+    query = (
+        select(*columns)
+        .outerjoin(answered, answered.c.question_id == Question.id)
+        .where(Question.id.in_(stack), Question.published == True)
+        .order_by(answered.c.question_id.is_not(None), func.random())
+        .limit(k)
+    )
+    result = await repo.execute(query)
+    return [QuestionDto.model_validate(row._mapping) for row in result.all()]
+
+
+async def bench(
+    size: int, answered: float, repeat: int, timeout: float
+) -> dict[str, float | None]:
+    async with temporary_database() as db:
+        await seed_questions(db, size, answered)
+        repo = SAQuestionRepoV2(db)
+        user = await repo.query(User).find(tg_id=1)
+
+        async def in_python():
+            questions = await repo.get_questions_for_user(user.id, ["python"])
+            return random.choice(questions)
+
+        async def order_by():
+            [question] = await order_by_random(repo, user.id, ["python"])
+            return question
+
+        async def sample():
+            [question] = await repo.sample_question_for_user(user.id, ["python"])
+            return question
+
+        methods = {"python": in_python, "order by": order_by, "tablesample": sample}
+        timings = {}
+        for name, method in methods.items():
+            try:
+                timings[name] = await asyncio.wait_for(measure(method, repeat), timeout)
+            except TimeoutError:
+                timings[name] = None
+        return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--answered", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60, help="секунд на способ")
+    args = parser.parse_args()
+
+    print(f"{'questions':>10}" + "".join(f"{name + ', ms':>17}" for name in METHODS))
+    for size in args.sizes:
+        timings = await bench(size, args.answered, args.repeat, args.timeout)
+        print(
+            f"{size:>10}"
+            + "".join(
+                f"{'timeout':>17}" if ms is None else f"{ms:17.2f}"
+                for ms in timings.values()
+            )
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+Планирование повторений SM-2: пересчет очередей и выбор вопроса.
+
+Моделирует --users пользователей, каждый ответил на --answers вопросов со
+случайными оценками в течение --days дней, и измеряет:
+
+- пересчет состояний всех пользователей проигрыванием истории оценок
+  (как ReviewUseCase.reschedule без Redis);
+- выбор ближайшего по сроку вопроса пользователя с --catalog вопросами в
+  очереди: просмотр всех состояний (O(n)) против кучи (O(log n), как
+  ZRANGE 0 0 по sorted set в Redis).
+
+База и Redis не нужны.
+
+    python -m benchmarks.bench_review_scheduler [--users 100000]
+"""
+
+import argparse
+import heapq
+import random
+import time
+
+from app.apps.interview.entity.review import DAY, replay, review
+
+
+def simulate(
+    users: int, answers: int, days: int, rng: random.Random
+) -> list[list[tuple[int, float]]]:
+    """Истории оценок (оценка, время) пар пользователь-вопрос"""
+    histories = []
+    for _ in range(users * answers // 3):
+        times = sorted(rng.uniform(0, days * DAY) for _ in range(3))
+        histories.append([(rng.randint(1, 10), answered_at) for answered_at in times])
+    return histories
+
+
+def pick_scan(states: dict[int, float], steps: int, rng: random.Random) -> float:
+    start = time.perf_counter()
+    for _ in range(steps):
+        question_id = min(states, key=states.__getitem__)
+        states[question_id] = review(None, rng.randint(1, 10), states[question_id]).due
+    return (time.perf_counter() - start) * 1e6 / steps
+
+
+def pick_heap(states: dict[int, float], steps: int, rng: random.Random) -> float:
+    queue = [(due, question_id) for question_id, due in states.items()]
+    heapq.heapify(queue)
+    start = time.perf_counter()
+    for _ in range(steps):
+        due, question_id = queue[0]
+        due = review(None, rng.randint(1, 10), due).due
+        heapq.heapreplace(queue, (due, question_id))
+    return (time.perf_counter() - start) * 1e6 / steps
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--answers", type=int, default=30, help="ответов на user")
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--catalog", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    histories = simulate(args.users, args.answers, args.days, rng)
+    start = time.perf_counter()
+    states = [replay(history) for history in histories]
+    elapsed = time.perf_counter() - start
+    reviews = sum(len(history) for history in histories)
+    now = args.days * DAY
+    due = sum(state.due <= now for state in states)
+    print(
+        f"reschedule: {args.users} users, {reviews} reviews in {elapsed:.2f} s "
+        f"({reviews / elapsed:,.0f} reviews/s), due now {due / len(states):.1%}"
+    )
+
+    print(f"{'catalog':>8} {'scan, us':>10} {'heap, us':>10} {'speedup':>8}")
+    for size in args.catalog:
+        catalog = {question_id: rng.uniform(0, now) for question_id in range(size)}
+        scan_us = pick_scan(dict(catalog), args.steps, random.Random(args.seed))
+        heap_us = pick_heap(dict(catalog), args.steps, random.Random(args.seed))
+        print(f"{size:>8} {scan_us:>10.1f} {heap_us:>10.1f} {scan_us / heap_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Стоимость построения запроса BaseRepository на один вызов.
+
+Сравнивает get_statement (запрос строится заново) и get_cached_statement
+(форма берется из statement_cache, меняются только параметры).
+База данных не нужна.
+
+    python -m benchmarks.bench_statement_cache [--number 20000]
+"""
+
+import argparse
+import timeit
+
+from app.tools.repository.sql_alchemy.sql_alchemy_v2 import BaseRepository, F
+from model import Answer, Question, User
+
+
+def make_repo(model) -> BaseRepository:
+    repo = BaseRepository(session=None)  # type: ignore
+    repo.model = model
+    return repo
+
+
+CASES = {
+    "find(tg_id=...)": (make_repo(User), lambda i: {"tg_id": i}),
+    "filter(user_id, question_id__in, limit)": (
+        make_repo(Answer),
+        lambda i: {
+            "user_id": "6f1b0c1e-0000-4000-8000-000000000000",
+            "question_id__in": [i, i + 1, i + 2],
+            "limit": 10,
+        },
+    ),
+    "filter(F | F, excludes)": (
+        make_repo(Question),
+        lambda i: {
+            "expressions": F(complexity__gte=i % 9, published=True)
+            | F(text__ilike=str(i)),
+            "excludes": {Question.id: i},
+        },
+    ),
+}
+
+
+def measure(build, kwargs, number: int) -> float:
+    """Возвращает среднее время вызова в микросекундах"""
+    counter = iter(range(10**9))
+    total = timeit.timeit(lambda: build(**kwargs(next(counter))), number=number)
+    return total / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'case':45} {'build, us':>10} {'cached, us':>11} {'speedup':>8}")
+    for name, (repo, kwargs) in CASES.items():
+        build_us = measure(repo.get_statement, kwargs, args.number)
+        cached_us = measure(repo.get_cached_statement, kwargs, args.number)
+        print(
+            f"{name:45} {build_us:10.1f} {cached_us:11.1f} {build_us / cached_us:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Выбор вопроса с весом по сложности: проход по списку DTO против таблицы
+псевдонимов.
+
+Сравнивает random.choices по списку QuestionDto с весами, посчитанными
+для каждого вопроса при каждом выборе, и QuestionSampler.sample (таблица
+псевдонимов по корзинам технология/сложность, O(1) на выбор). Отдельно
+выводится время построения корзин и точечного обновления после
+публикации одного вопроса. База и Redis не нужны.
+
+    python -m benchmarks.bench_weighted_sampling [--sizes 1000 100000 1000000]
+"""
+
+import argparse
+import random
+import time
+
+from datetime import datetime
+
+from app.apps.interview.dto.question import QuestionDto
+from app.apps.interview.entity.question import QuestionSampler
+
+
+def median_ms(func, repeat: int) -> float:
+    """Возвращает медианное время вызова в миллисекундах"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def bench(size: int, repeat: int, rng: random.Random) -> tuple[float, ...]:
+    now = datetime.now()
+    questions = [
+        QuestionDto.model_construct(
+            id=question_id,
+            text="",
+            complexity=rng.randint(1, 9),
+            published=True,
+            created_at=now,
+            updated_at=now,
+        )
+        for question_id in range(1, size + 1)
+    ]
+    sampler = QuestionSampler()
+    weights = sampler.weights(target=7)
+
+    def linear():
+        return random.choices(
+            questions, weights=[weights[question.complexity] for question in questions]
+        )[0]
+
+    start = time.perf_counter()
+    sampler.load(
+        ["python"],
+        (("python", question.complexity, question.id) for question in questions),
+    )
+    load_ms = (time.perf_counter() - start) * 1000
+
+    def update():
+        sampler.update([size + 1], [("python", 7, size + 1)])
+        sampler.sample(["python"], 7)
+
+    linear_ms = median_ms(linear, repeat)
+    alias_ms = median_ms(lambda: sampler.sample(["python"], 7), repeat)
+    return linear_ms, alias_ms, load_ms, median_ms(update, repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=21)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    print(
+        f"{'questions':>10} {'linear, ms':>11} {'alias, ms':>10} "
+        f"{'speedup':>9} {'load, ms':>9} {'update, ms':>11}"
+    )
+    for size in args.sizes:
+        linear_ms, alias_ms, load_ms, update_ms = bench(size, args.repeat, rng)
+        print(
+            f"{size:>10} {linear_ms:>11.3f} {alias_ms:>10.4f} "
+            f"{linear_ms / alias_ms:>8.0f}x {load_ms:>9.1f} {update_ms:>11.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Временная база данных для бенчмарков.
+
+Создает отдельную базу на сервере из config.db, схему по метаданным моделей
+и удаляет базу после завершения.
+"""
+
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.config import config
+from core.database import DatabaseHelper
+from model.base import Base
+
+
+@asynccontextmanager
+async def temporary_database() -> AsyncGenerator[DatabaseHelper, None]:
+    name = f"bench_db_{uuid4().hex[:5]}"
+    admin = create_async_engine(config.db.url(), isolation_level="AUTOCOMMIT")
+    async with admin.connect() as conn:
+        await conn.execute(text(f'CREATE DATABASE "{name}"'))
+    db = DatabaseHelper(url=config.db.url(db_name=name))
+    try:
+        async with db.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        yield db
+    finally:
+        await db.dispose()
+        async with admin.connect() as conn:
+            await conn.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+        await admin.dispose()
+
+
+async def execute(db: DatabaseHelper, sql: str, **params) -> None:
+    async with db.engine.begin() as conn:
+        await conn.execute(text(sql), params)
+
+
+async def seed_answers(db: DatabaseHelper, rows: int) -> None:
+    """Создает пользователя, вопрос и rows ответов с возрастающим created_at"""
+    await execute(
+        db,
+        """
+        INSERT INTO "user" (id, tg_id, tg_url, first_name, coins, is_active,
+                            is_admin, created_at, updated_at)
+        VALUES (gen_random_uuid(), 1, 'url', 'bench', 0, true, false, now(), now())
+        """,
+    )
+    await execute(
+        db,
+        """
+        INSERT INTO question (text, complexity, published, created_at, updated_at)
+        VALUES ('bench', 5, true, now(), now())
+        """,
+    )
+    await execute(
+        db,
+        """
+        INSERT INTO answer (text, user_id, question_id, score, created_at, updated_at)
+        SELECT 'answer ' || i, (SELECT id FROM "user" LIMIT 1),
+               (SELECT id FROM question LIMIT 1), i % 10 + 1,
+               timestamp '2025-01-01' + i * interval '1 second',
+               timestamp '2025-01-01' + i * interval '1 second'
+        FROM generate_series(1, :rows) AS i
+        """,
+        rows=rows,
+    )
+    await execute(db, "ANALYZE answer")
+
+
+async def seed_questions(db: DatabaseHelper, rows: int, answered: float) -> None:
+    """
+    Создает пользователя, технологию python и rows опубликованных вопросов
+    по ней, из которых пользователь ответил на долю answered
+    """
+    await execute(
+        db,
+        """
+        INSERT INTO "user" (id, tg_id, tg_url, first_name, coins, is_active,
+                            is_admin, created_at, updated_at)
+        VALUES (gen_random_uuid(), 1, 'url', 'bench', 0, true, false, now(), now())
+        """,
+    )
+    await execute(
+        db,
+        """
+        INSERT INTO technology (name, created_at, updated_at)
+        VALUES ('python', now(), now())
+        """,
+    )
+    await execute(
+        db,
+        """
+        INSERT INTO question (id, text, complexity, published, created_at, updated_at)
+        SELECT i, 'question ' || i, i % 9 + 1, true, now(), now()
+        FROM generate_series(1, :rows) AS i
+        """,
+        rows=rows,
+    )
+    await execute(
+        db,
+        """
+        INSERT INTO question_technology (question_id, technology_id, created_at,
+                                         updated_at)
+        SELECT id, (SELECT id FROM technology LIMIT 1), now(), now() FROM question
+        """,
+    )
+    await execute(
+        db,
+        """
+        INSERT INTO user_question (user_id, question_id, created_at, updated_at)
+        SELECT (SELECT id FROM "user" LIMIT 1), id, now(), now()
+        FROM question WHERE id <= :answered
+        """,
+        answered=int(rows * answered),
+    )
+    for table in ("technology", "question", "question_technology", "user_question"):
+        await execute(db, f"ANALYZE {table}")
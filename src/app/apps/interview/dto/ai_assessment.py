@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import NamedTuple
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
@@ -15,3 +16,10 @@ class AIAssessmentDTO(BaseModel):
     score: int
     created_at: datetime
     updated_at: datetime
+
+
+class AIAssessmentChunk(NamedTuple):
+    """Часть потоковой оценки, у последней части - сохраненная оценка"""
+
+    text: str
+    assessment: AIAssessmentDTO | None = None
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import NamedTuple
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
@@ -14,3 +15,12 @@ class AnswerDto(BaseModel):
     score: int
     created_at: datetime
     updated_at: datetime
+
+
+class AnswerScore(NamedTuple):
+    """Оценка ответа для планирования повторений"""
+
+    user_id: UUID
+    question_id: int
+    score: int
+    answered_at: datetime
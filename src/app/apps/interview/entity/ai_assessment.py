@@ -1,6 +1,29 @@
+import hashlib
+import unicodedata
+
+from datetime import UTC, datetime
+from enum import IntEnum
+
+from app.apps.user.dto.user import UserDto
 from tools.sentry import sentry_message
 
 
+class Priority(IntEnum):
+    """Класс приоритета запроса оценки, меньшее значение обслуживается раньше"""
+
+    SUBSCRIBED = 0
+    DEFAULT = 1
+
+
+def get_priority(user: UserDto, now: datetime | None = None) -> Priority:
+    """Возвращает класс приоритета: пользователи с действующей подпиской первые"""
+    if user.subscription is None:
+        return Priority.DEFAULT
+    if now is None:
+        now = datetime.now(UTC) if user.subscription.tzinfo else datetime.now()
+    return Priority.SUBSCRIBED if user.subscription > now else Priority.DEFAULT
+
+
 def extract_text_from_llm_response(response: dict) -> str | None:
     """Извлекает текст из ответа LLM"""
     try:
@@ -15,27 +38,32 @@ def extract_text_from_llm_response(response: dict) -> str | None:
     return text
 
 
+def extract_delta_from_llm_chunk(chunk: dict) -> str:
+    """
+    Извлекает приращение текста из события потокового ответа LLM.
+
+    Для обычного (не потокового) ответа возвращает весь текст сообщения.
+    """
+    try:
+        choice = chunk["choices"][0]
+    except (KeyError, IndexError, TypeError):
+        return ""
+    message = choice.get("delta") or choice.get("message") or {}
+    return message.get("content") or ""
+
+
+_MARKDOWN_ESCAPES = str.maketrans({char: "\\" + char for char in "_*[]()~>#+-=|{}.!"})
+
+
 def normalize_text_to_markdown(text: str) -> str:
-    text = (
-        text.replace("_", r"\_")
-        .replace("*", r"\*")
-        .replace("[", r"\[")
-        .replace("]", r"\]")
-        .replace("(", r"\(")
-        .replace(")", r"\)")
-        .replace("~", r"\~")
-        .replace(">", r"\>")
-        .replace("#", r"\#")
-        .replace("+", r"\+")
-        .replace("-", r"\-")
-        .replace("=", r"\=")
-        .replace("|", r"\|")
-        .replace("{", r"\{")
-        .replace("}", r"\}")
-        .replace(".", r"\.")
-        .replace("!", r"\!")
-    )
-    return text
+    """
+    Экранирует спецсимволы Markdown.
+
+    Каждый символ экранируется независимо от соседних, поэтому потоковый
+    ответ можно экранировать по частям - результат совпадает с
+    экранированием всего текста.
+    """
+    return text.translate(_MARKDOWN_ESCAPES)
 
 
 def get_score(text: str) -> int:
@@ -45,3 +73,35 @@ def get_score(text: str) -> int:
         if score_num.isdigit():
             return int(score_num)
     return 1
+
+
+def normalize_answer(text: str) -> str:
+    """
+    Приводит текст ответа к виду для сравнения одинаковых ответов.
+
+    Регистр, ё/е, формы символов Unicode, пробелы и знаки препинания в
+    конце текста не учитываются. Знаки внутри текста сохраняются: в коде
+    они меняют смысл ответа.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold().replace("ё", "е")
+    return " ".join(text.split()).rstrip(" .,;!?…")
+
+
+def get_assessment_key(
+    question_id: int,
+    answer_text: str,
+    system_prompt: str,
+    temperature: float,
+    max_tokens: int,
+) -> str:
+    """Ключ кэша оценки: хеш вопроса, нормализованного ответа и параметров LLM"""
+    content = "\0".join(
+        [
+            str(question_id),
+            normalize_answer(answer_text),
+            system_prompt,
+            repr(float(temperature)),
+            str(max_tokens),
+        ]
+    )
+    return f"assessment:{hashlib.sha256(content.encode()).hexdigest()}"
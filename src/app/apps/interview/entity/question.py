@@ -1,19 +1,219 @@
+import math
 import random
+import time
 
+from collections.abc import Iterable, Sequence
 from typing import Protocol
 
 from app.apps.interview.dto.question import QuestionDto
+from app.tools.alias import AliasTable
+
+
+MIN_COMPLEXITY = 1
+MAX_COMPLEXITY = 9
+DEFAULT_COMPLEXITY = 5
+# Максимальная оценка ответа (AIAssessment.score)
+MAX_SCORE = 10
+# Разброс сложности вокруг целевой: вес падает в e^0.5 раз на каждый шаг
+COMPLEXITY_SPREAD = 1.5
+
+Bucket = tuple[str, int]
+
+
+class QuestionSampler:
+    """
+    Выбор вопросов с весом по сложности через таблицы псевдонимов.
+
+    Опубликованные вопросы хранятся корзинами (технология, сложность).
+    Для стека и целевой сложности строится таблица псевдонимов по
+    корзинам с весом "вес сложности * размер корзины", затем вопрос
+    берется из корзины по случайному индексу - выбор за O(1) без
+    сортировки и прохода по списку вопросов.
+
+    Таблицы строятся лениво и хранятся до изменения корзин их технологий.
+    Изменения вопросов применяются точечно: измененные id отмечаются
+    через mark_changed, а update заменяет только их записи в корзинах.
+    Технологии перечитываются целиком раз в ttl секунд, чтобы подхватить
+    изменения, сделанные другими процессами.
+    """
+
+    def __init__(self, ttl: float = 60 * 10, spread: float = COMPLEXITY_SPREAD):
+        self._ttl = ttl
+        self._spread = spread
+        self._buckets: dict[Bucket, list[int]] = {}
+        self._positions: dict[Bucket, dict[int, int]] = {}
+        self._question_buckets: dict[int, set[Bucket]] = {}
+        self._loaded_at: dict[str, float] = {}
+        self._tables: dict[tuple[tuple[str, ...], int], tuple[AliasTable, list]] = {}
+        self.pending: set[int] = set()
+
+    def missing(self, technologies: Iterable[str]) -> list[str]:
+        """Технологии, которые не загружены или загружены больше ttl назад"""
+        now = time.monotonic()
+        return sorted(
+            technology
+            for technology in set(technologies)
+            if now - self._loaded_at.get(technology, -math.inf) > self._ttl
+        )
+
+    def load(
+        self, technologies: Iterable[str], rows: Iterable[tuple[str, int, int]]
+    ) -> None:
+        """Заменяет корзины технологий строками (технология, сложность, id)"""
+        technologies = set(technologies)
+        for bucket in [bucket for bucket in self._buckets if bucket[0] in technologies]:
+            for question_id in self._buckets.pop(bucket):
+                self._question_buckets[question_id].discard(bucket)
+            del self._positions[bucket]
+        for technology, complexity, question_id in rows:
+            self._add(technology, complexity, question_id)
+        now = time.monotonic()
+        for technology in technologies:
+            self._loaded_at[technology] = now
+        self._drop_tables(technologies)
+
+    def mark_changed(self, question_ids: Iterable[int]) -> None:
+        """Отмечает вопросы, записи которых нужно перечитать"""
+        self.pending.update(question_ids)
+
+    def update(
+        self, question_ids: Iterable[int], rows: Iterable[tuple[str, int, int]]
+    ) -> None:
+        """
+        Заменяет записи вопросов строками (технология, сложность, id).
+
+        Вопросы без строк (сняты с публикации или удалены) убираются из
+        корзин. Строки незагруженных технологий пропускаются - они будут
+        прочитаны целиком при загрузке технологии.
+        """
+        question_ids = set(question_ids)
+        changed = set()
+        for question_id in question_ids:
+            for bucket in self._question_buckets.pop(question_id, set()):
+                self._remove(bucket, question_id)
+                changed.add(bucket[0])
+        for technology, complexity, question_id in rows:
+            if question_id in question_ids and technology in self._loaded_at:
+                self._add(technology, complexity, question_id)
+                changed.add(technology)
+        self.pending -= question_ids
+        self._drop_tables(changed)
+
+    def sample(
+        self,
+        technologies: Iterable[str],
+        target: int,
+        k: int = 1,
+        rng: random.Random | None = None,
+    ) -> list[int]:
+        """
+        Возвращает k случайных вопросов стека с весом по сложности.
+
+        Вопросы выбираются независимо, поэтому могут повторяться. Если
+        у стека нет вопросов, возвращается пустой список.
+        """
+        technologies = tuple(sorted(set(technologies)))
+        entry = self._get_table(technologies, target)
+        if entry is None:
+            return []
+        table, buckets = entry
+        rng = rng or random
+        question_ids = []
+        for _ in range(k):
+            bucket = buckets[table.sample(rng)]
+            question_ids.append(bucket[rng.randrange(len(bucket))])
+        return question_ids
+
+    def weights(self, target: int) -> dict[int, float]:
+        """Веса сложностей вокруг целевой сложности"""
+        return {
+            complexity: math.exp(-(((complexity - target) / self._spread) ** 2) / 2)
+            for complexity in range(MIN_COMPLEXITY, MAX_COMPLEXITY + 1)
+        }
+
+    def _get_table(
+        self, technologies: tuple[str, ...], target: int
+    ) -> tuple[AliasTable, list[list[int]]] | None:
+        key = (technologies, target)
+        entry = self._tables.get(key)
+        if entry is None:
+            weights = self.weights(target)
+            buckets = [
+                (bucket, questions)
+                for bucket, questions in self._buckets.items()
+                if bucket[0] in technologies and questions
+            ]
+            if not buckets:
+                return None
+            table = AliasTable(
+                [
+                    weights[complexity] * len(questions)
+                    for (_, complexity), questions in buckets
+                ]
+            )
+            entry = self._tables[key] = (table, [questions for _, questions in buckets])
+        return entry
+
+    def _drop_tables(self, technologies: Iterable[str]) -> None:
+        technologies = set(technologies)
+        for key in [key for key in self._tables if technologies.intersection(key[0])]:
+            del self._tables[key]
+
+    def _add(self, technology: str, complexity: int, question_id: int) -> None:
+        complexity = min(max(complexity, MIN_COMPLEXITY), MAX_COMPLEXITY)
+        bucket = (technology, complexity)
+        positions = self._positions.setdefault(bucket, {})
+        if question_id in positions:
+            return
+        questions = self._buckets.setdefault(bucket, [])
+        positions[question_id] = len(questions)
+        questions.append(question_id)
+        self._question_buckets.setdefault(question_id, set()).add(bucket)
+
+    def _remove(self, bucket: Bucket, question_id: int) -> None:
+        """Удаляет вопрос из корзины за O(1): на его место встает последний"""
+        questions, positions = self._buckets[bucket], self._positions[bucket]
+        position = positions.pop(question_id)
+        last = questions.pop()
+        if last != question_id:
+            questions[position] = last
+            positions[last] = position
 
 
 class QuestionProtocol(Protocol):
+    sampler: QuestionSampler
+
     def get_random_question(self, questions: list[QuestionDto]) -> QuestionDto | None:
         """Возвращает случайный вопрос"""
         pass
 
+    def get_target_complexity(self, scores: Sequence[int]) -> int:
+        """Возвращает целевую сложность вопроса по последним оценкам"""
+        pass
+
 
 class QuestionEntity:
+    sampler = QuestionSampler()
+
     @staticmethod
     def get_random_question(questions: list[QuestionDto]) -> QuestionDto | None:
         """Возвращает случайный вопрос"""
         question = random.choice(questions) if questions else None
         return question
+
+    @staticmethod
+    def get_target_complexity(scores: Sequence[int]) -> int:
+        """
+        Возвращает целевую сложность вопроса по последним оценкам.
+
+        Средняя оценка 1-10 переводится в сложность 1-9, без оценок -
+        сложность по умолчанию.
+        """
+        if not scores:
+            return DEFAULT_COMPLEXITY
+        average = sum(scores) / len(scores)
+        complexity = round(
+            MIN_COMPLEXITY
+            + (average - 1) * (MAX_COMPLEXITY - MIN_COMPLEXITY) / (MAX_SCORE - 1)
+        )
+        return min(max(complexity, MIN_COMPLEXITY), MAX_COMPLEXITY)
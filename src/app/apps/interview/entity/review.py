@@ -0,0 +1,71 @@
+from collections.abc import Iterable
+from typing import NamedTuple
+
+
+DAY = 60 * 60 * 24
+MIN_EASINESS = 1.3
+# Максимальная оценка ответа (AIAssessment.score, "Оценка N/10")
+MAX_SCORE = 10
+
+
+class ReviewState(NamedTuple):
+    """Состояние повторения вопроса пользователем по алгоритму SM-2"""
+
+    repetitions: int = 0
+    interval: float = 0
+    easiness: float = 2.5
+    due: float = 0
+
+    def dumps(self) -> str:
+        """Строка для хранения в кэше, срок повторения хранится отдельно"""
+        return f"{self.repetitions}:{self.interval:g}:{self.easiness:.4g}"
+
+    @classmethod
+    def loads(cls, value: str | bytes, due: float = 0) -> "ReviewState":
+        if isinstance(value, bytes):
+            value = value.decode()
+        repetitions, interval, easiness = value.split(":")
+        return cls(int(repetitions), float(interval), float(easiness), due)
+
+
+def quality_from_score(score: int) -> int:
+    """Переводит оценку 1-10 в качество ответа SM-2 от 0 до 5"""
+    score = min(max(score, 1), MAX_SCORE)
+    return round((score - 1) * 5 / (MAX_SCORE - 1))
+
+
+def review(state: ReviewState | None, score: int, answered_at: float) -> ReviewState:
+    """
+    Возвращает состояние после ответа с оценкой score (SM-2).
+
+    При качестве ответа ниже 3 повторения начинаются заново с интервалом
+    в один день, иначе интервал растет: 1 день, 6 дней, затем умножается
+    на коэффициент легкости. Коэффициент меняется по качеству ответа и не
+    опускается ниже MIN_EASINESS.
+    """
+    state = state or ReviewState()
+    quality = quality_from_score(score)
+    if quality < 3:
+        repetitions, interval = 0, 1.0
+    elif state.repetitions == 0:
+        repetitions, interval = 1, 1.0
+    elif state.repetitions == 1:
+        repetitions, interval = 2, 6.0
+    else:
+        repetitions = state.repetitions + 1
+        interval = round(state.interval * state.easiness)
+    easiness = state.easiness + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    return ReviewState(
+        repetitions=repetitions,
+        interval=interval,
+        easiness=max(easiness, MIN_EASINESS),
+        due=answered_at + interval * DAY,
+    )
+
+
+def replay(scores: Iterable[tuple[int, float]]) -> ReviewState | None:
+    """Возвращает состояние после ответов (оценка, время) по порядку"""
+    state = None
+    for score, answered_at in scores:
+        state = review(state, score, answered_at)
+    return state
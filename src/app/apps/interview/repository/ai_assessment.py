@@ -1,8 +1,11 @@
+from collections.abc import AsyncIterator
 from typing import Protocol
 from uuid import UUID
 
 from app.apps.interview.dto.ai_assessment import AIAssessmentDTO
 from app.apps.interview.dto.answer import AnswerDto
+from app.apps.interview.entity import ai_assessment
+from app.apps.interview.entity.ai_assessment import Priority
 from app.apps.interview.utils.request_service import RequestServiceProtocol
 from app.tools.repository.sql_alchemy.sql_alchemy_v2 import SARepository
 from core.database import DatabaseHelper
@@ -24,10 +27,27 @@ class AIAssessmentRepositoryProtocol(Protocol):
         temperature: float = 0.7,
         max_tokens: int = -1,
         stream: bool = False,
+        priority: Priority = Priority.DEFAULT,
     ) -> dict | None:
         """Возвращает оценку ответа пользователя на вопрос"""
         pass
 
+    def stream_ai_response(
+        self,
+        answer: AnswerDto,
+        temperature: float = 0.7,
+        max_tokens: int = -1,
+        priority: Priority = Priority.DEFAULT,
+    ) -> AsyncIterator[str]:
+        """Возвращает оценку ответа пользователя частями по мере генерации"""
+        pass
+
+    def get_assessment_key(
+        self, answer: AnswerDto, temperature: float = 0.7, max_tokens: int = -1
+    ) -> str:
+        """Возвращает ключ кэша оценки ответа"""
+        pass
+
     async def create_ai_assessment(
         self,
         text: str,
@@ -61,21 +81,61 @@ class AIAssessmentRepository(SARepository):
         temperature: float = 0.7,
         max_tokens: int = -1,
         stream: bool = False,
+        priority: Priority = Priority.DEFAULT,
     ) -> dict | None:
         """Возвращает оценку ответа пользователя на вопрос"""
         response = await self._llm_request_service.send_request_llm(
-            data={
-                "messages": [
-                    {"role": "system", "content": self._system_prompt_assessment},
-                    {"role": "user", "content": answer.text},
-                ],
-                "temperature": temperature,
-                "max_tokens": max_tokens,
-                "stream": stream,
-            },
+            data=self._get_request_data(answer, temperature, max_tokens, stream),
+            user_id=answer.user_id,
+            priority=priority,
         )
         return response
 
+    async def stream_ai_response(
+        self,
+        answer: AnswerDto,
+        temperature: float = 0.7,
+        max_tokens: int = -1,
+        priority: Priority = Priority.DEFAULT,
+    ) -> AsyncIterator[str]:
+        """Возвращает оценку ответа пользователя частями по мере генерации"""
+        async for chunk in self._llm_request_service.stream_request_llm(
+            data=self._get_request_data(answer, temperature, max_tokens, True),
+            user_id=answer.user_id,
+            priority=priority,
+        ):
+            delta = ai_assessment.extract_delta_from_llm_chunk(chunk)
+            if delta:
+                yield delta
+
+    def _get_request_data(
+        self, answer: AnswerDto, temperature: float, max_tokens: int, stream: bool
+    ) -> dict:
+        return {
+            "messages": [
+                {"role": "system", "content": self._system_prompt_assessment},
+                {"role": "user", "content": answer.text},
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": stream,
+        }
+
+    def get_assessment_key(
+        self, answer: AnswerDto, temperature: float = 0.7, max_tokens: int = -1
+    ) -> str:
+        """
+        Возвращает ключ кэша оценки ответа: учитывает вопрос, нормализованный
+        текст ответа, системный промпт и параметры запроса к LLM.
+        """
+        return ai_assessment.get_assessment_key(
+            question_id=answer.question_id,
+            answer_text=answer.text,
+            system_prompt=self._system_prompt_assessment,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+
     async def create_ai_assessment(
         self,
         text: str,
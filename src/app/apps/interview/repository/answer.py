@@ -1,10 +1,15 @@
+from collections.abc import AsyncGenerator, Iterable
 from typing import Protocol
 from uuid import UUID
 
-from app.apps.interview.dto.answer import AnswerDto
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.apps.interview.dto.answer import AnswerDto, AnswerScore
 from app.tools.repository.sql_alchemy.sql_alchemy import SQLAlchemyRepository
 from app.tools.repository.sql_alchemy.sql_alchemy_v2 import SARepository
-from model import Answer
+from model import AIAssessment, Answer
+from tools.sentry import sentry_message
 
 
 class AnswerRepositoryProtocol(Protocol):
@@ -15,6 +20,16 @@ class AnswerRepositoryProtocol(Protocol):
         """Создает ответ пользователя на вопрос"""
         pass
 
+    def stream_scores(
+        self, user_ids: Iterable[UUID] | None = None, batch_size: int = 1000
+    ) -> AsyncGenerator[list[AnswerScore], None]:
+        """Перебирает оценки ответов пользователей пачками"""
+        pass
+
+    async def get_last_scores(self, user_id: UUID, limit: int = 10) -> list[int]:
+        """Возвращает оценки последних ответов пользователя"""
+        pass
+
 
 class SQLAlchemyAnswerRepositoryV1(SQLAlchemyRepository):
     model = Answer
@@ -39,3 +54,73 @@ class SAAnswerRepoV2(SARepository):
                 text=text, user_id=user_id, question_id=question_id
             )
         return AnswerDto.model_validate(answer)
+
+    async def get_last_scores(self, user_id: UUID, limit: int = 10) -> list[int]:
+        """
+        Возвращает оценки последних limit ответов пользователя, новые первыми.
+
+        Оценка ответа - оценка AIAssessment, а если ее нет - Answer.score.
+        """
+        query = (
+            select(func.coalesce(AIAssessment.score, self.model.score))
+            .select_from(self.model)
+            .outerjoin(AIAssessment, AIAssessment.answer_id == self.model.id)
+            .where(self.model.user_id == user_id)
+            .order_by(self.model.created_at.desc(), self.model.id.desc())
+            .limit(limit)
+        )
+        result = await self.execute(query)
+        return list(result.scalars().all())
+
+    async def stream_scores(
+        self, user_ids: Iterable[UUID] | None = None, batch_size: int = 1000
+    ) -> AsyncGenerator[list[AnswerScore], None]:
+        """
+        Перебирает оценки ответов пользователей пачками через серверный курсор.
+
+        Оценка ответа - оценка AIAssessment, а если ее нет - Answer.score.
+        Записи упорядочены по пользователю, вопросу и времени ответа.
+
+        Args:
+            user_ids: Пользователи, None - все пользователи.
+            batch_size: Количество записей в пачке.
+
+        Yields:
+            list[AnswerScore]: Пачка оценок.
+        """
+        query = (
+            select(
+                self.model.user_id,
+                self.model.question_id,
+                func.coalesce(AIAssessment.score, self.model.score),
+                self.model.created_at,
+            )
+            .outerjoin(AIAssessment, AIAssessment.answer_id == self.model.id)
+            .order_by(
+                self.model.user_id,
+                self.model.question_id,
+                self.model.created_at,
+                self.model.id,
+            )
+            .execution_options(yield_per=batch_size)
+        )
+        if user_ids is not None:
+            query = query.where(self.model.user_id.in_(list(user_ids)))
+        session = self._conn.read_session_factory()
+        try:
+            result = await session.stream(query)
+            async for rows in result.partitions(batch_size):
+                yield [AnswerScore(*row) for row in rows]
+        except SQLAlchemyError as err:
+            error_text = (
+                f"Ошибка получения оценок ответов.\n"
+                f"Текст ошибки в исключении {str(err)}.\n"
+            )
+            sentry_message(
+                message=error_text,
+                level="error",
+                title="REPO:stream_scores",
+            )
+            raise SQLAlchemyError(error_text) from err
+        finally:
+            await session.close()
@@ -2,9 +2,25 @@ from collections.abc import Iterable
 from typing import Protocol
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import (
+    exists,
+    func,
+    literal_column,
+    select,
+    table,
+    tablesample,
+    union_all,
+)
 
 from app.apps.interview.dto.question import QuestionDto
+from app.apps.interview.entity.question import QuestionEntity
+from app.apps.interview.repository.question_cache import (
+    QuestionCacheRepositoryProtocol,
+    redis_question_repo,
+)
+from app.tools.cache import CacheServiceProtocol, cache_service
+from app.tools.cache_aside import cached
+from app.tools.repository.sql_alchemy.invalidation import Change, invalidation_registry
 from app.tools.repository.sql_alchemy.sql_alchemy import SQLAlchemyRepository
 from app.tools.repository.sql_alchemy.sql_alchemy_v2 import SARepository
 from model.question import Question
@@ -34,6 +50,26 @@ class QuestionRepositoryProtocol(Protocol):
         """Возвращает вопросы для пользователя"""
         pass
 
+    async def get_question_pools(
+        self, technologies: Iterable[str]
+    ) -> dict[str, list[int]]:
+        """Возвращает id опубликованных вопросов по технологиям"""
+        pass
+
+    async def sample_question_for_user(
+        self, user_id: UUID, technologies: Iterable[str], k: int = 1
+    ) -> list[QuestionDto]:
+        """Возвращает k случайных вопросов, сначала неотвеченные"""
+        pass
+
+    async def get_question_complexities(
+        self,
+        technologies: Iterable[str] | None = None,
+        question_ids: Iterable[int] | None = None,
+    ) -> list[tuple[str, int, int]]:
+        """Возвращает (технология, сложность, id) опубликованных вопросов"""
+        pass
+
     async def create_user_question_obj(self, user_id: UUID, question_id: int):
         """Связывает пользователя с вопросом"""
         pass
@@ -104,13 +140,13 @@ class SQLAlchemyQuestionRepositoryV1(SQLAlchemyRepository):
 
 class SAQuestionRepoV2(SARepository):
     model = Question
+    # сколько строк каталога читает выборка TABLESAMPLE в sample_question_for_user
+    sample_rows = 1000
 
+    @cached(key="repo:question:{id}", dto=QuestionDto, ttl=60 * 60)
     async def find_question(self, id: int) -> QuestionDto | None:
         """Возвращает вопрос по id"""
-        question = await self.query(self.model).find(id=id)
-        if not question:
-            return None
-        return QuestionDto.model_validate(question)
+        return await self.loader(self.model, "id", QuestionDto).load(id)
 
     async def get_questions(self, technologies: Iterable[str]) -> list[QuestionDto]:
         sub_query_technologies = select(Technology.id).where(
@@ -164,3 +200,154 @@ class SAQuestionRepoV2(SARepository):
         return await self.get_unanswered_questions(
             user_id=user_id, technologies=technologies
         ) or await self.get_questions(technologies=technologies)
+
+    async def sample_question_for_user(
+        self, user_id: UUID, technologies: Iterable[str], k: int = 1
+    ) -> list[QuestionDto]:
+        """
+        Возвращает k случайных вопросов, сначала неотвеченные.
+
+        Выбор делается в базе одним запросом из двух частей, соединенных
+        UNION ALL под общим LIMIT k:
+
+        1. Выборка TABLESAMPLE SYSTEM примерно sample_rows строк таблицы
+           вопросов (процент считается по pg_class.reltuples). Из нее
+           берутся неотвеченные вопросы стека в случайном порядке - время
+           не зависит от размера каталога.
+        2. Запасной путь по всему стеку: неотвеченные, затем отвеченные
+           в случайном порядке, без уже выбранных в п. 1. PostgreSQL не
+           выполняет эту часть, если первая уже вернула k строк, поэтому
+           полный проход по стеку нужен только при маленьком каталоге или
+           когда почти все вопросы отвечены.
+
+        SYSTEM выбирает страницы целиком: вопросы с одной страницы попадают
+        в выборку вместе, но вероятность попасть в нее у всех вопросов
+        одинакова.
+        """
+        technology_ids = select(Technology.id).where(
+            Technology.name.in_(list(technologies))
+        )
+        reltuples = (
+            select(literal_column("reltuples"))
+            .select_from(table("pg_class"))
+            .where(literal_column("oid") == func.to_regclass(self.model.__tablename__))
+            .scalar_subquery()
+        )
+        percent = func.least(
+            100, 100.0 * self.sample_rows / func.greatest(reltuples, 1)
+        )
+        sample = tablesample(self.model.__table__, func.system(percent))
+
+        def candidates(source):
+            in_stack = exists().where(
+                QuestionTechnology.question_id == source.c.id,
+                QuestionTechnology.technology_id.in_(technology_ids),
+            )
+            columns = [
+                source.c[field]
+                for field in QuestionDto.model_fields
+                if field in source.c
+            ]
+            return select(*columns).where(source.c.published == True, in_stack)
+
+        # подзапрос с LIMIT не превращается в anti join: планировщик не знает
+        # размер выборки и иначе строит hash по всем ответам пользователя,
+        # а так для каждой строки выборки идет один поиск по индексу
+        # (user_id, question_id)
+        answered_in_sample = (
+            select(UserQuestion.question_id)
+            .where(
+                UserQuestion.user_id == user_id, UserQuestion.question_id == sample.c.id
+            )
+            .limit(1)
+            .scalar_subquery()
+        )
+        sampled = (
+            candidates(sample)
+            .where(answered_in_sample.is_(None))
+            .order_by(func.random())
+            .limit(k)
+            .cte()
+        )
+        answered = exists().where(
+            UserQuestion.user_id == user_id, UserQuestion.question_id == self.model.id
+        )
+        fallback = (
+            candidates(self.model.__table__)
+            .where(self.model.id.not_in(select(sampled.c.id)))
+            .order_by(answered, func.random())
+            .limit(k)
+        )
+        query = union_all(select(sampled), fallback).limit(k)
+        result = await self.execute(query)
+        return [QuestionDto.model_validate(row._mapping) for row in result.all()]
+
+    async def get_question_pools(
+        self, technologies: Iterable[str]
+    ) -> dict[str, list[int]]:
+        """Возвращает id опубликованных вопросов по технологиям"""
+        pools: dict[str, list[int]] = {technology: [] for technology in technologies}
+        query = (
+            select(Technology.name, QuestionTechnology.question_id)
+            .join(QuestionTechnology, QuestionTechnology.technology_id == Technology.id)
+            .join(self.model, QuestionTechnology.question_id == self.model.id)
+            .where(Technology.name.in_(pools), self.model.published == True)
+        )
+        result = await self.execute(query)
+        for technology, question_id in result.all():
+            pools[technology].append(question_id)
+        return pools
+
+    async def get_question_complexities(
+        self,
+        technologies: Iterable[str] | None = None,
+        question_ids: Iterable[int] | None = None,
+    ) -> list[tuple[str, int, int]]:
+        """
+        Возвращает (технология, сложность, id) опубликованных вопросов.
+
+        Выбираются вопросы технологий technologies и/или вопросы с id из
+        question_ids - для точечного обновления корзин после изменений.
+        """
+        query = (
+            select(Technology.name, self.model.complexity, self.model.id)
+            .select_from(Technology)
+            .join(QuestionTechnology, QuestionTechnology.technology_id == Technology.id)
+            .join(self.model, QuestionTechnology.question_id == self.model.id)
+            .where(self.model.published == True)
+        )
+        if technologies is not None:
+            query = query.where(Technology.name.in_(list(technologies)))
+        if question_ids is not None:
+            query = query.where(self.model.id.in_(list(question_ids)))
+        result = await self.execute(query)
+        return [tuple(row) for row in result.all()]
+
+
+@invalidation_registry.on(Question, cache=cache_service)
+async def invalidate_question_cache(changes: list[Change], cache: CacheServiceProtocol):
+    """Сбрасывает кэш вопросов после коммита изменений"""
+    ids = {change.pk for change in changes} - {None}
+    await cache.delete(
+        *[SAQuestionRepoV2.find_question.key_for(None, id=id_) for id_ in ids]
+    )
+
+
+@invalidation_registry.on(Question, question_cache_repo=redis_question_repo)
+@invalidation_registry.on(QuestionTechnology, question_cache_repo=redis_question_repo)
+async def invalidate_question_pools(
+    changes: list[Change], question_cache_repo: QuestionCacheRepositoryProtocol
+):
+    """Сбрасывает пулы вопросов технологий после коммита изменений"""
+    await question_cache_repo.delete_question_pools()
+
+
+@invalidation_registry.on(Question)
+@invalidation_registry.on(QuestionTechnology)
+async def update_question_sampler(changes: list[Change]):
+    """Отмечает измененные вопросы для обновления корзин по сложности"""
+    ids = {
+        change.pk if change.model is Question else change.values.get("question_id")
+        for change in changes
+    }
+    QuestionEntity.sampler.mark_changed(ids - {None})
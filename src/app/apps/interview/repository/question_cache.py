@@ -0,0 +1,391 @@
+import random
+
+from collections.abc import Sequence
+from typing import NamedTuple, Protocol
+from uuid import UUID
+
+from app.apps.interview.entity.review import ReviewState
+from app.tools.bitmap import from_bitmap, to_bitmap
+from app.tools.cache import Cache, cache_service
+
+
+QUESTION_POOL_TTL = 60 * 60 * 24
+SEEN_QUESTIONS_TTL = 60 * 60 * 24 * 7
+REVIEW_TTL = 60 * 60 * 24 * 365
+# Технологии, для которых построены пулы вопросов
+QUESTION_POOLS_KEY = "question_pool:technologies"
+# Служебный бит битовых карт вопросов: карта построена целиком.
+# Идентификаторы вопросов начинаются с 1, поэтому бит 0 свободен.
+BUILT_BIT = 0
+
+# Номер случайного установленного бита карты key или false. Случайное
+# число r из [0, 1) передает вызывающий: генератор math.random в скриптах
+# Redis детерминирован. Номер бита среди установленных ищется BITCOUNT по
+# блокам по 1024 байта, внутри блока - перебором байтов, поэтому из Redis
+# возвращается только номер, а не вся карта.
+RANDOM_BIT_LUA = """
+local function random_bit(key, r)
+    local count = redis.call("BITCOUNT", key)
+    if count == 0 then
+        return false
+    end
+    local rank = math.floor(tonumber(r) * count)
+    local start = 0
+    while true do
+        local bits = redis.call("BITCOUNT", key, start, start + 1023)
+        if rank < bits then
+            break
+        end
+        rank = rank - bits
+        start = start + 1024
+    end
+    local data = redis.call("GETRANGE", key, start, start + 1023)
+    for index = 1, #data do
+        local byte = string.byte(data, index)
+        for bit = 0, 7 do
+            local mask = 2 ^ (7 - bit)
+            if byte >= mask then
+                byte = byte - mask
+                if rank == 0 then
+                    return (start + index - 1) * 8 + bit
+                end
+                rank = rank - 1
+            end
+        end
+    end
+    return false
+end
+"""
+# KEYS: карта выданных, две временные карты, пулы технологий.
+# ARGV: случайное число, служебный бит.
+# Возвращает {построена ли карта выданных, {есть ли пул}, id вопроса}.
+CHOOSE_QUESTION_LUA = RANDOM_BIT_LUA + """
+local seen, candidates, candidates_seen = KEYS[1], KEYS[2], KEYS[3]
+local pools = {unpack(KEYS, 4)}
+local seen_loaded = redis.call("GETBIT", seen, ARGV[2])
+local complete = seen_loaded == 1
+local exists = {}
+for index, pool in ipairs(pools) do
+    exists[index] = redis.call("EXISTS", pool)
+    if exists[index] == 0 then
+        complete = false
+    end
+end
+local question_id = false
+if complete then
+    redis.call("BITOP", "OR", candidates, unpack(pools))
+    redis.call("BITOP", "AND", candidates_seen, candidates, seen)
+    -- XOR вместо NOT: карта выданных может быть короче пулов
+    redis.call("BITOP", "XOR", candidates, candidates, candidates_seen)
+    question_id = random_bit(candidates, ARGV[1])
+    redis.call("DEL", candidates, candidates_seen)
+end
+return {seen_loaded, exists, question_id}
+"""
+# KEYS: временная карта, пулы технологий. ARGV: случайное число, служебный бит.
+CHOOSE_ANY_QUESTION_LUA = RANDOM_BIT_LUA + """
+redis.call("BITOP", "OR", KEYS[1], unpack(KEYS, 2))
+redis.call("SETBIT", KEYS[1], ARGV[2], 0)
+local question_id = random_bit(KEYS[1], ARGV[1])
+redis.call("DEL", KEYS[1])
+return question_id
+"""
+
+
+class QuestionChoice(NamedTuple):
+    question_id: int | None
+    missing_pools: list[str]
+    seen_loaded: bool
+    review: tuple[int, float] | None = None
+
+    @property
+    def complete(self) -> bool:
+        """Выбор сделан по полным данным, перестраивать множества не нужно"""
+        return not self.missing_pools and self.seen_loaded
+
+    @property
+    def all_seen(self) -> bool:
+        """Пользователь видел все вопросы стека"""
+        return self.complete and self.question_id is None
+
+
+def question_pool_key(technology: str) -> str:
+    return f"question_pool:{technology}"
+
+
+def seen_questions_key(user_id: UUID) -> str:
+    return f"user_id:{user_id}:seen_questions"
+
+
+def review_queue_key(user_id: UUID) -> str:
+    return f"user_id:{user_id}:review_queue"
+
+
+def review_state_key(user_id: UUID) -> str:
+    return f"user_id:{user_id}:review_state"
+
+
+class QuestionCacheRepositoryProtocol(Protocol):
+    async def choose_question(
+        self, user_id: UUID, technologies: Sequence[str]
+    ) -> QuestionChoice:
+        """Выбирает случайный вопрос стека, который пользователь еще не видел"""
+        pass
+
+    async def choose_any_question(
+        self, user_id: UUID, technologies: Sequence[str]
+    ) -> int | None:
+        """Выбирает случайный вопрос стека"""
+        pass
+
+    async def get_review_states(
+        self, keys: Sequence[tuple[UUID, int]]
+    ) -> list[ReviewState | None]:
+        """Возвращает состояния повторения вопросов пользователями"""
+        pass
+
+    async def set_review_states(
+        self,
+        states: Sequence[tuple[UUID, int, ReviewState]],
+        replace: bool = False,
+    ):
+        """Сохраняет состояния повторения и сроки в очереди пользователей"""
+        pass
+
+    async def set_question_pools(self, pools: dict[str, Sequence[int]]):
+        """Сохраняет опубликованные вопросы технологий"""
+        pass
+
+    async def delete_question_pools(self):
+        """Удаляет пулы вопросов всех технологий"""
+        pass
+
+    async def set_seen_questions(self, user_id: UUID, question_ids: Sequence[int]):
+        """Сохраняет вопросы, выданные пользователю"""
+        pass
+
+    async def add_seen_questions(self, seen: Sequence[tuple[UUID, int]]):
+        """Отмечает вопросы выданными пользователям"""
+        pass
+
+    async def has_seen_question(self, user_id: UUID, question_id: int) -> bool:
+        """Проверяет, выдавался ли вопрос пользователю"""
+        pass
+
+    async def filter_unseen_questions(
+        self, user_id: UUID, question_ids: Sequence[int]
+    ) -> list[int]:
+        """Возвращает вопросы, которые пользователю еще не выдавались"""
+        pass
+
+    async def get_seen_questions(self, user_id: UUID) -> list[int] | None:
+        """Возвращает вопросы, выданные пользователю"""
+        pass
+
+
+class RedisQuestionRepo:
+    """
+    Пулы вопросов технологий, выданные пользователям вопросы и очереди
+    повторения в Redis.
+
+    Работает поверх Cache: команды отправляются через его конвейер и
+    соединение, сам Cache о вопросах ничего не знает.
+    """
+
+    def __init__(self, cache: Cache):
+        self._cache = cache
+        self._choose_question_script = cache.redis_cache.register_script(
+            CHOOSE_QUESTION_LUA
+        )
+        self._choose_any_question_script = cache.redis_cache.register_script(
+            CHOOSE_ANY_QUESTION_LUA
+        )
+
+    async def choose_question(
+        self, user_id: UUID, technologies: Sequence[str]
+    ) -> QuestionChoice:
+        """
+        Выбирает случайный вопрос стека, который пользователь еще не видел.
+
+        Пулы технологий и выданные пользователю вопросы хранятся битовыми
+        картами по id вопроса. Скрипт CHOOSE_QUESTION_LUA объединяет пулы
+        (BITOP OR), вычитает выданные вопросы (BITOP AND и XOR) и
+        выбирает случайный установленный бит на стороне Redis - в процесс
+        возвращается только id. Если все вопросы выданы, question_id
+        равен None. В missing_pools возвращаются технологии без пула,
+        seen_loaded - построена ли карта выданных вопросов; если данных не
+        хватает, question_id равен None. В review - ближайший по сроку
+        вопрос из очереди повторения пользователя (id, срок).
+        """
+        technologies = sorted(set(technologies))
+        if not technologies:
+            return QuestionChoice(None, [], True)
+        pools = [question_pool_key(technology) for technology in technologies]
+        keys = [
+            seen_questions_key(user_id),
+            f"user_id:{user_id}:candidates",
+            f"user_id:{user_id}:candidates_seen",
+            *pools,
+        ]
+        async with self._cache.pipeline(transaction=True) as pipe:
+            await self._choose_question_script(
+                keys=keys, args=[random.random(), BUILT_BIT], client=pipe
+            )
+            pipe.zrange(review_queue_key(user_id), 0, 0, withscores=True)
+            (seen_loaded, exists, question_id), review = await pipe.execute()
+        review = [(int(queued), due) for queued, due in review]
+        missing_pools = [
+            technology
+            for technology, pool_exists in zip(technologies, exists, strict=True)
+            if not pool_exists
+        ]
+        return QuestionChoice(
+            question_id=question_id,
+            missing_pools=missing_pools,
+            seen_loaded=bool(seen_loaded),
+            review=review[0] if review else None,
+        )
+
+    async def choose_any_question(
+        self, user_id: UUID, technologies: Sequence[str]
+    ) -> int | None:
+        """Выбирает случайный вопрос из объединения пулов стека в Redis"""
+        technologies = sorted(set(technologies))
+        if not technologies:
+            return None
+        pools = [question_pool_key(technology) for technology in technologies]
+        return await self._choose_any_question_script(
+            keys=[f"user_id:{user_id}:candidates", *pools],
+            args=[random.random(), BUILT_BIT],
+        )
+
+    async def get_review_states(
+        self, keys: Sequence[tuple[UUID, int]]
+    ) -> list[ReviewState | None]:
+        """Возвращает состояния повторения вопросов пользователями"""
+        if not keys:
+            return []
+        async with self._cache.pipeline() as pipe:
+            for user_id, question_id in keys:
+                pipe.hget(review_state_key(user_id), question_id)
+                pipe.zscore(review_queue_key(user_id), question_id)
+            results = await pipe.execute()
+        return [
+            ReviewState.loads(value, due) if value and due is not None else None
+            for value, due in zip(results[::2], results[1::2], strict=True)
+        ]
+
+    async def set_review_states(
+        self,
+        states: Sequence[tuple[UUID, int, ReviewState]],
+        replace: bool = False,
+    ):
+        """
+        Сохраняет состояния повторения и сроки в очереди пользователей.
+
+        Очередь пользователя - sorted set с id вопросов и сроками
+        повторения, поэтому ближайший вопрос берется за O(log n). При
+        replace состояния пользователей из states сначала удаляются
+        (полный пересчет после переоценки ответов).
+        """
+        if not states:
+            return
+        users = {user_id for user_id, _, _ in states}
+        async with self._cache.pipeline() as pipe:
+            if replace:
+                for user_id in users:
+                    pipe.delete(review_state_key(user_id), review_queue_key(user_id))
+            for user_id, question_id, state in states:
+                pipe.hset(review_state_key(user_id), question_id, state.dumps())
+                pipe.zadd(review_queue_key(user_id), {question_id: state.due})
+            for user_id in users:
+                pipe.expire(review_state_key(user_id), REVIEW_TTL)
+                pipe.expire(review_queue_key(user_id), REVIEW_TTL)
+            await pipe.execute()
+
+    async def set_question_pools(self, pools: dict[str, Sequence[int]]):
+        """Сохраняет опубликованные вопросы технологий битовыми картами"""
+        if not pools:
+            return
+        async with self._cache.pipeline(transaction=True) as pipe:
+            for technology, question_ids in pools.items():
+                bitmap = to_bitmap([BUILT_BIT, *question_ids])
+                pipe.set(question_pool_key(technology), bitmap, QUESTION_POOL_TTL)
+            pipe.sadd(QUESTION_POOLS_KEY, *pools)
+            pipe.expire(QUESTION_POOLS_KEY, QUESTION_POOL_TTL)
+            await pipe.execute()
+
+    async def delete_question_pools(self):
+        """Удаляет пулы вопросов всех технологий, они перестроятся при выборе"""
+        technologies = await self._cache.redis_cache.smembers(QUESTION_POOLS_KEY)
+        await self._cache.redis_cache.delete(
+            QUESTION_POOLS_KEY,
+            *[question_pool_key(technology.decode()) for technology in technologies],
+        )
+
+    async def set_seen_questions(self, user_id: UUID, question_ids: Sequence[int]):
+        """
+        Сохраняет вопросы, выданные пользователю, битовой картой.
+
+        Карта занимает (максимальный id вопроса) / 8 байт независимо от
+        числа выданных вопросов.
+        """
+        bitmap = to_bitmap([BUILT_BIT, *question_ids])
+        await self._cache.redis_cache.set(
+            seen_questions_key(user_id), bitmap, SEEN_QUESTIONS_TTL
+        )
+
+    async def add_seen_questions(self, seen: Sequence[tuple[UUID, int]]):
+        """
+        Отмечает вопросы выданными пользователям.
+
+        Если карта пользователя еще не построена, бит установится без
+        служебной отметки и карта будет построена из базы при следующем
+        выборе.
+        """
+        if not seen:
+            return
+        async with self._cache.pipeline() as pipe:
+            for user_id, question_id in seen:
+                pipe.setbit(seen_questions_key(user_id), question_id, 1)
+            await pipe.execute()
+
+    async def has_seen_question(self, user_id: UUID, question_id: int) -> bool:
+        """Проверяет, выдавался ли вопрос пользователю (GETBIT, O(1))"""
+        return bool(
+            await self._cache.redis_cache.getbit(
+                seen_questions_key(user_id), question_id
+            )
+        )
+
+    async def filter_unseen_questions(
+        self, user_id: UUID, question_ids: Sequence[int]
+    ) -> list[int]:
+        """
+        Возвращает вопросы, которые пользователю еще не выдавались.
+
+        Все вопросы проверяются одним конвейером GETBIT, порядок сохраняется.
+        """
+        if not question_ids:
+            return []
+        async with self._cache.pipeline() as pipe:
+            for question_id in question_ids:
+                pipe.getbit(seen_questions_key(user_id), question_id)
+            seen = await pipe.execute()
+        return [
+            question_id
+            for question_id, bit in zip(question_ids, seen, strict=True)
+            if not bit
+        ]
+
+    async def get_seen_questions(self, user_id: UUID) -> list[int] | None:
+        """Возвращает вопросы, выданные пользователю, или None, если карты нет"""
+        offsets = from_bitmap(
+            await self._cache.redis_cache.get(seen_questions_key(user_id)) or b""
+        )
+        if not offsets or offsets[0] != BUILT_BIT:
+            return None
+        return offsets[1:]
+
+
+redis_question_repo = RedisQuestionRepo(cache_service)
@@ -1,7 +1,14 @@
 from typing import Protocol
 from uuid import UUID
 
+from sqlalchemy import select
+
 from app.apps.interview.dto.user_question import UserQuestionDTO
+from app.apps.interview.repository.question_cache import (
+    QuestionCacheRepositoryProtocol,
+    redis_question_repo,
+)
+from app.tools.repository.sql_alchemy.invalidation import Change, invalidation_registry
 from app.tools.repository.sql_alchemy.sql_alchemy import SQLAlchemyRepository
 from app.tools.repository.sql_alchemy.sql_alchemy_v2 import SARepository
 from model.user_question import UserQuestion
@@ -16,6 +23,10 @@ class UserQuestionRepositoryProtocol(Protocol):
         """Возвращает объект пользователя и вопроса"""
         pass
 
+    async def get_question_ids(self, user_id: UUID) -> list[int]:
+        """Возвращает id вопросов, выданных пользователю"""
+        pass
+
 
 class SQLAlchemyUserQuestionRepositoryV1(SQLAlchemyRepository):
     model = UserQuestion
@@ -35,3 +46,24 @@ class SAUserQuestionRepoV2(SARepository):
             user_id=user_id, question_id=question_id, dto=UserQuestionDTO
         )
         return uq
+
+    async def get_question_ids(self, user_id: UUID) -> list[int]:
+        """Возвращает id вопросов, выданных пользователю"""
+        result = await self.execute(
+            select(self.model.question_id).where(self.model.user_id == user_id)
+        )
+        return list(result.scalars().all())
+
+
+@invalidation_registry.on(UserQuestion, question_cache_repo=redis_question_repo)
+async def update_seen_questions(
+    changes: list[Change], question_cache_repo: QuestionCacheRepositoryProtocol
+):
+    """Отмечает вопросы выданными в карте пользователя после коммита"""
+    await question_cache_repo.add_seen_questions(
+        [
+            (change.values["user_id"], change.values["question_id"])
+            for change in changes
+            if change.values.get("user_id") and change.values.get("question_id")
+        ]
+    )
@@ -1,10 +1,20 @@
-from app.apps.interview.dto.ai_assessment import AIAssessmentDTO
-from app.apps.interview.dto.answer import AnswerDto
+import contextlib
+import time
+
+from collections.abc import AsyncIterator
+
+from redis import RedisError
+
+from app.apps.interview.dto.ai_assessment import AIAssessmentChunk, AIAssessmentDTO
+from app.apps.interview.dto.answer import AnswerDto, AnswerScore
 from app.apps.interview.dto.question import QuestionDto
 from app.apps.interview.entity import ai_assessment
 from app.apps.interview.repository.ai_assessment import AIAssessmentRepositoryProtocol
+from app.apps.interview.usecase.review import ReviewUseCase
+from app.apps.interview.utils.assessment_cache import AssessmentCache
 from app.apps.user.dto.user import UserDto
 from app.tools.cache import CacheServiceProtocol
+from app.tools.repository.sql_alchemy.query_detector import query_detector
 
 
 class AIAssessmentUseCase:
@@ -15,13 +25,18 @@ class AIAssessmentUseCase:
         temperature: float = 0.7,
         max_tokens: int = -1,
         stream: bool = False,
+        review_use_case: ReviewUseCase | None = None,
+        assessment_cache: AssessmentCache | None = None,
     ):
         self._cache_service = cache_service
         self._ai_assessment_repo = ai_assessment_repo
         self._temperature = temperature
         self._max_tokens = max_tokens
         self._stream = stream
+        self._review_use_case = review_use_case
+        self._assessment_cache = assessment_cache
 
+    @query_detector.track("AIAssessmentUseCase.get_ai_assessment")
     async def get_ai_assessment(
         self,
         user: UserDto,
@@ -29,27 +44,139 @@ class AIAssessmentUseCase:
         answer: AnswerDto,
         to_markdown: bool = True,
     ) -> AIAssessmentDTO | None:
+        if self._stream:
+            assessment = None
+            async for chunk in self.stream_ai_assessment(
+                user, question, answer, to_markdown
+            ):
+                assessment = chunk.assessment
+            return assessment
         stack = await self._cache_service.get_stack(user.id)
         if not any([question, answer, user, stack]):
             return None
-        response_dict = await self._ai_assessment_repo.get_ai_response(
+        key = self._get_cache_key(answer)
+        cached = self._assessment_cache.get(key) if key else None
+        if cached:
+            text, score = cached.text, cached.score
+        else:
+            start = time.perf_counter()
+            response_dict = await self._ai_assessment_repo.get_ai_response(
+                answer=answer,
+                temperature=self._temperature,
+                max_tokens=self._max_tokens,
+                priority=ai_assessment.get_priority(user),
+                stream=False,
+            )
+            if not response_dict:
+                return None
+            text = ai_assessment.extract_text_from_llm_response(response_dict)
+            if not text:
+                return None
+            score = ai_assessment.get_score(text)
+            if key:
+                self._assessment_cache.set(
+                    key, text, score, time.perf_counter() - start
+                )
+        if to_markdown:
+            text = ai_assessment.normalize_text_to_markdown(text)
+        return await self._save_assessment(user, question, answer, text, score)
+
+    async def stream_ai_assessment(
+        self,
+        user: UserDto,
+        question: QuestionDto,
+        answer: AnswerDto,
+        to_markdown: bool = True,
+    ) -> AsyncIterator[AIAssessmentChunk]:
+        """
+        Оценивает ответ потоково и возвращает текст частями по мере генерации.
+
+        Части экранируются для Markdown по отдельности, их можно сразу
+        показывать пользователю. Оценка сохраняется один раз после
+        получения всего ответа: последняя часть - пустой текст и
+        сохраненная оценка. Если ответ прервался, оценка не сохраняется.
+        Оценка из кэша возвращается одной частью.
+        """
+        stack = await self._cache_service.get_stack(user.id)
+        if not any([question, answer, user, stack]):
+            return
+        key = self._get_cache_key(answer)
+        cached = self._assessment_cache.get(key) if key else None
+        if cached:
+            text = cached.text
+            if to_markdown:
+                text = ai_assessment.normalize_text_to_markdown(text)
+            yield AIAssessmentChunk(text=text)
+            assessment = await self._save_assessment(
+                user, question, answer, text, cached.score
+            )
+            yield AIAssessmentChunk(text="", assessment=assessment)
+            return
+        raw_parts, parts = [], []
+        # время ожидания LLM без времени обработки частей вызывающим
+        llm_seconds = 0.0
+        start = time.perf_counter()
+        async for delta in self._ai_assessment_repo.stream_ai_response(
             answer=answer,
             temperature=self._temperature,
             max_tokens=self._max_tokens,
-            stream=self._stream,
-        )
-        if not response_dict:
-            return None
-        text = ai_assessment.extract_text_from_llm_response(response_dict)
+            priority=ai_assessment.get_priority(user),
+        ):
+            llm_seconds += time.perf_counter() - start
+            if not parts:
+                delta = delta.lstrip()
+            if delta:
+                raw_parts.append(delta)
+                if to_markdown:
+                    delta = ai_assessment.normalize_text_to_markdown(delta)
+                parts.append(delta)
+                yield AIAssessmentChunk(text=delta)
+            start = time.perf_counter()
+        llm_seconds += time.perf_counter() - start
+        text = "".join(parts).rstrip()
         if not text:
+            return
+        raw_text = "".join(raw_parts).rstrip()
+        score = ai_assessment.get_score(raw_text)
+        if key:
+            self._assessment_cache.set(key, raw_text, score, llm_seconds)
+        assessment = await self._save_assessment(user, question, answer, text, score)
+        yield AIAssessmentChunk(text="", assessment=assessment)
+
+    def _get_cache_key(self, answer: AnswerDto) -> str | None:
+        if self._assessment_cache is None:
             return None
-        if to_markdown:
-            text = ai_assessment.normalize_text_to_markdown(text)
-        score = ai_assessment.get_score(text)
-        return await self._ai_assessment_repo.create_ai_assessment(
+        return self._ai_assessment_repo.get_assessment_key(
+            answer, temperature=self._temperature, max_tokens=self._max_tokens
+        )
+
+    async def _save_assessment(
+        self,
+        user: UserDto,
+        question: QuestionDto,
+        answer: AnswerDto,
+        text: str,
+        score: int,
+    ) -> AIAssessmentDTO | None:
+        """Сохраняет оценку и планирует повторение вопроса"""
+        assessment = await self._ai_assessment_repo.create_ai_assessment(
             text=text,
             user_id=user.id,
             question_id=question.id,
             answer_id=answer.id,
             score=score,
         )
+        if assessment and self._review_use_case:
+            # очередь повторения восстанавливается через reschedule
+            with contextlib.suppress(RedisError, OSError):
+                await self._review_use_case.record(
+                    [
+                        AnswerScore(
+                            user_id=assessment.user_id,
+                            question_id=assessment.question_id,
+                            score=assessment.score,
+                            answered_at=answer.created_at,
+                        )
+                    ]
+                )
+        return assessment
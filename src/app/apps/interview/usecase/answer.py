@@ -4,6 +4,7 @@ from app.apps.interview.repository.answer import AnswerRepositoryProtocol
 from app.apps.interview.repository.question import QuestionRepositoryProtocol
 from app.apps.user.dto.user import UserDto
 from app.apps.user.repository.user import UserRepositoryProtocol
+from app.tools.repository.sql_alchemy.query_detector import query_detector
 
 
 class AnswerUseCase:
@@ -17,6 +18,7 @@ class AnswerUseCase:
         self._question_repo = question_repo
         self._answer_repo = answer_repo
 
+    @query_detector.track("AnswerUseCase.process_user_answer")
     async def process_user_answer(
         self, question_id: int, user_tg_id: int, text: str = ""
     ) -> tuple[UserDto, QuestionDto, AnswerDto] | None:
@@ -1,9 +1,49 @@
+import time
+
+from enum import StrEnum
+from typing import NamedTuple
+from uuid import UUID
+
+from redis import RedisError
+
 from app.apps.interview.dto.question import QuestionDto
 from app.apps.interview.entity.question import QuestionProtocol
+from app.apps.interview.repository.answer import AnswerRepositoryProtocol
 from app.apps.interview.repository.question import QuestionRepositoryProtocol
+from app.apps.interview.repository.question_cache import (
+    QuestionCacheRepositoryProtocol,
+)
 from app.apps.interview.repository.user_question import UserQuestionRepositoryProtocol
 from app.apps.user.repository.user import UserRepositoryProtocol
 from app.tools.cache import CacheServiceProtocol
+from app.tools.repository.sql_alchemy.query_detector import query_detector
+
+
+# Количество последних оценок для целевой сложности
+SCORES_WINDOW = 10
+# Количество кандидатов при выборе вопроса по сложности
+COMPLEXITY_CANDIDATES = 8
+
+
+class QuestionSource(StrEnum):
+    UNSEEN = "unseen"
+    REVIEW = "review"
+    ANY = "any"
+
+
+class ChosenQuestion(NamedTuple):
+    question: QuestionDto | None
+    source: QuestionSource
+
+
+class SeenQuestionsCheck(NamedTuple):
+    built: bool
+    missing: list[int]
+    extra: list[int]
+
+    @property
+    def consistent(self) -> bool:
+        return self.built and not self.missing and not self.extra
 
 
 class QuestionUseCase:
@@ -13,23 +53,159 @@ class QuestionUseCase:
         cache_service: CacheServiceProtocol,
         user_repo: UserRepositoryProtocol,
         question_repo: QuestionRepositoryProtocol,
+        question_cache_repo: QuestionCacheRepositoryProtocol,
         user_question_repo: UserQuestionRepositoryProtocol,
+        answer_repo: AnswerRepositoryProtocol | None = None,
     ):
         self._question_entity = question_entity
         self._cache_service = cache_service
         self._user_repo = user_repo
         self._question_repo = question_repo
+        self._question_cache_repo = question_cache_repo
         self._user_question_repo = user_question_repo
+        self._answer_repo = answer_repo
 
+    @query_detector.track("QuestionUseCase.get_question_training")
     async def get_question_training(self, user_tg_id: int) -> QuestionDto | None:
-        """Возвращает вопрос для тренировки по конкретным технологиям"""
-        user = await self._user_repo.find_user(tg_id=user_tg_id)
-        if not user:
+        """
+        Возвращает вопрос для тренировки по конкретным технологиям.
+
+        Пользователь, его стек и последний вопрос читаются из кэша одним
+        обращением. Если пользователя в кэше нет, он загружается из базы и
+        сохраняется в кэш вместе с user_id для следующих запросов.
+
+        Запись UserQuestion создается только для вопроса, который
+        пользователю еще не выдавался. Для вопроса из очереди повторения и
+        повторно выданного вопроса обновляется только последний вопрос
+        пользователя, по нему оценка ответа попадает в состояние повторения.
+        """
+        if not user_tg_id:
             return None
-        stack = await self._cache_service.get_stack(user.id) or ["python"]
-        questions = await self._question_repo.get_questions_for_user(user.id, stack)
-        question = self._question_entity.get_random_question(questions)
+        context = await self._cache_service.get_user_context(user_tg_id)
+        user = context.user
+        stack = context.stack
+        if user is None:
+            user = await self._user_repo.find_user(tg_id=user_tg_id)
+            if not user:
+                return None
+            stack = stack or await self._cache_service.get_stack(user.id)
+            await self._cache_service.set_user_context(user)
+        stack = stack or ["python"]
+        try:
+            question, source = await self._choose_question(user.id, stack)
+        except (RedisError, OSError):
+            questions = await self._question_repo.sample_question_for_user(
+                user.id, stack
+            )
+            question = self._question_entity.get_random_question(questions)
+            source = QuestionSource.UNSEEN
+            if question and await self._user_question_repo.find(user.id, question.id):
+                # выборка дополняется выданными вопросами, если невыданных нет
+                source = QuestionSource.ANY
         if question:
-            await self._user_question_repo.create_object(user.id, question.id)
+            if source == QuestionSource.UNSEEN:
+                await self._user_question_repo.create_object(user.id, question.id)
             await self._cache_service.set_user_last_question(user.id, question.id)
         return question
+
+    async def _choose_question(self, user_id: UUID, stack: list[str]) -> ChosenQuestion:
+        """
+        Выбирает вопрос по пулам вопросов технологий в Redis.
+
+        Из базы загружается только выбранный вопрос. Недостающие пулы и
+        карта выданных пользователю вопросов строятся из базы один раз,
+        дальше карта обновляется после коммита создания UserQuestion.
+
+        Порядок выбора: вопрос из очереди повторения, срок которого наступил,
+        затем невыданный вопрос стека, затем ближайший вопрос очереди
+        повторения, затем любой вопрос стека. Очередь повторения не
+        фильтруется по текущему стеку пользователя. Если передан
+        answer_repo, невыданный вопрос выбирается с весом по сложности.
+        В source возвращается, откуда взят вопрос.
+        """
+        choice = await self._question_cache_repo.choose_question(user_id, stack)
+        if not choice.complete:
+            if choice.missing_pools:
+                pools = await self._question_repo.get_question_pools(
+                    choice.missing_pools
+                )
+                await self._question_cache_repo.set_question_pools(pools)
+            if not choice.seen_loaded:
+                seen = await self._user_question_repo.get_question_ids(user_id)
+                await self._question_cache_repo.set_seen_questions(user_id, seen)
+            choice = await self._question_cache_repo.choose_question(user_id, stack)
+        question_id = choice.question_id
+        source = QuestionSource.UNSEEN
+        if choice.review and (choice.review[1] <= time.time() or choice.all_seen):
+            question_id = choice.review[0]
+            source = QuestionSource.REVIEW
+        elif choice.all_seen:
+            question_id = await self._question_cache_repo.choose_any_question(
+                user_id, stack
+            )
+            source = QuestionSource.ANY
+        elif question_id is not None and self._answer_repo is not None:
+            question_id = (
+                await self._choose_by_complexity(user_id, stack) or question_id
+            )
+        if question_id is None:
+            return ChosenQuestion(None, source)
+        question = await self._question_repo.find_question(question_id)
+        if question is None:
+            # вопрос удален после построения пулов
+            await self._question_cache_repo.delete_question_pools()
+        return ChosenQuestion(question, source)
+
+    async def _choose_by_complexity(
+        self, user_id: UUID, stack: list[str]
+    ) -> int | None:
+        """
+        Выбирает невыданный вопрос стека с весом по сложности.
+
+        Целевая сложность считается по последним оценкам пользователя.
+        Корзины вопросов технологий загружаются из базы один раз, после
+        изменений вопросов перечитываются только измененные. Выданные
+        кандидаты отсеиваются одним запросом к Redis; если выданы все -
+        None, и вопрос выбирается без учета сложности.
+        """
+        sampler = self._question_entity.sampler
+        missing = sampler.missing(stack)
+        if missing:
+            rows = await self._question_repo.get_question_complexities(
+                technologies=missing
+            )
+            sampler.load(missing, rows)
+        if sampler.pending:
+            pending = set(sampler.pending)
+            rows = await self._question_repo.get_question_complexities(
+                question_ids=pending
+            )
+            sampler.update(pending, rows)
+        scores = await self._answer_repo.get_last_scores(user_id, SCORES_WINDOW)
+        target = self._question_entity.get_target_complexity(scores)
+        candidates = sampler.sample(stack, target, k=COMPLEXITY_CANDIDATES)
+        unseen = await self._question_cache_repo.filter_unseen_questions(
+            user_id, candidates
+        )
+        return unseen[0] if unseen else None
+
+    async def check_seen_questions(
+        self, user_id: UUID, repair: bool = True
+    ) -> SeenQuestionsCheck:
+        """
+        Сверяет карту выданных вопросов в Redis с таблицей user_question.
+
+        missing - вопросы из таблицы, которых нет в карте, extra - вопросы
+        карты, которых нет в таблице (например, после удаления записей).
+        При repair карта с расхождениями перестраивается из таблицы.
+        """
+        stored = await self._question_cache_repo.get_seen_questions(user_id)
+        actual = set(await self._user_question_repo.get_question_ids(user_id))
+        check = SeenQuestionsCheck(
+            built=stored is not None,
+            missing=sorted(actual - set(stored or [])),
+            extra=sorted(set(stored or []) - actual),
+        )
+        if repair and not check.consistent:
+            await self._question_cache_repo.set_seen_questions(user_id, sorted(actual))
+        return check
@@ -0,0 +1,90 @@
+from collections.abc import Iterable, Sequence
+from uuid import UUID
+
+from app.apps.interview.dto.answer import AnswerScore
+from app.apps.interview.entity.review import ReviewState, replay, review
+from app.apps.interview.repository.answer import AnswerRepositoryProtocol
+from app.apps.interview.repository.question_cache import (
+    QuestionCacheRepositoryProtocol,
+)
+
+
+class ReviewUseCase:
+    """
+    Планирование повторения вопросов по алгоритму SM-2.
+
+    Состояние повторения каждого вопроса пользователем и срок следующего
+    повторения хранятся в кэше: срок - в очереди пользователя (sorted set),
+    поэтому выбор ближайшего вопроса не требует перебора каталога.
+    """
+
+    def __init__(
+        self,
+        question_cache_repo: QuestionCacheRepositoryProtocol,
+        answer_repo: AnswerRepositoryProtocol,
+    ):
+        self._question_cache_repo = question_cache_repo
+        self._answer_repo = answer_repo
+
+    async def record(self, scores: Sequence[AnswerScore]) -> list[ReviewState]:
+        """Планирует следующее повторение вопросов по новым оценкам"""
+        if not scores:
+            return []
+        states = await self._question_cache_repo.get_review_states(
+            [(score.user_id, score.question_id) for score in scores]
+        )
+        new_states = [
+            review(state, score.score, score.answered_at.timestamp())
+            for score, state in zip(scores, states, strict=True)
+        ]
+        await self._question_cache_repo.set_review_states(
+            [
+                (score.user_id, score.question_id, state)
+                for score, state in zip(scores, new_states, strict=True)
+            ]
+        )
+        return new_states
+
+    async def reschedule(
+        self, user_ids: Iterable[UUID] | None = None, batch_size: int = 1000
+    ) -> int:
+        """
+        Пересчитывает очереди повторения по всей истории оценок.
+
+        Нужен после задачи переоценки ответов: состояния пользователей
+        строятся заново проигрыванием их оценок по времени и записываются
+        пачками не меньше batch_size вопросов, при этом все вопросы одного
+        пользователя попадают в одну пачку.
+
+        Returns:
+            int: Количество пересчитанных пар пользователь-вопрос.
+        """
+        count = 0
+        pending: list[tuple[UUID, int, ReviewState]] = []
+        history: dict[tuple[UUID, int], list[tuple[int, float]]] = {}
+        user_id = None
+
+        def flush_user() -> None:
+            for (user, question_id), scores in history.items():
+                pending.append((user, question_id, replay(scores)))
+            history.clear()
+
+        async for batch in self._answer_repo.stream_scores(user_ids, batch_size):
+            for score in batch:
+                if score.user_id != user_id:
+                    flush_user()
+                    user_id = score.user_id
+                    if len(pending) >= batch_size:
+                        await self._question_cache_repo.set_review_states(
+                            pending, replace=True
+                        )
+                        count += len(pending)
+                        pending = []
+                history.setdefault((score.user_id, score.question_id), []).append(
+                    (score.score, score.answered_at.timestamp())
+                )
+        flush_user()
+        if pending:
+            await self._question_cache_repo.set_review_states(pending, replace=True)
+            count += len(pending)
+        return count
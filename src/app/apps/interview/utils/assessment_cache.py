@@ -0,0 +1,56 @@
+from typing import NamedTuple
+
+from app.tools.local_cache import LocalCache
+from core.config import config
+
+
+class CachedAssessment(NamedTuple):
+    """Оценка из кэша и время запроса к LLM, за которое она получена"""
+
+    text: str
+    score: int
+    llm_seconds: float
+
+
+class AssessmentCache:
+    """
+    Кэш оценок LLM по содержимому ответа.
+
+    Ключ - хеш вопроса, нормализованного текста ответа и параметров
+    запроса (см. ai_assessment.get_assessment_key), поэтому одинаковые
+    ответы разных пользователей получают одну оценку без запроса к LLM.
+    Хранится в памяти процесса в LocalCache: не больше maxsize оценок,
+    вытесняются давно не использованные, каждая живет ttl секунд.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60 * 60 * 24):
+        self._cache = LocalCache(
+            maxsize=maxsize, ttl=ttl, family=lambda key: "assessment"
+        )
+        self.saved_seconds = 0.0
+
+    def get(self, key: str) -> CachedAssessment | None:
+        """Возвращает оценку по ключу и учитывает сэкономленное время LLM"""
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.saved_seconds += cached.llm_seconds
+        return cached
+
+    def set(self, key: str, text: str, score: int, llm_seconds: float) -> None:
+        self._cache.set(key, CachedAssessment(text, score, llm_seconds))
+
+    def snapshot(self) -> dict:
+        """Попадания, промахи, доля попаданий, размер и сэкономленные секунды LLM"""
+        stats = self._cache.stats().get("assessment", {"hits": 0, "misses": 0})
+        total = stats["hits"] + stats["misses"]
+        return {
+            **stats,
+            "hit_rate": stats["hits"] / total if total else 0.0,
+            "size": len(self._cache),
+            "saved_llm_seconds": self.saved_seconds,
+        }
+
+
+assessment_cache = AssessmentCache(
+    maxsize=config.ai.ASSESSMENT_CACHE_SIZE, ttl=config.ai.ASSESSMENT_CACHE_TTL
+)
@@ -0,0 +1,69 @@
+import time
+
+from enum import StrEnum
+
+
+class BreakerState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Автоматический выключатель запросов к внешнему сервису.
+
+    В состоянии CLOSED запросы проходят. После failure_threshold неудач
+    подряд выключатель переходит в OPEN: запросы сразу отклоняются, не
+    занимая соединения и не дожидаясь таймаутов. Через recovery_timeout
+    секунд пропускается один пробный запрос (HALF_OPEN): успех закрывает
+    выключатель, неудача снова открывает его. Если пробный запрос не
+    завершился за recovery_timeout, пропускается следующий.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30):
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._changed_at = time.monotonic()
+        self._opened = 0
+
+    @property
+    def state(self) -> BreakerState:
+        return self._state
+
+    def allow(self) -> bool:
+        """Можно ли отправить запрос сейчас"""
+        if self._state == BreakerState.CLOSED:
+            return True
+        now = time.monotonic()
+        if now - self._changed_at < self._recovery_timeout:
+            return False
+        self._state = BreakerState.HALF_OPEN
+        self._changed_at = now
+        return True
+
+    def record_success(self) -> None:
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == BreakerState.OPEN:
+            return
+        if (
+            self._state == BreakerState.HALF_OPEN
+            or self._failures >= self._failure_threshold
+        ):
+            self._opened += 1
+            self._state = BreakerState.OPEN
+            self._changed_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        """Состояние, неудачи подряд и число открытий"""
+        return {
+            "state": self._state.value,
+            "failures": self._failures,
+            "opened": self._opened,
+        }
@@ -1,31 +1,314 @@
-from typing import Protocol
+import asyncio
+import json
+import random
+
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+from typing import Protocol, TypeVar
+from uuid import UUID
 
 import aiohttp
 
+from app.apps.interview.entity.ai_assessment import Priority
+from app.apps.interview.utils.circuit_breaker import CircuitBreaker
+from core.config import config
+from tools.sentry import sentry_message
+
+
+T = TypeVar("T")
+
+# Ошибки соединения и ответы 5xx повторяются: оценка ответа не меняет
+# состояние сервиса, поэтому повтор запроса безопасен
+RETRY_ERRORS = (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, TimeoutError)
+
+
+class ServerError(Exception):
+    """Сервис LLM ответил статусом 5xx"""
+
 
 class RequestServiceProtocol(Protocol):
     def __init__(self, url: str):
         """Инициализирует сервис запросов"""
         pass
 
-    async def send_request_llm(self, data: dict) -> dict | None:
+    async def send_request_llm(
+        self,
+        data: dict,
+        user_id: UUID | None = None,
+        priority: Priority = Priority.DEFAULT,
+    ) -> dict | None:
         """Отправляет запрос к сервису и получает ответ"""
         pass
 
+    def stream_request_llm(
+        self,
+        data: dict,
+        user_id: UUID | None = None,
+        priority: Priority = Priority.DEFAULT,
+    ) -> AsyncIterator[dict]:
+        """Отправляет запрос к сервису и возвращает события ответа"""
+        pass
+
+    async def close(self):
+        """Закрывает соединения с сервисом"""
+        pass
+
 
 class RequestService:
-    def __init__(self, url: str):
+    """
+    HTTP-клиент к сервису LLM с пулом keep-alive соединений.
+
+    Одна сессия aiohttp создается при первом запросе и используется всеми
+    запросами, поэтому TCP/TLS-соединения переиспользуются. Число
+    соединений ограничено limit (всего) и limit_per_host (на хост), лишние
+    запросы ждут свободного соединения в очереди коннектора. Адреса хостов
+    кэшируются на dns_ttl секунд.
+
+    connect_timeout - время на получение соединения (включая ожидание в
+    очереди пула и DNS), read_timeout - время ожидания данных от сервиса
+    между чтениями (ответ LLM может генерироваться долго, поэтому общего
+    ограничения нет). При остановке приложения нужно вызвать close() -
+    дождаться закрытия соединений.
+
+    Запрос ограничен бюджетом deadline секунд на все попытки вместе.
+    Ошибки соединения и ответы 5xx повторяются до retries раз с паузой
+    со случайным разбросом (full jitter) от 0 до backoff * 2^попытки, но
+    не больше backoff_max; повтор, который не успевает до конца бюджета,
+    не делается. Неудачи считает breaker: при недоступном сервисе запросы
+    сразу получают None, не дожидаясь таймаутов. Потоковый запрос
+    повторяется только до получения ответа - обрыв потока передается
+    вызывающему. Счетчики и состояние breaker возвращает snapshot().
+    """
+
+    def __init__(
+        self,
+        url: str,
+        limit: int = 100,
+        limit_per_host: int = 100,
+        connect_timeout: float = 10,
+        read_timeout: float = 120,
+        dns_ttl: int = 300,
+        keepalive_timeout: float = 30,
+        deadline: float = 180,
+        retries: int = 2,
+        backoff: float = 0.5,
+        backoff_max: float = 5,
+        breaker: CircuitBreaker | None = None,
+    ):
         self._url = url
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._timeout = aiohttp.ClientTimeout(
+            total=None, connect=connect_timeout, sock_read=read_timeout
+        )
+        self._dns_ttl = dns_ttl
+        self._keepalive_timeout = keepalive_timeout
+        self._session: aiohttp.ClientSession | None = None
+        self._deadline = deadline
+        self._retries = retries
+        self._backoff = backoff
+        self._backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self._counters = {"requests": 0, "retries": 0, "failed": 0, "rejected": 0}
 
-    async def send_request_llm(self, data: dict) -> dict | None:
-        """Отправляет запрос к сервису и получает ответ"""
-        async with (
-            aiohttp.ClientSession() as session,
-            session.post(
-                self._url, json=data, headers={"Content-Type": "application/json"}
-            ) as response,
-        ):
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Сессия с пулом соединений, создается при первом обращении"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._limit,
+                limit_per_host=self._limit_per_host,
+                ttl_dns_cache=self._dns_ttl,
+                keepalive_timeout=self._keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self._timeout,
+                headers={"Content-Type": "application/json"},
+            )
+        return self._session
+
+    async def send_request_llm(
+        self,
+        data: dict,
+        user_id: UUID | None = None,
+        priority: Priority = Priority.DEFAULT,
+    ) -> dict | None:
+        """
+        Отправляет запрос к сервису и получает ответ.
+
+        None - если ответ не в JSON или его не удалось получить за бюджет
+        запроса. user_id и priority нужны планировщику запросов, здесь не
+        используются.
+        """
+
+        async def attempt() -> dict | None:
+            async with self.session.post(self._url, json=data) as response:
+                self._check_status(response)
+                try:
+                    return await response.json()
+                except aiohttp.ContentTypeError:
+                    return None
+
+        return await self._retry(attempt)
+
+    async def stream_request_llm(
+        self,
+        data: dict,
+        user_id: UUID | None = None,
+        priority: Priority = Priority.DEFAULT,
+    ) -> AsyncIterator[dict]:
+        """
+        Отправляет запрос с stream=True и возвращает события ответа по мере
+        получения.
+
+        Ответ text/event-stream разбирается как SSE: данные каждого события -
+        JSON с приращением текста, поток заканчивается событием [DONE].
+        Если сервис вернул обычный JSON, он возвращается одним событием.
+        Если ответ не получен, событий нет; обрыв потока или конец бюджета
+        во время чтения передаются исключением.
+        """
+        deadline = asyncio.get_running_loop().time() + self._deadline
+
+        async def attempt() -> aiohttp.ClientResponse:
+            response = await self.session.post(self._url, json={**data, "stream": True})
             try:
-                return await response.json()
-            except aiohttp.ClientError:
+                self._check_status(response)
+            except ServerError:
+                response.release()
+                raise
+            return response
+
+        response = await self._retry(attempt, deadline)
+        if response is None:
+            return
+        async with response:
+            if response.content_type != "text/event-stream":
+                try:
+                    async with asyncio.timeout_at(deadline):
+                        chunk = await response.json()
+                except aiohttp.ClientError:
+                    return
+                yield chunk
+                return
+            events = iter_sse_data(response.content)
+            while True:
+                try:
+                    async with asyncio.timeout_at(deadline):
+                        event = await anext(events)
+                except StopAsyncIteration:
+                    return
+                except RETRY_ERRORS:
+                    self._counters["failed"] += 1
+                    self.breaker.record_failure()
+                    raise
+                if event == "[DONE]":
+                    return
+                try:
+                    yield json.loads(event)
+                except ValueError:
+                    continue
+
+    async def _retry(
+        self, attempt: Callable[[], Awaitable[T]], deadline: float | None = None
+    ) -> T | None:
+        """
+        Выполняет попытку с повторами в пределах бюджета запроса.
+
+        None - если выключатель открыт или попытки закончились.
+        """
+        loop = asyncio.get_running_loop()
+        if deadline is None:
+            deadline = loop.time() + self._deadline
+        self._counters["requests"] += 1
+        for retry in range(self._retries + 1):
+            if not self.breaker.allow():
+                self._counters["rejected"] += 1
                 return None
+            try:
+                async with asyncio.timeout_at(deadline):
+                    result = await attempt()
+            except (ServerError, *RETRY_ERRORS) as err:
+                self.breaker.record_failure()
+                error = err
+            else:
+                self.breaker.record_success()
+                return result
+            delay = random.uniform(0, min(self._backoff * 2**retry, self._backoff_max))
+            if retry == self._retries or loop.time() + delay >= deadline:
+                break
+            self._counters["retries"] += 1
+            await asyncio.sleep(delay)
+        self._counters["failed"] += 1
+        sentry_message(
+            message=f"Сервис LLM не ответил: {error!r}",
+            level="error",
+            title="RequestService",
+        )
+        return None
+
+    @staticmethod
+    def _check_status(response: aiohttp.ClientResponse) -> None:
+        if response.status >= 500:
+            raise ServerError(f"HTTP {response.status}")
+
+    def snapshot(self) -> dict:
+        """
+        Счетчики запросов: requests - запросы, retries - повторы, failed -
+        запросы без ответа, rejected - отклоненные выключателем, и
+        состояние выключателя.
+        """
+        return {**self._counters, "breaker": self.breaker.snapshot()}
+
+    async def close(self):
+        """Закрывает сессию, дожидаясь закрытия соединений пула"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self) -> "RequestService":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+async def iter_sse_data(lines: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """
+    Возвращает данные событий SSE из строк ответа.
+
+    Строки data: одного события объединяются через перевод строки, событие
+    заканчивается пустой строкой. Комментарии и остальные поля
+    пропускаются.
+    """
+    data: list[str] = []
+    async for raw_line in lines:
+        line = raw_line.decode().rstrip("\r\n")
+        if not line:
+            if data:
+                yield "\n".join(data)
+                data = []
+            continue
+        field, _, value = line.partition(":")
+        if field == "data":
+            data.append(value.removeprefix(" "))
+    if data:
+        yield "\n".join(data)
+
+
+llm_request_service = RequestService(
+    url=config.ai.SERVICE_URL,
+    limit=config.ai.POOL_LIMIT,
+    limit_per_host=config.ai.POOL_LIMIT_PER_HOST,
+    connect_timeout=config.ai.CONNECT_TIMEOUT,
+    read_timeout=config.ai.READ_TIMEOUT,
+    dns_ttl=config.ai.DNS_TTL,
+    keepalive_timeout=config.ai.KEEPALIVE_TIMEOUT,
+    deadline=config.ai.DEADLINE,
+    retries=config.ai.RETRIES,
+    backoff=config.ai.BACKOFF,
+    backoff_max=config.ai.BACKOFF_MAX,
+    breaker=CircuitBreaker(
+        failure_threshold=config.ai.BREAKER_THRESHOLD,
+        recovery_timeout=config.ai.BREAKER_RECOVERY_TIMEOUT,
+    ),
+)
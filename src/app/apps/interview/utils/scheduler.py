@@ -0,0 +1,193 @@
+import asyncio
+import time
+
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Hashable
+from contextlib import asynccontextmanager
+from uuid import UUID
+
+from app.apps.interview.entity.ai_assessment import Priority
+from app.apps.interview.utils.request_service import (
+    RequestServiceProtocol,
+    llm_request_service,
+)
+from app.tools.metrics import Histogram
+from core.config import config
+
+
+class AssessmentQueueFull(Exception):
+    """Очередь запросов к LLM заполнена"""
+
+
+class AssessmentScheduler:
+    """
+    Планировщик запросов к сервису LLM.
+
+    Реализует RequestServiceProtocol поверх другого сервиса запросов:
+    одновременно выполняется не больше max_concurrency запросов (поток
+    SSE занимает место до конца ответа), остальные ждут в очереди.
+
+    Очередь ограничена max_queue запросами: если она заполнена, запрос
+    сразу получает AssessmentQueueFull, а не ждет - вызывающий может
+    попросить пользователя повторить позже. Запрос, прождавший дольше
+    queue_timeout секунд, получает TimeoutError.
+
+    Освободившееся место отдается классу с наименьшим Priority, внутри
+    класса - пользователям по кругу, поэтому пользователь с пачкой
+    ответов не задерживает остальных. Приоритет строгий: запросы класса
+    DEFAULT ждут, пока в очереди есть SUBSCRIBED.
+    """
+
+    def __init__(
+        self,
+        request_service: RequestServiceProtocol,
+        max_concurrency: int = 16,
+        max_queue: int = 1000,
+        queue_timeout: float | None = 60,
+    ):
+        self._request_service = request_service
+        self._max_concurrency = max_concurrency
+        self._max_queue = max_queue
+        self._queue_timeout = queue_timeout
+        self._active = 0
+        self._queued = 0
+        # класс приоритета -> пользователь -> ожидающие запросы пользователя
+        self._queues: dict[Priority, OrderedDict[Hashable, deque]] = {
+            priority: OrderedDict() for priority in Priority
+        }
+        self._wait_ms = {priority: Histogram() for priority in Priority}
+        self._counters = {"submitted": 0, "rejected": 0, "timed_out": 0}
+
+    async def send_request_llm(
+        self,
+        data: dict,
+        user_id: UUID | None = None,
+        priority: Priority = Priority.DEFAULT,
+    ) -> dict | None:
+        """Отправляет запрос к сервису, дождавшись очереди"""
+        async with self.slot(user_id, priority):
+            return await self._request_service.send_request_llm(data)
+
+    async def stream_request_llm(
+        self,
+        data: dict,
+        user_id: UUID | None = None,
+        priority: Priority = Priority.DEFAULT,
+    ) -> AsyncIterator[dict]:
+        """
+        Отправляет потоковый запрос к сервису, дождавшись очереди.
+
+        Место освобождается в finally без await, поэтому оно возвращается и
+        когда поток брошен без aclose и закрывается при сборке генератора.
+        """
+        await self.acquire(user_id, priority)
+        try:
+            async for chunk in self._request_service.stream_request_llm(data):
+                yield chunk
+        finally:
+            self.release()
+
+    async def close(self):
+        await self._request_service.close()
+
+    @asynccontextmanager
+    async def slot(
+        self, user_id: Hashable = None, priority: Priority = Priority.DEFAULT
+    ) -> AsyncIterator[None]:
+        """Занимает место для запроса на время блока"""
+        await self.acquire(user_id, priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(
+        self, user_id: Hashable = None, priority: Priority = Priority.DEFAULT
+    ) -> None:
+        """
+        Ждет свободного места для запроса.
+
+        Raises:
+            AssessmentQueueFull: Очередь заполнена.
+            TimeoutError: Место не освободилось за queue_timeout секунд.
+        """
+        self._counters["submitted"] += 1
+        if self._active < self._max_concurrency and not self._queued:
+            self._active += 1
+            self._wait_ms[priority].record(0)
+            return
+        if self._queued >= self._max_queue:
+            self._counters["rejected"] += 1
+            raise AssessmentQueueFull(
+                f"Очередь запросов к LLM заполнена: {self._queued} запросов"
+            )
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues[priority].setdefault(user_id, deque()).append(waiter)
+        self._queued += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self._queue_timeout)
+        except BaseException as err:
+            if waiter.done() and not waiter.cancelled():
+                # место выдано одновременно с отменой - возвращаем его
+                self.release()
+            else:
+                waiter.cancel()
+                self._remove(priority, user_id, waiter)
+            if isinstance(err, TimeoutError):
+                self._counters["timed_out"] += 1
+            raise
+        self._wait_ms[priority].record((time.perf_counter() - start) * 1000)
+
+    def release(self) -> None:
+        """Освобождает место и отдает его следующему запросу очереди"""
+        self._active -= 1
+        for users in self._queues.values():
+            if not users:
+                continue
+            user_id, waiters = next(iter(users.items()))
+            waiter = waiters.popleft()
+            if waiters:
+                users.move_to_end(user_id)
+            else:
+                del users[user_id]
+            self._queued -= 1
+            self._active += 1
+            waiter.set_result(None)
+            return
+
+    def _remove(self, priority: Priority, user_id: Hashable, waiter) -> None:
+        waiters = self._queues[priority].get(user_id)
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        self._queued -= 1
+        if not waiters:
+            del self._queues[priority][user_id]
+
+    def snapshot(self) -> dict:
+        """
+        Возвращает метрики: выполняемые запросы, глубину очереди по классам,
+        счетчики и время ожидания в очереди (мс) по классам.
+        """
+        return {
+            "active": self._active,
+            "queued": self._queued,
+            "queue_depth": {
+                priority.name.lower(): sum(len(waiters) for waiters in users.values())
+                for priority, users in self._queues.items()
+            },
+            **self._counters,
+            "wait_ms": {
+                priority.name.lower(): histogram.snapshot()
+                for priority, histogram in self._wait_ms.items()
+            },
+        }
+
+
+llm_scheduler = AssessmentScheduler(
+    request_service=llm_request_service,
+    max_concurrency=config.ai.MAX_CONCURRENCY,
+    max_queue=config.ai.MAX_QUEUE,
+    queue_timeout=config.ai.QUEUE_TIMEOUT,
+)
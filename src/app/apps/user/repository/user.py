@@ -1,6 +1,9 @@
 from typing import Protocol
 
 from app.apps.user.dto.user import UserDto
+from app.tools.cache import CacheServiceProtocol, cache_service, user_key
+from app.tools.cache_aside import cached
+from app.tools.repository.sql_alchemy.invalidation import Change, invalidation_registry
 from app.tools.repository.sql_alchemy.sql_alchemy import SQLAlchemyRepository
 from app.tools.repository.sql_alchemy.sql_alchemy_v2 import SARepository
 from model.user import User
@@ -41,9 +44,25 @@ class SQLAlchemyUserRepositoryV1(SQLAlchemyRepository):
 class SAUserRepositoryV2(SARepository):
     model = User
 
+    @cached(key="repo:user:{tg_id}", dto=UserDto, ttl=60 * 5)
     async def find_user(self, tg_id: int) -> UserDto | None:
         """Возвращает пользователя по tg_id"""
         if not tg_id:
             return None
-        user: UserDto = await self.query(self.model).find(tg_id=tg_id, dto=UserDto)
+        user: UserDto = await self.loader(self.model, "tg_id", UserDto).load(tg_id)
         return user
+
+
+@invalidation_registry.on(User, cache=cache_service)
+async def invalidate_user_cache(changes: list[Change], cache: CacheServiceProtocol):
+    """Сбрасывает кэш пользователей после коммита изменений"""
+    tg_ids = {change.values.get("tg_id") for change in changes} - {None}
+    keys = [
+        key
+        for tg_id in tg_ids
+        for key in (
+            user_key(tg_id),
+            SAUserRepositoryV2.find_user.key_for(None, tg_id=tg_id),
+        )
+    ]
+    await cache.delete(*keys)
@@ -0,0 +1,44 @@
+import random
+
+from collections.abc import Sequence
+
+
+class AliasTable:
+    """
+    Таблица псевдонимов для выбора индекса с весами за O(1) (метод Воуза).
+
+    Строится за O(n): каждому индексу назначается вероятность и индекс-
+    псевдоним, после чего выбор - одна ячейка таблицы и одно сравнение,
+    без сортировки и прохода по весам.
+    """
+
+    __slots__ = ("_probabilities", "_aliases")
+
+    def __init__(self, weights: Sequence[float]):
+        total = sum(weights)
+        if not weights or total <= 0 or min(weights) < 0:
+            raise ValueError("Веса должны быть неотрицательными с суммой больше 0")
+        size = len(weights)
+        scaled = [weight * size / total for weight in weights]
+        self._probabilities = [1.0] * size
+        self._aliases = list(range(size))
+        small = [index for index, weight in enumerate(scaled) if weight < 1]
+        large = [index for index, weight in enumerate(scaled) if weight >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._probabilities[less] = scaled[less]
+            self._aliases[less] = more
+            scaled[more] -= 1 - scaled[less]
+            (small if scaled[more] < 1 else large).append(more)
+        # оставшиеся индексы из-за погрешности округления имеют вес 1
+
+    def __len__(self) -> int:
+        return len(self._probabilities)
+
+    def sample(self, rng: random.Random | None = None) -> int:
+        """Возвращает индекс с вероятностью, пропорциональной его весу"""
+        rng = rng or random
+        index = rng.randrange(len(self._probabilities))
+        if rng.random() < self._probabilities[index]:
+            return index
+        return self._aliases[index]
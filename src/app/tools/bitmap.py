@@ -0,0 +1,28 @@
+from collections.abc import Iterable
+
+
+def to_bitmap(offsets: Iterable[int]) -> bytes:
+    """
+    Возвращает битовую карту с установленными битами offsets.
+
+    Порядок битов как в Redis (SETBIT/GETBIT): бит 0 - старший бит
+    первого байта.
+    """
+    offsets = list(offsets)
+    if not offsets:
+        return b""
+    data = bytearray(max(offsets) // 8 + 1)
+    for offset in offsets:
+        data[offset >> 3] |= 0x80 >> (offset & 7)
+    return bytes(data)
+
+
+def from_bitmap(data: bytes) -> list[int]:
+    """Возвращает номера установленных битов по возрастанию"""
+    return [
+        index * 8 + bit
+        for index, byte in enumerate(data)
+        if byte
+        for bit in range(8)
+        if byte & (0x80 >> bit)
+    ]
@@ -1,16 +1,70 @@
+import asyncio
 import json
 
-from typing import Protocol
-from uuid import UUID
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from typing import NamedTuple, Protocol
+from uuid import UUID, uuid4
 
 import redis.asyncio as redis
 
 from redis import RedisError
+from redis.asyncio.client import Pipeline
 
 from app.apps.user.dto.user import UserDto
+from app.tools.local_cache import LocalCache
+from app.tools.serializer import (
+    SERIALIZERS,
+    CompactSerializer,
+    SerializerProtocol,
+    VersionedCodec,
+)
 from core.config import config
 
 
+USER_TTL = 60 * 60 * 24 * 7
+STACK_TTL = 60 * 60 * 24 * 365
+LAST_QUESTION_TTL = 60 * 60 * 24 * 7 * 55
+INVALIDATION_CHANNEL = "cache:invalidate"
+# KEYS: пользователь и его user_id по tg_id. ARGV: шаблоны ключей стека и
+# последнего вопроса. Ключи по user_id строятся в скрипте, поэтому
+# пользователь, стек и последний вопрос читаются за одно обращение.
+USER_CONTEXT_LUA = """
+local user_id = redis.call("GET", KEYS[2])
+if not user_id then
+    return {redis.call("GET", KEYS[1]), false, false}
+end
+return redis.call(
+    "MGET",
+    KEYS[1],
+    string.format(ARGV[1], user_id),
+    string.format(ARGV[2], user_id)
+)
+"""
+
+
+class UserContext(NamedTuple):
+    user: UserDto | None
+    stack: list[str] | None
+    last_question: int | None
+
+
+def user_key(tg_id: int) -> str:
+    return f"user:{str(tg_id)}"
+
+
+def user_id_key(tg_id: int) -> str:
+    return f"user:{tg_id}:id"
+
+
+def stack_key(user_id: UUID) -> str:
+    return f"user_id:{user_id}:stack"
+
+
+def last_question_key(user_id: UUID) -> str:
+    return f"user_id:{user_id}:last_question"
+
+
 class CacheServiceProtocol(Protocol):
     def __init__(self, host: str, port: int, db: int):
         pass
@@ -23,8 +77,8 @@ class CacheServiceProtocol(Protocol):
         """Получает значение из кэша по ключу"""
         pass
 
-    async def delete(self, key: str):
-        """Удаляет значение из кэша по ключу"""
+    async def delete(self, *keys: str):
+        """Удаляет значения из кэша по ключам"""
         pass
 
     async def set_user(self, schema: UserDto):
@@ -51,10 +105,59 @@ class CacheServiceProtocol(Protocol):
         """Возвращает последний вопрос пользователя"""
         pass
 
+    def pipeline(self, transaction: bool = False) -> Pipeline:
+        """Возвращает конвейер команд"""
+        pass
+
+    async def mget(self, keys: Sequence[str], decode="utf-8") -> list[str | None]:
+        """Получает значения из кэша по списку ключей"""
+        pass
+
+    async def mset(self, mapping: dict[str, str], expire: int = 60):
+        """Устанавливает несколько значений в кэш"""
+        pass
+
+    async def get_user_context(self, tg_id: int) -> UserContext:
+        """Возвращает пользователя, его стек и последний вопрос по tg_id"""
+        pass
+
+    async def set_user_context(
+        self,
+        user: UserDto,
+        stack: list[str] | None = None,
+        last_question: int | None = None,
+    ):
+        """Сохраняет пользователя, его стек и последний вопрос"""
+        pass
+
 
 class Cache:
+    """
+    Кэш в Redis с необязательным уровнем L1 в памяти процесса.
+
+    Если передан local_cache, прочитанные из Redis значения сохраняются в
+    памяти процесса. Изменения ключей через set/delete/mset рассылаются
+    остальным процессам через канал INVALIDATION_CHANNEL, и те удаляют ключи
+    из своего L1. Пока подписка на канал не установлена, L1 не используется,
+    после потери подписки он очищается.
+
+    Значение, прочитанное из Redis, попадает в L1, только если ключ не
+    менялся, пока шел запрос: каждое изменение ключа (локальные set/delete
+    и сообщения других процессов) увеличивает версию ключа, и чтение
+    сравнивает версию до и после запроса. Версии хранятся только для
+    ключей, которые читаются в данный момент.
+
+    DTO хранятся через VersionedCodec: записи другой версии схемы DTO при
+    чтении считаются отсутствующими.
+    """
+
     def __init__(
-        self, host=config.redis.HOST, port=config.redis.PORT, db=config.redis.DB
+        self,
+        host=config.redis.HOST,
+        port=config.redis.PORT,
+        db=config.redis.DB,
+        local_cache: LocalCache | None = None,
+        serializer: SerializerProtocol | None = None,
     ):
         self.host = host
         self.port = port
@@ -63,77 +166,285 @@ class Cache:
             host=self.host, port=self.port, db=self.db
         )
         self.redis_cache = redis.StrictRedis(connection_pool=self.connection_pool)
+        self._user_context_script = self.redis_cache.register_script(USER_CONTEXT_LUA)
+        self.local_cache = local_cache
+        self.codec = VersionedCodec(serializer or CompactSerializer())
+        self.worker_id = uuid4().hex
+        self._subscribed = False
+        # ключ -> число идущих чтений и версия ключа за время этих чтений
+        self._reading: Counter[str] = Counter()
+        self._versions: dict[str, int] = {}
+        self._listener: asyncio.Task | None = None
 
-    async def set(self, key: str, value: str, expire: int = 60):
-        try:
-            await self.redis_cache.set(key, value, expire)
-        except RedisError:
+    def _get_local(self) -> LocalCache | None:
+        if self.local_cache is None:
+            return None
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return self.local_cache if self._subscribed else None
+
+    async def _listen(self):
+        """Слушает канал инвалидации и удаляет измененные ключи из L1"""
+        while True:
+            try:
+                async with self.redis_cache.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATION_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] == "subscribe":
+                            self._clear_local()
+                            self._subscribed = True
+                        elif message["type"] == "message":
+                            self._invalidate(message["data"])
+            except (RedisError, OSError):
+                pass
+            finally:
+                self._subscribed = False
+                self._clear_local()
+            await asyncio.sleep(1)
+
+    def _invalidate(self, data: bytes):
+        worker_id, *keys = data.decode().split(" ")
+        if worker_id == self.worker_id:
             return
+        self._bump(keys)
+        for key in keys:
+            self.local_cache.delete(key)
+
+    def _bump(self, keys: Iterable[str]):
+        """Отмечает изменение ключей для чтений, которые идут сейчас"""
+        for key in keys:
+            if key in self._reading:
+                self._versions[key] = self._versions.get(key, 0) + 1
+
+    def _end_reading(self, keys: Sequence[str], versions: dict[str, int]) -> set[str]:
+        """Завершает чтение ключей, возвращает ключи, измененные за время чтения"""
+        changed = set()
+        for key in keys:
+            if self._versions.get(key, 0) != versions[key]:
+                changed.add(key)
+            self._reading[key] -= 1
+            if self._reading[key] <= 0:
+                del self._reading[key]
+                self._versions.pop(key, None)
+        return changed
+
+    def _clear_local(self):
+        self._bump(list(self._reading))
+        self.local_cache.clear()
+
+    def _publish(self, pipe: Pipeline, keys: Sequence[str]):
+        if self.local_cache is not None:
+            pipe.publish(INVALIDATION_CHANNEL, " ".join([self.worker_id, *keys]))
+
+    def _set_local(self, key: str, value: str | bytes, expire: int):
+        local_cache = self._get_local()
+        if local_cache is not None:
+            value = value.encode() if isinstance(value, str) else value
+            local_cache.set(key, value, expire)
+
+    async def set(self, key: str, value: str, expire: int = 60):
+        await self._set_many([(key, value, expire)])
 
     async def get(self, key, decode="utf-8"):
-        res = await self.redis_cache.get(key)
+        res = (await self._get_many([key]))[0]
         if res:
             return res.decode(decode)
         return res
 
-    async def delete(self, key: str):
-        await self.redis_cache.delete(key)
+    async def get_raw(self, key: str) -> bytes | None:
+        """Получает значение из кэша по ключу без декодирования"""
+        [value] = await self._get_many([key])
+        return value
+
+    async def delete(self, *keys: str):
+        if not keys:
+            return
+        if self.local_cache is None:
+            await self.redis_cache.delete(*keys)
+            return
+        for key in keys:
+            self.local_cache.delete(key)
+        try:
+            async with self.pipeline() as pipe:
+                pipe.delete(*keys)
+                self._publish(pipe, keys)
+                await pipe.execute()
+        finally:
+            # чтение, начатое до удаления, не должно вернуть ключ в L1
+            self._bump(keys)
+
+    def local_stats(self) -> dict[str, dict[str, int]]:
+        """Возвращает попадания и промахи L1 по семействам ключей"""
+        if self.local_cache is None:
+            return {}
+        return self.local_cache.stats()
+
+    def pipeline(self, transaction: bool = False) -> Pipeline:
+        """
+        Возвращает конвейер команд.
+
+        Команды копятся на клиенте и отправляются одним запросом при
+        execute(), поэтому несколько операций стоят одного обращения к Redis.
+        """
+        return self.redis_cache.pipeline(transaction=transaction)
+
+    async def mget(self, keys: Sequence[str], decode="utf-8") -> list[str | None]:
+        """Получает значения из кэша по списку ключей за одно обращение"""
+        values = await self._get_many(keys)
+        return [value.decode(decode) if value else value for value in values]
+
+    async def _get_many(self, keys: Sequence[str]) -> list[bytes | None]:
+        if not keys:
+            return []
+        local_cache = self._get_local()
+        if local_cache is None:
+            if len(keys) == 1:
+                return [await self.redis_cache.get(keys[0])]
+            return await self.redis_cache.mget(keys)
+        values = {key: local_cache.get(key) for key in keys}
+        missing = [key for key, value in values.items() if value is None]
+        if missing:
+            versions = {key: self._versions.get(key, 0) for key in missing}
+            self._reading.update(missing)
+            try:
+                fetched = await self.redis_cache.mget(missing)
+            finally:
+                changed = self._end_reading(missing, versions)
+            for key, value in zip(missing, fetched, strict=True):
+                values[key] = value
+                # ключ мог измениться в этом или другом процессе, пока шел запрос
+                if value and key not in changed:
+                    local_cache.set(key, value)
+        return [values[key] for key in keys]
+
+    async def mset(self, mapping: dict[str, str], expire: int = 60):
+        """Устанавливает несколько значений с общим временем жизни"""
+        await self._set_many([(key, value, expire) for key, value in mapping.items()])
+
+    async def _set_many(self, items: list[tuple[str, str, int]]):
+        if not items:
+            return
+        try:
+            if self.local_cache is None and len(items) == 1:
+                await self.redis_cache.set(*items[0])
+                return
+            async with self.pipeline() as pipe:
+                for key, value, expire in items:
+                    pipe.set(key, value, expire)
+                self._publish(pipe, [key for key, _, _ in items])
+                await pipe.execute()
+        except RedisError:
+            if self.local_cache is not None:
+                self._bump([key for key, _, _ in items])
+                for key, _, _ in items:
+                    self.local_cache.delete(key)
+            return
+        # чтение, начатое до записи, не должно вернуть в L1 старое значение
+        self._bump([key for key, _, _ in items])
+        for key, value, expire in items:
+            self._set_local(key, value, expire)
+
+    @staticmethod
+    def _load_stack(value: str | None) -> list[str] | None:
+        if not value:
+            return None
+        stack: list[str] = json.loads(value)
+        return stack
+
+    @staticmethod
+    def _load_question(value: str | None) -> int | None:
+        if value:
+            return int(value)
+        return None
 
     async def set_user(self, user: UserDto):
-        user_dict = user.model_dump()
-        user_dict["created_at"] = user_dict["created_at"].strftime("%Y-%m-%d %H:%M:%S")
-        user_dict["updated_at"] = user_dict["updated_at"].strftime("%Y-%m-%d %H:%M:%S")
-        if user.subscription:
-            user_dict["subscription"] = user_dict["subscription"].strftime(
-                "%Y-%m-%d %H:%M:%S"
-            )
-        await self.set(
-            f"user:{str(user.tg_id)}",
-            json.dumps(user_dict),
-            60 * 60 * 24 * 7,
-        )
+        await self.set(user_key(user.tg_id), self.codec.dumps(user), USER_TTL)
 
     async def get_user(self, key: str) -> UserDto | None:
-        res = await self.get(key)
-        if res:
-            user = UserDto.model_validate(json.loads(res))
-            return user
-        return None
+        return self.codec.loads(await self.get_raw(key), UserDto)
 
     async def set_stack(self, user_id: UUID, stack: list[str]):
         """Сохраняет стек технологий пользователя"""
         if not user_id or not stack:
             return
-        key = f"user_id:{user_id}:stack"
-        await self.set(key, json.dumps(stack), 60 * 60 * 24 * 365)
+        await self.set(stack_key(user_id), json.dumps(stack), STACK_TTL)
 
     async def get_stack(self, user_id: UUID) -> list[str] | None:
         """Возвращает стек технологий пользователя"""
         if not user_id:
             return None
-        key = f"user_id:{user_id}:stack"
-        user_stack = await self.get(key)
-        if not user_stack:
-            return None
-        stack: list[str] = json.loads(user_stack)
-        return stack
+        return self._load_stack(await self.get(stack_key(user_id)))
 
     async def set_user_last_question(self, user_id: UUID, question_id: int):
         """Сохраняет последний вопрос пользователя"""
         if not user_id or not question_id:
             return
-        key = f"user_id:{user_id}:last_question"
-        ttl = 60 * 60 * 24 * 7 * 55
-        await self.set(key, str(question_id), ttl)
+        key = last_question_key(user_id)
+        await self.set(key, str(question_id), LAST_QUESTION_TTL)
 
     async def get_user_last_question(self, user_id: UUID) -> int | None:
         """Возвращает последний вопрос пользователя"""
         if not user_id:
             return None
-        key = f"user_id:{user_id}:last_question"
-        if question_id := await self.get(key):
-            return int(question_id)
-        return None
+        return self._load_question(await self.get(last_question_key(user_id)))
 
+    async def get_user_context(self, tg_id: int) -> UserContext:
+        """
+        Возвращает пользователя, его стек и последний вопрос по tg_id за
+        одно обращение к Redis.
 
-cache_service = Cache()
+        Стек и последний вопрос хранятся по user_id, поэтому set_user_context
+        сохраняет рядом с пользователем его user_id (user_id_key), а скрипт
+        USER_CONTEXT_LUA строит ключи по нему на стороне Redis. Если
+        пользователь есть в L1, стек и последний вопрос читаются через L1 и
+        MGET. Если user_id не сохранен, возвращается только пользователь.
+        """
+        local_cache = self._get_local()
+        cached = local_cache.get(user_key(tg_id)) if local_cache else None
+        user = self.codec.loads(cached, UserDto)
+        if user is not None:
+            stack, last_question = await self._get_many(
+                [stack_key(user.id), last_question_key(user.id)]
+            )
+        else:
+            cached, stack, last_question = await self._user_context_script(
+                keys=[user_key(tg_id), user_id_key(tg_id)],
+                args=[stack_key("%s"), last_question_key("%s")],
+            )
+            user = self.codec.loads(cached, UserDto)
+        return UserContext(
+            user=user,
+            stack=self._load_stack(stack),
+            last_question=self._load_question(last_question),
+        )
+
+    async def set_user_context(
+        self,
+        user: UserDto,
+        stack: list[str] | None = None,
+        last_question: int | None = None,
+    ):
+        """Сохраняет пользователя, его стек и последний вопрос одним запросом"""
+        items = [
+            (user_key(user.tg_id), self.codec.dumps(user), USER_TTL),
+            (user_id_key(user.tg_id), str(user.id), USER_TTL),
+        ]
+        if stack:
+            items.append((stack_key(user.id), json.dumps(stack), STACK_TTL))
+        if last_question:
+            items.append(
+                (last_question_key(user.id), str(last_question), LAST_QUESTION_TTL)
+            )
+        await self._set_many(items)
+
+
+cache_service = Cache(
+    local_cache=(
+        LocalCache(
+            maxsize=config.redis.LOCAL_CACHE_SIZE, ttl=config.redis.LOCAL_CACHE_TTL
+        )
+        if config.redis.LOCAL_CACHE_SIZE
+        else None
+    ),
+    serializer=SERIALIZERS[config.redis.SERIALIZER](),
+)
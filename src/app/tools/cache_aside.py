@@ -0,0 +1,142 @@
+import asyncio
+import contextlib
+import inspect
+import math
+import random
+import time
+
+from collections.abc import Awaitable, Callable
+from functools import wraps
+from typing import ParamSpec, TypeVar
+
+from pydantic import BaseModel
+from redis import RedisError
+
+from app.tools.cache import Cache, cache_service
+
+
+P = ParamSpec("P")
+M = TypeVar("M", bound=BaseModel)
+
+
+def _encode(expires_at: float, delta: float, payload: bytes) -> bytes:
+    return f"{expires_at:.3f}:{delta:.4f}|".encode() + payload
+
+
+def _decode(data: bytes) -> tuple[float, float, bytes] | None:
+    header, _, payload = data.partition(b"|")
+    expires_at, _, delta = header.partition(b":")
+    try:
+        return float(expires_at), float(delta), payload
+    except ValueError:
+        return None
+
+
+def _should_refresh(expires_at: float, delta: float, beta: float) -> bool:
+    """
+    Вероятностное досрочное обновление (XFetch).
+
+    Чем ближе истечение ключа и чем дольше считается значение (delta), тем
+    выше вероятность, что вызывающий пересчитает его заранее. Так горячий
+    ключ обновляет один из запросов, а не все одновременно после истечения.
+    """
+    return time.time() - delta * beta * math.log(1 - random.random()) >= expires_at
+
+
+def cached(
+    key: str,
+    dto: type[M],
+    ttl: int = 60,
+    negative_ttl: int | None = 30,
+    beta: float = 1.0,
+    cache: Cache | None = None,
+) -> Callable[[Callable[P, Awaitable[M | None]]], Callable[P, Awaitable[M | None]]]:
+    """
+    Кэширует результат асинхронного метода чтения в Redis (cache-aside).
+
+    Args:
+        key: Шаблон ключа с именами аргументов метода, например "user:{tg_id}".
+        dto: Класс DTO, который возвращает метод.
+        ttl: Время жизни найденного значения в секундах.
+        negative_ttl: Время жизни отметки "не найдено" в секундах,
+            None - отсутствие не кэшируется.
+        beta: Коэффициент досрочного обновления, 0 - отключено.
+        cache: Кэш, по умолчанию app.tools.cache.cache_service.
+
+    Пока значение пересчитывается, остальные вызовы с тем же ключом ждут
+    этот пересчет, а не идут в базу. Ошибки Redis не мешают чтению: значение
+    считается так же, как при промахе. У обернутой функции есть
+    invalidate(*args, **kwargs) для удаления ключа.
+
+    Если у репозитория открыта транзакция (in_transaction), кэш не
+    используется: чтение может видеть незафиксированные изменения, а при
+    откате сброса кэша не будет.
+    """
+
+    def decorator(
+        method: Callable[P, Awaitable[M | None]],
+    ) -> Callable[P, Awaitable[M | None]]:
+        signature = inspect.signature(method)
+        in_flight: dict[str, asyncio.Task] = {}
+
+        def get_cache() -> Cache:
+            return cache if cache is not None else cache_service
+
+        def get_key(*args, **kwargs) -> str:
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            return key.format(**arguments.arguments)
+
+        async def compute(cache_key: str, *args, **kwargs) -> M | None:
+            start = time.monotonic()
+            result = await method(*args, **kwargs)
+            delta = time.monotonic() - start
+            if result is None and negative_ttl is None:
+                return result
+            expire = ttl if result is not None else negative_ttl
+            payload = get_cache().codec.dumps(result) if result is not None else b""
+            with contextlib.suppress(RedisError, OSError):
+                await get_cache().set(
+                    cache_key, _encode(time.time() + expire, delta, payload), expire
+                )
+            return result
+
+        def single_flight(cache_key: str, *args, **kwargs) -> asyncio.Task:
+            task = in_flight.get(cache_key)
+            if task is None:
+                task = asyncio.ensure_future(compute(cache_key, *args, **kwargs))
+                in_flight[cache_key] = task
+                task.add_done_callback(lambda _: in_flight.pop(cache_key, None))
+            return task
+
+        @wraps(method)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> M | None:
+            if args and getattr(args[0], "in_transaction", False):
+                return await method(*args, **kwargs)
+            cache_key = get_key(*args, **kwargs)
+            try:
+                data = await get_cache().get_raw(cache_key)
+            except (RedisError, OSError):
+                data = None
+            entry = _decode(data) if data else None
+            if entry is None:
+                return await asyncio.shield(single_flight(cache_key, *args, **kwargs))
+            expires_at, delta, payload = entry
+            value = get_cache().codec.loads(payload, dto) if payload else None
+            if payload and value is None:
+                # запись другой версии DTO
+                return await asyncio.shield(single_flight(cache_key, *args, **kwargs))
+            refresh = beta and cache_key not in in_flight
+            if refresh and _should_refresh(expires_at, delta, beta):
+                return await asyncio.shield(single_flight(cache_key, *args, **kwargs))
+            return value
+
+        async def invalidate(*args, **kwargs) -> None:
+            with contextlib.suppress(RedisError, OSError):
+                await get_cache().delete(get_key(*args, **kwargs))
+
+        wrapper.invalidate = invalidate
+        wrapper.key_for = get_key
+        return wrapper
+
+    return decorator
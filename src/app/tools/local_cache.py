@@ -0,0 +1,83 @@
+import time
+
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+
+def key_family(key: str) -> str:
+    """Возвращает семейство ключа кэша для счетчиков"""
+    if key.startswith("user:"):
+        return "user"
+    if key.endswith(":stack"):
+        return "stack"
+    if key.endswith(":last_question"):
+        return "last_question"
+    return "other"
+
+
+class LocalCache:
+    """
+    LRU-кэш в памяти процесса с временем жизни у каждого ключа.
+
+    При переполнении вытесняется ключ, к которому дольше всего не
+    обращались. Просроченные ключи удаляются при чтении. Попадания и
+    промахи считаются по семействам ключей: семейство строкового ключа
+    определяет family (по умолчанию key_family).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 60,
+        family: Callable[[str], str] = key_family,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.family = family
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+        self._items: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        item = self._items.get(key)
+        return item is not None and item[0] > time.monotonic()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Возвращает значение по ключу или default"""
+        family = self.family(key) if isinstance(key, str) else "other"
+        item = self._items.get(key)
+        if item is None or item[0] <= time.monotonic():
+            if item is not None:
+                del self._items[key]
+            self.misses[family] += 1
+            return default
+        self._items.move_to_end(key)
+        self.hits[family] += 1
+        return item[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Сохраняет значение на ttl секунд, но не дольше времени жизни кэша"""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._items[key] = (time.monotonic() + ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Удаляет значение по ключу"""
+        self._items.pop(key, None)
+
+    def clear(self) -> None:
+        """Очищает кэш, счетчики не сбрасываются"""
+        self._items.clear()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Возвращает попадания и промахи по семействам ключей"""
+        return {
+            family: {"hits": self.hits[family], "misses": self.misses[family]}
+            for family in sorted(self.hits.keys() | self.misses.keys())
+        }
@@ -0,0 +1,53 @@
+import math
+
+
+class Histogram:
+    """
+    Гистограмма длительностей с логарифмическими корзинами.
+
+    Как в HDR Histogram, значение хранится с заданной относительной
+    точностью (по умолчанию 1%), поэтому память не зависит от числа
+    записей, а перцентили считаются по корзинам.
+    """
+
+    def __init__(self, precision: float = 0.01):
+        self._log_base = math.log1p(precision)
+        self._buckets: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Добавляет значение в миллисекундах"""
+        index = math.ceil(math.log(max(value, 1e-3)) / self._log_base)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, percent: float) -> float:
+        """Возвращает значение перцентиля percent (0-100)"""
+        if not self.count:
+            return 0.0
+        threshold = math.ceil(self.count * percent / 100)
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= threshold:
+                return min(math.exp(index * self._log_base), self.max)
+        return self.max
+
+    def snapshot(self) -> dict[str, float]:
+        """Возвращает сводку гистограммы в миллисекундах"""
+        return {
+            "count": self.count,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+        }
@@ -0,0 +1,189 @@
+import hashlib
+import inspect
+import logging
+import time
+
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.tools.metrics import Histogram
+from core.config import config
+
+
+logger = logging.getLogger(__name__)
+
+# Запросы к базе, выполненные внутри текущей операции репозитория
+_statements: ContextVar[list[tuple[str, int]] | None] = ContextVar(
+    "repository_statements", default=None
+)
+
+
+@dataclass
+class QueryEvent:
+    """Выполненная операция репозитория"""
+
+    model: str
+    operation: str
+    shape: str
+    rows: int
+    duration_ms: float
+    statements: list[str] = field(default_factory=list)
+    error: bool = False
+
+
+class QueryStats:
+    """
+    Сбор метрик операций репозитория.
+
+    Для каждой пары (модель, операция) хранит гистограмму длительностей,
+    передает каждое событие в подключенные хуки и пишет в лог SQL запросов
+    операций, которые выполнялись дольше slow_query_ms.
+    """
+
+    def __init__(self, slow_query_ms: float | None = None):
+        self.slow_query_ms = slow_query_ms
+        self.hooks: list[Callable[[QueryEvent], None]] = []
+        self._histograms: dict[tuple[str, str], Histogram] = {}
+
+    def add_hook(self, hook: Callable[[QueryEvent], None]) -> None:
+        """Подключает обработчик событий"""
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[QueryEvent], None]) -> None:
+        """Отключает обработчик событий"""
+        self.hooks.remove(hook)
+
+    def record(self, query_event: QueryEvent) -> None:
+        """Сохраняет событие в гистограмму и передает его в хуки"""
+        key = (query_event.model, query_event.operation)
+        if key not in self._histograms:
+            self._histograms[key] = Histogram()
+        self._histograms[key].record(query_event.duration_ms)
+        if self.slow_query_ms is not None and (
+            query_event.duration_ms >= self.slow_query_ms
+        ):
+            logger.warning(
+                "Медленная операция %s.%s: %.1f мс, строк %s\n%s",
+                query_event.model,
+                query_event.operation,
+                query_event.duration_ms,
+                query_event.rows,
+                "\n".join(query_event.statements),
+            )
+        for hook in self.hooks:
+            try:
+                hook(query_event)
+            except Exception:
+                logger.exception("Ошибка обработчика метрик репозитория")
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        """Возвращает сводку гистограмм с ключами вида Model.operation"""
+        return {
+            f"{model}.{operation}": histogram.snapshot()
+            for (model, operation), histogram in sorted(self._histograms.items())
+        }
+
+    def reset(self) -> None:
+        """Очищает гистограммы"""
+        self._histograms.clear()
+
+
+query_stats = QueryStats(slow_query_ms=config.db.slow_query_ms)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    statements = _statements.get()
+    if statements is not None:
+        statements.append((statement, max(cursor.rowcount, 0)))
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Подключает к движку сбор запросов для метрик репозитория"""
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _record(
+    model, operation: str, statements: list, duration: float, error: bool, rows=None
+):
+    sql = [statement for statement, _ in statements]
+    query_stats.record(
+        QueryEvent(
+            model=model.__name__ if model else "",
+            operation=operation,
+            shape=hashlib.sha1("\n".join(sql).encode()).hexdigest()[:16],
+            rows=sum(count for _, count in statements) if rows is None else rows,
+            duration_ms=duration * 1000,
+            statements=sql,
+            error=error,
+        )
+    )
+
+
+def instrumented(operation: str):
+    """
+    Декоратор метода репозитория для сбора метрик операции.
+
+    Модель берется из атрибута _model объекта, число строк - из rowcount
+    выполненных запросов (для потоковой выборки - число выданных объектов).
+    """
+
+    def decorator(method):
+        if inspect.isasyncgenfunction(method):
+
+            @wraps(method)
+            async def generator_wrapper(self, *args, **kwargs):
+                statements = []
+                duration = 0.0
+                rows = 0
+                error = False
+                generator = method(self, *args, **kwargs)
+                try:
+                    while True:
+                        token = _statements.set(statements)
+                        start = time.perf_counter()
+                        try:
+                            batch = await anext(generator)
+                        except StopAsyncIteration:
+                            break
+                        except BaseException:
+                            error = True
+                            raise
+                        finally:
+                            duration += time.perf_counter() - start
+                            _statements.reset(token)
+                        rows += len(batch)
+                        yield batch
+                finally:
+                    await generator.aclose()
+                    model = getattr(self, "_model", None)
+                    _record(model, operation, statements, duration, error, rows)
+
+            return generator_wrapper
+
+        @wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            statements = []
+            token = _statements.set(statements)
+            start = time.perf_counter()
+            error = False
+            try:
+                return await method(self, *args, **kwargs)
+            except BaseException:
+                error = True
+                raise
+            finally:
+                duration = time.perf_counter() - start
+                _statements.reset(token)
+                model = getattr(self, "_model", None)
+                _record(model, operation, statements, duration, error)
+
+        return wrapper
+
+    return decorator
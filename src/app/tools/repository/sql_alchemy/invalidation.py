@@ -0,0 +1,164 @@
+import logging
+
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from typing import Any, NamedTuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from model.base import Base
+from tools.sentry import sentry_message
+
+
+logger = logging.getLogger(__name__)
+
+# Ключ в session.info со списком изменений текущей транзакции
+INVALIDATIONS_KEY = "invalidations"
+
+
+class Change(NamedTuple):
+    """Измененная запись: модель, первичный ключ и значения колонок"""
+
+    model: type[Base]
+    pk: Any
+    values: dict[str, Any]
+
+
+Handler = Callable[..., Awaitable[None]]
+
+
+class InvalidationRegistry:
+    """
+    Обработчики сброса кэша по изменениям моделей.
+
+    SARepository собирает измененные в транзакции записи моделей, для
+    которых есть обработчики, и после успешного коммита передает их
+    обработчикам одним списком на модель. При откате изменения
+    отбрасываются. Для измененной записи передаются значения до и после
+    изменения, чтобы можно было сбросить и старый, и новый ключ.
+
+    Зависимости обработчика (например, кэш) передаются при регистрации
+    именованными аргументами и передаются обработчику вместе с
+    изменениями: handler(changes, **dependencies).
+    """
+
+    def __init__(self):
+        self._handlers: dict[type[Base], list[tuple[Handler, dict[str, Any]]]] = {}
+
+    def register(self, model: type[Base], handler: Handler, **dependencies) -> None:
+        """Добавляет обработчик изменений модели"""
+        self._handlers.setdefault(model, []).append((handler, dependencies))
+
+    def unregister(self, model: type[Base], handler: Handler) -> None:
+        """Удаляет обработчик изменений модели"""
+        handlers = [
+            entry for entry in self._handlers.get(model, []) if entry[0] is not handler
+        ]
+        if handlers:
+            self._handlers[model] = handlers
+        else:
+            self._handlers.pop(model, None)
+
+    def on(self, model: type[Base], **dependencies) -> Callable[[Handler], Handler]:
+        """Декоратор для регистрации обработчика изменений модели"""
+
+        def decorator(handler: Handler) -> Handler:
+            self.register(model, handler, **dependencies)
+            return handler
+
+        return decorator
+
+    def begin(self, session: Session) -> None:
+        """Начинает сбор изменений в сессии"""
+        if not event.contains(Session, "after_flush", _after_flush):
+            event.listen(Session, "after_flush", _after_flush)
+        session.info[INVALIDATIONS_KEY] = []
+
+    def pop(self, session: Session) -> list[Change]:
+        """Завершает сбор изменений и возвращает собранные изменения"""
+        return session.info.pop(INVALIDATIONS_KEY, None) or []
+
+    def watches(self, model: type[Base]) -> bool:
+        """Есть ли обработчики изменений модели"""
+        return model in self._handlers
+
+    def is_tracked(self, session: Session, model: type[Base]) -> bool:
+        """Собираются ли в сессии изменения модели"""
+        return self.watches(model) and INVALIDATIONS_KEY in session.info
+
+    def record(
+        self, session: Session, model: type[Base], rows: Iterable[Mapping[str, Any]]
+    ) -> None:
+        """Добавляет изменения массовой операции по значениям строк"""
+        if not self.is_tracked(session, model):
+            return
+        primary_keys = [column.key for column in inspect(model).primary_key]
+        session.info[INVALIDATIONS_KEY].extend(
+            Change(model, _get_pk([row.get(key) for key in primary_keys]), dict(row))
+            for row in rows
+        )
+
+    async def publish(self, changes: list[Change]) -> None:
+        """
+        Передает изменения обработчикам.
+
+        Ошибки обработчиков не пробрасываются: транзакция уже
+        зафиксирована, а устаревшая запись кэша истечет по времени жизни.
+        """
+        by_model: dict[type[Base], list[Change]] = {}
+        for change in changes:
+            by_model.setdefault(change.model, []).append(change)
+        for model, model_changes in by_model.items():
+            for handler, dependencies in self._handlers.get(model, []):
+                try:
+                    await handler(model_changes, **dependencies)
+                except Exception as err:
+                    error_text = (
+                        f"Ошибка сброса кэша <{model.__name__}> "
+                        f"в {handler.__qualname__}: {err}"
+                    )
+                    logger.exception(error_text)
+                    sentry_message(title=type(err).__name__, message=error_text)
+
+
+def _get_pk(values: list[Any]) -> Any:
+    return values[0] if len(values) == 1 else tuple(values)
+
+
+def _get_changes(obj: Base, with_history: bool) -> list[Change]:
+    state = inspect(obj)
+    values = {
+        attr.key: state.dict[attr.key]
+        for attr in state.mapper.column_attrs
+        if attr.key in state.dict
+    }
+    pk = _get_pk(state.mapper.primary_key_from_instance(obj))
+    changes = [Change(type(obj), pk, values)]
+    if with_history:
+        old_values = dict(values)
+        for key in values:
+            deleted = state.attrs[key].history.deleted
+            if deleted:
+                old_values[key] = deleted[0]
+        if old_values != values:
+            changes.append(Change(type(obj), pk, old_values))
+    return changes
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    changes = session.info.get(INVALIDATIONS_KEY)
+    if changes is None:
+        return
+    watches = invalidation_registry.watches
+    for obj in session.new:
+        if watches(type(obj)):
+            changes.extend(_get_changes(obj, with_history=False))
+    for obj in session.dirty:
+        if watches(type(obj)) and session.is_modified(obj):
+            changes.extend(_get_changes(obj, with_history=True))
+    for obj in session.deleted:
+        if watches(type(obj)):
+            changes.extend(_get_changes(obj, with_history=False))
+
+
+invalidation_registry = InvalidationRegistry()
@@ -0,0 +1,93 @@
+import asyncio
+
+from collections.abc import Awaitable, Callable, Hashable, Sequence
+from typing import Any
+
+
+class Loader:
+    """
+    Объединяет одновременные запросы объектов по ключу в один запрос.
+
+    Все вызовы load(), сделанные в одной итерации цикла событий, собираются
+    в пачку и загружаются одним вызовом fetch(keys) (WHERE key IN (...)).
+    Одинаковые ключи, ожидающие загрузки, не дублируются - вызывающие
+    получают общий результат. Кэша между итерациями нет: после загрузки
+    ключ снова запрашивается из базы.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[list], Awaitable[Sequence]],
+        key: str,
+        max_batch_size: int = 1000,
+    ):
+        self.key = key
+        self.max_batch_size = max_batch_size
+        self.loads = 0
+        self.hits = 0
+        self.batches = 0
+        self.max_batch = 0
+        self._fetch = fetch
+        self._pending: dict[Hashable, asyncio.Future] = {}
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def mean_batch_size(self) -> float:
+        """Средний размер пачки ключей"""
+        if not self.batches:
+            return 0.0
+        return (self.loads - self.hits) / self.batches
+
+    async def load(self, key: Hashable) -> Any | None:
+        """Возвращает объект по ключу или None, если объекта нет"""
+        self.loads += 1
+        future = self._pending.get(key) or self._in_flight.get(key)
+        if future is not None:
+            self.hits += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            if not self._pending:
+                loop.call_soon(self._dispatch)
+            self._pending[key] = future
+        # отмена одного ожидающего не должна отменять загрузку для остальных
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Sequence[Hashable]) -> list[Any | None]:
+        """Возвращает объекты по ключам в порядке ключей"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        keys = list(pending)
+        for start in range(0, len(keys), self.max_batch_size):
+            batch = {
+                key: pending[key] for key in keys[start : start + self.max_batch_size]
+            }
+            self._in_flight.update(batch)
+            task = asyncio.get_running_loop().create_task(self._load_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _load_batch(self, batch: dict[Hashable, asyncio.Future]) -> None:
+        self.batches += 1
+        self.max_batch = max(self.max_batch, len(batch))
+        try:
+            items = await self._fetch(list(batch))
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as err:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(err)
+            return
+        finally:
+            for key in batch:
+                self._in_flight.pop(key, None)
+        by_key = {getattr(item, self.key): item for item in items}
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(by_key.get(key))
@@ -0,0 +1,176 @@
+import logging
+import os
+import sys
+
+from collections import Counter, deque
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import greenlet
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from core.config import config
+
+
+logger = logging.getLogger(__name__)
+
+# Файлы, которые не считаются местом вызова запроса
+_skip_paths = (
+    str(Path(__file__).resolve().parent),
+    os.path.dirname(os.__file__),
+    "site-packages",
+)
+
+
+def _get_call_site() -> str:
+    """
+    Возвращает первое место вызова в коде приложения.
+
+    Синхронная часть SQLAlchemy выполняется в отдельном greenlet, поэтому
+    после его стека просматривается стек родительского greenlet, в котором
+    ждет корутина приложения.
+    """
+    frame = sys._getframe(1)
+    current = greenlet.getcurrent()
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.startswith("<") and not any(
+            path in filename for path in _skip_paths
+        ):
+            return f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+        if frame is None and current.parent is not None:
+            current = current.parent
+            frame = current.gr_frame
+    return "<unknown>"
+
+
+@dataclass
+class QueryReport:
+    """Найденные проблемы одной единицы работы"""
+
+    name: str
+    statements: int
+    repeated: dict[str, list[str]] = field(default_factory=dict)
+    lazy_loads: list[tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def has_problems(self) -> bool:
+        return bool(self.repeated or self.lazy_loads)
+
+    def format(self) -> str:
+        """Возвращает текст отчета"""
+        lines = [f"{self.name}: запросов {self.statements}"]
+        for sql, call_sites in self.repeated.items():
+            lines.append(f"Повторяющийся запрос ({len(call_sites)} раз): {sql}")
+            for call_site, count in Counter(call_sites).items():
+                lines.append(f"    {count} x {call_site}")
+        for relationship, call_site in self.lazy_loads:
+            lines.append(f"Ленивая загрузка {relationship}: {call_site}")
+        return "\n".join(lines)
+
+
+@dataclass
+class UnitOfWork:
+    """Запросы, выполненные внутри одного блока работы"""
+
+    name: str
+    statements: list[tuple[str, str]] = field(default_factory=list)
+    lazy_loads: list[tuple[str, str]] = field(default_factory=list)
+
+    def report(self, threshold: int) -> QueryReport:
+        call_sites: dict[str, list[str]] = {}
+        for sql, call_site in self.statements:
+            call_sites.setdefault(sql, []).append(call_site)
+        return QueryReport(
+            name=self.name,
+            statements=len(self.statements),
+            repeated={
+                sql: sites
+                for sql, sites in call_sites.items()
+                if len(sites) >= threshold
+            },
+            lazy_loads=list(self.lazy_loads),
+        )
+
+
+_unit: ContextVar[UnitOfWork | None] = ContextVar("query_detector_unit", default=None)
+
+
+class QueryDetector:
+    """
+    Поиск N+1 запросов для разработки и стейджинга.
+
+    Внутри единицы работы (блок async with repo: или вызов сценария,
+    обернутый в track) собирает все запросы к базе и ленивые загрузки
+    связей. По завершении блока пишет в лог отчет о запросах одной формы,
+    повторенных не меньше threshold раз, и о ленивых загрузках, с местами
+    вызова в коде приложения.
+    """
+
+    def __init__(self, enabled: bool = False, threshold: int = 3, max_reports=100):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.reports: deque[QueryReport] = deque(maxlen=max_reports)
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        """Подключает к движку и сессиям сбор запросов"""
+        sync_engine = engine.sync_engine
+        if not event.contains(
+            sync_engine, "before_cursor_execute", _before_cursor_execute
+        ):
+            event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        if not event.contains(Session, "do_orm_execute", _do_orm_execute):
+            event.listen(Session, "do_orm_execute", _do_orm_execute)
+
+    def start(self, name: str) -> Token | None:
+        """Начинает единицу работы, если она еще не начата"""
+        if not self.enabled or _unit.get() is not None:
+            return None
+        return _unit.set(UnitOfWork(name))
+
+    def finish(self, token: Token | None) -> QueryReport | None:
+        """Завершает единицу работы и возвращает отчет, если есть проблемы"""
+        if token is None:
+            return None
+        unit = _unit.get()
+        _unit.reset(token)
+        report = unit.report(self.threshold)
+        if not report.has_problems:
+            return None
+        self.reports.append(report)
+        logger.warning(report.format())
+        return report
+
+    @asynccontextmanager
+    async def track(self, name: str) -> AsyncGenerator[None, None]:
+        """Единица работы для сценария, можно использовать как декоратор"""
+        token = self.start(name)
+        try:
+            yield
+        finally:
+            self.finish(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    unit = _unit.get()
+    if unit is not None:
+        unit.statements.append((statement, _get_call_site()))
+
+
+def _do_orm_execute(orm_execute_state: ORMExecuteState):
+    unit = _unit.get()
+    if unit is not None and orm_execute_state.lazy_loaded_from is not None:
+        relationship = str(orm_execute_state.loader_strategy_path[-1])
+        unit.lazy_loads.append((relationship, _get_call_site()))
+
+
+query_detector = QueryDetector(
+    enabled=config.db.detect_n_plus_one, threshold=config.db.n_plus_one_threshold
+)
@@ -1,8 +1,30 @@
-from collections.abc import Sequence
-from typing import Any, TypeVar
-
-from pydantic import BaseModel, ValidationError
-from sqlalchemy import Result, Select, and_, func, or_, select
+import base64
+import json
+
+from collections.abc import AsyncGenerator, Hashable, Iterable, Sequence
+from datetime import date, datetime
+from functools import cache
+from typing import Any, NamedTuple, TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import (
+    Delete,
+    Result,
+    Row,
+    ScalarResult,
+    Select,
+    Update,
+    and_,
+    bindparam,
+    delete,
+    func,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import (
@@ -12,7 +34,20 @@ from sqlalchemy.orm import (
     relationship,
     selectinload,
 )
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BindParameter, ClauseElement, UnaryExpression
 
+from app.tools.repository.sql_alchemy.instrumentation import (
+    instrument_engine,
+    instrumented,
+)
+from app.tools.repository.sql_alchemy.invalidation import invalidation_registry
+from app.tools.repository.sql_alchemy.loader import Loader
+from app.tools.repository.sql_alchemy.query_detector import query_detector
+from app.tools.repository.sql_alchemy.statement_cache import (
+    StatementCache,
+    statement_cache,
+)
 from core.database import DatabaseHelper
 from model.base import Base
 from tools.sentry import sentry_message
@@ -20,6 +55,14 @@ from tools.sentry import sentry_message
 
 T = TypeVar("T", bound=Base)
 
+# Колонки для выборки DTO без загрузки объектов: (модель, DTO) -> колонки
+_projections: dict[tuple[type, type[BaseModel]], list | None] = {}
+
+
+@cache
+def _get_list_adapter(dto: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[dto])
+
 
 class F:
     def __init__(
@@ -66,8 +109,8 @@ class FilterCondition:
             cls.LTE: lambda column, value: column <= value,
             cls.IN: lambda column, value: column.in_(value),
             cls.NOT_IN: lambda column, value: column.not_in(value),
-            cls.LIKE: lambda column, value: column.like(f"%{value}%"),
-            cls.ILIKE: lambda column, value: column.ilike(f"%{value}%"),
+            cls.LIKE: lambda column, value: column.like(cls.get_pattern(value)),
+            cls.ILIKE: lambda column, value: column.ilike(cls.get_pattern(value)),
             cls.BETWEEN: lambda column, value: column.between(*value),
             cls.ANY: lambda column, value: column.any(value),
         }
@@ -79,9 +122,153 @@ class FilterCondition:
     def get_filter(cls, value: Any, expr: str = EXACT):
         return {expr: value}
 
+    @staticmethod
+    def get_pattern(value: Any) -> Any:
+        """Оборачивает значение в шаблон LIKE, связанный параметр не меняет"""
+        if isinstance(value, BindParameter):
+            return value
+        return f"%{value}%"
+
+
+class _UncacheableStatement(Exception):
+    """Форму запроса нельзя переиспользовать, запрос строится заново"""
+
+
+class _StatementParams:
+    """
+    Строит форму запроса для кэша и заменяет значения фильтров
+    связанными параметрами.
+    """
+
+    def __init__(self):
+        self.params: dict[str, Any] = {}
+
+    def bind(self, value: Any, expanding: bool = False) -> BindParameter:
+        name = f"rp_{len(self.params)}"
+        self.params[name] = value
+        return bindparam(name, expanding=expanding)
+
+    @staticmethod
+    def _get_operator(key: str) -> str:
+        if key.startswith("join__"):
+            parts = key.lstrip("join__").split("__")  # noqa: B005
+            return parts[2] if len(parts) > 2 else FilterCondition.EXACT
+        parts = key.split("__")
+        return parts[1] if len(parts) > 1 else FilterCondition.EXACT
+
+    @staticmethod
+    def get_attribute_key(attribute: Any) -> Hashable:
+        try:
+            cache_key = attribute._generate_cache_key()
+        except AttributeError as err:
+            raise _UncacheableStatement from err
+        if cache_key is None or cache_key.bindparams:
+            raise _UncacheableStatement
+        return cache_key.key
+
+    def _get_operand(self, operator: str, value: Any) -> tuple[Hashable, Any]:
+        if isinstance(value, ClauseElement) or hasattr(value, "__clause_element__"):
+            raise _UncacheableStatement
+        if value is None:
+            return None, None
+        if operator in (FilterCondition.IN, FilterCondition.NOT_IN):
+            if not isinstance(value, list | tuple | set | frozenset):
+                raise _UncacheableStatement
+            return "seq", self.bind(list(value), expanding=True)
+        if operator == FilterCondition.BETWEEN:
+            try:
+                low, high = value
+            except (TypeError, ValueError) as err:
+                raise _UncacheableStatement from err
+            return "range", (self.bind(low), self.bind(high))
+        if operator in (FilterCondition.LIKE, FilterCondition.ILIKE):
+            return "value", self.bind(FilterCondition.get_pattern(value))
+        return "value", self.bind(value)
+
+    def get_filters(self, filters: dict) -> tuple[Hashable, dict]:
+        shape = []
+        placeholders = {}
+        for key, value in filters.items():
+            operator = self._get_operator(key)
+            if isinstance(value, dict):
+                if operator != FilterCondition.EXACT:
+                    raise _UncacheableStatement
+                operands = {}
+                operands_shape = []
+                for expr, operand in value.items():
+                    token, operands[expr] = self._get_operand(expr, operand)
+                    operands_shape.append((expr, token))
+                shape.append((key, tuple(operands_shape)))
+                placeholders[key] = operands
+                continue
+            token, placeholders[key] = self._get_operand(operator, value)
+            shape.append((key, token))
+        return tuple(shape), placeholders
+
+    def get_excludes(self, excludes: dict) -> tuple[Hashable, dict]:
+        shape = []
+        placeholders = {}
+        for field, value in excludes.items():
+            token, placeholders[field] = self._get_operand(
+                FilterCondition.NOT_EXACT, value
+            )
+            shape.append((self.get_attribute_key(field), token))
+        return tuple(shape), placeholders
+
+
+class Page(NamedTuple):
+    """Страница результатов keyset-пагинации"""
+
+    items: list
+    next_cursor: str | None
+
+
+class KeysetCursor:
+    """
+    Непрозрачный курсор keyset-пагинации: значения колонок сортировки
+    последней записи страницы.
+    """
+
+    @staticmethod
+    def _to_json(value: Any) -> Any:
+        if isinstance(value, date | datetime):
+            return value.isoformat()
+        return str(value)
+
+    @classmethod
+    def encode(cls, values: list[Any]) -> str:
+        data = json.dumps(values, default=cls._to_json, separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    @staticmethod
+    def _from_json(column: Any, value: Any) -> Any:
+        if value is None:
+            return None
+        python_type = column.type.python_type
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        if python_type is UUID:
+            return UUID(value)
+        return python_type(value)
+
+    @classmethod
+    def decode(cls, cursor: str, columns: list[Any]) -> list[Any]:
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if not isinstance(values, list) or len(values) != len(columns):
+                raise ValueError
+            return [cls._from_json(c, v) for c, v in zip(columns, values, strict=True)]
+        except (ValueError, TypeError) as err:
+            raise ValueError(f"Некорректный курсор пагинации {cursor}") from err
+
 
 class BaseRepository:
     model: type[T]
+    statement_cache: StatementCache | None = statement_cache
+    # Ограничение asyncpg на количество параметров в одном запросе
+    max_query_params: int = 32767
 
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -165,13 +352,13 @@ class BaseRepository:
         limit: int | None = None,
         offset: int | None = None,
         count: bool = False,
+        columns: list[InstrumentedAttribute] | None = None,
         **filters,
     ) -> Select:
-        statement = (
-            select(self.model)
-            if not count
-            else select(func.count(1)).select_from(self.model)
-        )
+        if count:
+            statement = select(func.count(1)).select_from(self.model)
+        else:
+            statement = select(*columns) if columns else select(self.model)
         conditions = []
         if expressions:
             for expr in expressions:
@@ -200,18 +387,132 @@ class BaseRepository:
             statement = statement.order_by(*order_by)
         return statement
 
+    def _get_statement_key(
+        self,
+        params: _StatementParams,
+        expressions: F | None = None,
+        excludes: dict[InstrumentedAttribute, Any] | None = None,
+        joined_load: list[relationship] | None = None,  # type: ignore
+        select_in_load: list[relationship] | None = None,  # type: ignore
+        order_by: list[InstrumentedAttribute] | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+        count: bool = False,
+        columns: list[InstrumentedAttribute] | None = None,
+        **filters,
+    ) -> tuple[Hashable, dict[str, Any]]:
+        placeholders: dict[str, Any] = {"count": count, "columns": columns}
+        expressions_shape = None
+        if expressions:
+            expressions_shape = []
+            or_conditions = []
+            for expr in expressions:
+                for k, v in expr.items():
+                    shape, or_filters = params.get_filters(v)
+                    expressions_shape.append(shape)
+                    or_conditions.append({k: or_filters})
+            expressions_shape = tuple(expressions_shape)
+            placeholders["expressions"] = or_conditions
+        filters_shape, placeholders_filters = params.get_filters(filters)
+        excludes_shape = None
+        if excludes:
+            excludes_shape, placeholders["excludes"] = params.get_excludes(excludes)
+        if joined_load:
+            placeholders["joined_load"] = joined_load
+        if select_in_load:
+            placeholders["select_in_load"] = select_in_load
+        if order_by is not None:
+            placeholders["order_by"] = order_by
+        if limit is not None:
+            placeholders["limit"] = params.bind(limit)
+        if offset is not None:
+            placeholders["offset"] = params.bind(offset)
+        key = (
+            self.model,
+            count,
+            tuple(params.get_attribute_key(i) for i in columns) if columns else None,
+            expressions_shape,
+            filters_shape,
+            excludes_shape,
+            tuple(params.get_attribute_key(i) for i in joined_load or []),
+            tuple(params.get_attribute_key(i) for i in select_in_load or []),
+            (
+                tuple(params.get_attribute_key(i) for i in order_by)
+                if order_by is not None
+                else None
+            ),
+            limit is not None,
+            offset is not None,
+        )
+        placeholders.update(placeholders_filters)
+        return key, placeholders
+
+    def get_cached_statement(self, **kwargs) -> tuple[Select, dict[str, Any]]:
+        """
+        Возвращает запрос со связанными параметрами и значения параметров.
+
+        Принимает те же аргументы, что и get_statement. Запрос одной формы
+        строится один раз и переиспользуется из statement_cache, между
+        вызовами меняются только значения параметров. Формы, которые нельзя
+        параметризовать (например, подзапрос в значении фильтра), строятся
+        через get_statement при каждом вызове.
+        """
+        if self.statement_cache is None:
+            return self.get_statement(**kwargs), {}
+        params = _StatementParams()
+        try:
+            key, placeholders = self._get_statement_key(params, **kwargs)
+        except _UncacheableStatement:
+            return self.get_statement(**kwargs), {}
+        statement = self.statement_cache.get(key)
+        if statement is None:
+            statement = self.get_statement(**placeholders)
+            self.statement_cache.set(key, statement)
+        return statement, params.params
+
+    def get_projection(
+        self, dto: type[BaseModel]
+    ) -> list[InstrumentedAttribute] | None:
+        """
+        Возвращает колонки модели для выборки DTO без загрузки объектов ORM
+        или None, если не все поля DTO являются колонками модели.
+        """
+        key = (self.model, dto)
+        if key not in _projections:
+            columns = self.model.__mapper__.column_attrs
+            fields = dto.model_fields
+            projection = None
+            if all(
+                name in columns and field.alias is None
+                for name, field in fields.items()
+            ):
+                projection = [getattr(self.model, name) for name in fields]
+            _projections[key] = projection
+        return _projections[key]
+
+    async def _execute_select(
+        self,
+        statement: Select,
+        params: dict[str, Any],
+        columns: list[InstrumentedAttribute] | None = None,
+    ) -> Result | ScalarResult:
+        result = await self.session.execute(statement, params)
+        return result if columns else result.scalars()
+
     async def all(
         self,
         joined_load: list[relationship] | None = None,  # type: ignore
         select_in_load: list[relationship] | None = None,  # type: ignore
         order_by: list[InstrumentedAttribute] | None = None,
-    ) -> Sequence[T]:
-        statement = self.get_statement(
+        columns: list[InstrumentedAttribute] | None = None,
+    ) -> Sequence[T] | Sequence[Row]:
+        statement, params = self.get_cached_statement(
             joined_load=joined_load,
             select_in_load=select_in_load,
             order_by=order_by,
+            columns=columns,
         )
-        result = await self.session.scalars(statement=statement)
+        result = await self._execute_select(statement, params, columns)
         return result.all()
 
     async def count(
@@ -219,12 +520,12 @@ class BaseRepository:
         excludes: dict[InstrumentedAttribute, Any] | None = None,
         **filters,
     ) -> int:
-        statement = self.get_statement(
+        statement, params = self.get_cached_statement(
             count=True,
             excludes=excludes,
             **filters,
         )
-        result = await self.session.scalar(statement=statement)
+        result = await self.session.scalar(statement, params)
         return result
 
     async def exists(
@@ -232,9 +533,9 @@ class BaseRepository:
         excludes: dict[InstrumentedAttribute, Any] | None = None,
         **filters,
     ) -> bool:
-        subquery = self.get_statement(excludes=excludes, **filters)
+        subquery, params = self.get_cached_statement(excludes=excludes, **filters)
         statement = select(1).where(subquery.exists())
-        result = await self.session.scalar(statement=statement)
+        result = await self.session.scalar(statement, params)
         return bool(result)
 
     async def filter(
@@ -246,9 +547,10 @@ class BaseRepository:
         order_by: list[InstrumentedAttribute] | None = None,
         limit: int | None = None,
         offset: int | None = None,
+        columns: list[InstrumentedAttribute] | None = None,
         **filters,
-    ) -> Sequence[T]:
-        statement = self.get_statement(
+    ) -> Sequence[T] | Sequence[Row]:
+        statement, params = self.get_cached_statement(
             expressions=expressions,
             excludes=excludes,
             joined_load=joined_load,
@@ -256,33 +558,141 @@ class BaseRepository:
             order_by=order_by,
             limit=limit,
             offset=offset,
+            columns=columns,
             **filters,
         )
-        result = await self.session.scalars(statement=statement)
+        result = await self._execute_select(statement, params, columns)
         return result.all()
 
+    def _get_keyset_columns(
+        self, order_by: list[InstrumentedAttribute] | None = None
+    ) -> list[tuple[Any, bool]]:
+        order_by = order_by if order_by is not None else self.model.ordering()
+        columns = []
+        for item in order_by:
+            if isinstance(item, UnaryExpression):
+                descending = item.modifier is operators.desc_op
+                columns.append((item.element, descending))
+            else:
+                columns.append((item, False))
+        if not any(column.key == self.model.id.key for column, _ in columns):
+            # Уникальный ключ в конце сортировки делает порядок строгим
+            descending = columns[-1][1] if columns else False
+            columns.append((self.model.id, descending))
+        return columns
+
+    @staticmethod
+    def _get_keyset_condition(columns: list[tuple[Any, bool]], values: list[Any]):
+        directions = {descending for _, descending in columns}
+        if len(directions) == 1:
+            left = tuple_(*[column for column, _ in columns])
+            right = tuple_(*values, types=[column.type for column, _ in columns])
+            return left < right if directions.pop() else left > right
+        conditions = []
+        for i, (column, descending) in enumerate(columns):
+            equals = [columns[j][0] == values[j] for j in range(i)]
+            after = column < values[i] if descending else column > values[i]
+            conditions.append(and_(*equals, after))
+        return or_(*conditions)
+
+    async def paginate(
+        self,
+        after: str | None = None,
+        order_by: list[InstrumentedAttribute] | None = None,
+        page_size: int = 50,
+        expressions: F | None = None,
+        excludes: dict[InstrumentedAttribute, Any] | None = None,
+        joined_load: list[relationship] | None = None,  # type: ignore
+        select_in_load: list[relationship] | None = None,  # type: ignore
+        columns: list[InstrumentedAttribute] | None = None,
+        **filters,
+    ) -> Page:
+        if page_size < 1:
+            raise ValueError("Размер страницы должен быть больше нуля")
+        keyset_columns = self._get_keyset_columns(order_by)
+        if columns:
+            # Значения для курсора берутся из выбранных колонок
+            keys = {column.key for column in columns}
+            columns = columns + [
+                getattr(self.model, c.key)
+                for c, _ in keyset_columns
+                if c.key not in keys
+            ]
+        statement, params = self.get_cached_statement(
+            expressions=expressions,
+            excludes=excludes,
+            joined_load=joined_load,
+            select_in_load=select_in_load,
+            order_by=[c.desc() if desc else c.asc() for c, desc in keyset_columns],
+            limit=page_size + 1,
+            columns=columns,
+            **filters,
+        )
+        if after:
+            values = KeysetCursor.decode(after, [c for c, _ in keyset_columns])
+            condition = self._get_keyset_condition(keyset_columns, values)
+            statement = statement.where(condition)
+        result = await self._execute_select(statement, params, columns)
+        items = list(result.unique().all() if joined_load else result.all())
+        if len(items) <= page_size:
+            return Page(items=items, next_cursor=None)
+        items = items[:page_size]
+        last = items[-1]
+        cursor = KeysetCursor.encode([getattr(last, c.key) for c, _ in keyset_columns])
+        return Page(items=items, next_cursor=cursor)
+
+    async def stream(
+        self,
+        batch_size: int = 1000,
+        expressions: F | None = None,
+        excludes: dict[InstrumentedAttribute, Any] | None = None,
+        order_by: list[InstrumentedAttribute] | None = None,
+        columns: list[InstrumentedAttribute] | None = None,
+        **filters,
+    ) -> AsyncGenerator[list[T] | list[Row], None]:
+        statement, params = self.get_cached_statement(
+            expressions=expressions,
+            excludes=excludes,
+            order_by=order_by,
+            columns=columns,
+            **filters,
+        )
+        statement = statement.execution_options(yield_per=batch_size)
+        result = await self.session.stream(statement, params)
+        if not columns:
+            result = result.scalars()
+        try:
+            async for partition in result.partitions(batch_size):
+                yield list(partition)
+        finally:
+            await result.close()
+
     async def get(
         self,
         expressions: F | None = None,
         excludes: dict[InstrumentedAttribute, Any] | None = None,
         joined_load: list[relationship] | None = None,  # type: ignore
         select_in_load: list[relationship] | None = None,  # type: ignore
+        columns: list[InstrumentedAttribute] | None = None,
         **filters,
-    ) -> T:
-        statement = self.get_statement(
+    ) -> T | Row:
+        statement, params = self.get_cached_statement(
             expressions=expressions,
             excludes=excludes,
             joined_load=joined_load,
             select_in_load=select_in_load,
+            columns=columns,
             **filters,
         )
-        result = await self.session.execute(statement=statement)
-        return result.scalar_one()
+        result = await self._execute_select(statement, params, columns)
+        return result.one()
 
-    async def get_or_none(self, **filters):
-        statement = self.get_statement(**filters)
-        result = await self.session.execute(statement=statement)
-        return result.scalar_one_or_none()
+    async def get_or_none(
+        self, columns: list[InstrumentedAttribute] | None = None, **filters
+    ):
+        statement, params = self.get_cached_statement(columns=columns, **filters)
+        result = await self._execute_select(statement, params, columns)
+        return result.one_or_none()
 
     async def find(
         self,
@@ -291,18 +701,20 @@ class BaseRepository:
         joined_load: list[relationship] | None = None,  # type: ignore
         select_in_load: list[relationship] | None = None,  # type: ignore
         order_by: list[InstrumentedAttribute] | None = None,
+        columns: list[InstrumentedAttribute] | None = None,
         **filters,
-    ) -> T | None:
-        statement = self.get_statement(
+    ) -> T | Row | None:
+        statement, params = self.get_cached_statement(
             expressions=expressions,
             excludes=excludes,
             joined_load=joined_load,
             select_in_load=select_in_load,
             order_by=order_by,
+            columns=columns,
             **filters,
         )
-        result = await self.session.scalar(statement=statement)
-        return result
+        result = await self._execute_select(statement, params, columns)
+        return result.first()
 
     async def create(self, commit: bool = True, **model_data) -> T:
         instance = self.model(**model_data)
@@ -321,6 +733,200 @@ class BaseRepository:
         await self.session.delete(instance)
         await self.session.commit() if commit else await self.session.flush()
 
+    @staticmethod
+    def _has_joins(expressions: F | None, filters: dict) -> bool:
+        keys = list(filters)
+        for expr in expressions or []:
+            for v in expr.values():
+                keys.extend(v)
+        return any(key.startswith("join__") for key in keys)
+
+    def _get_where_statement(
+        self,
+        statement: Update | Delete,
+        expressions: F | None = None,
+        excludes: dict[InstrumentedAttribute, Any] | None = None,
+        **filters,
+    ) -> tuple[Update | Delete, dict[str, Any]]:
+        if not (expressions or excludes or filters):
+            raise ValueError("Массовое изменение записей без фильтров запрещено")
+        select_statement, params = self.get_cached_statement(
+            expressions=expressions, excludes=excludes, order_by=[], **filters
+        )
+        if self._has_joins(expressions, filters):
+            # UPDATE/DELETE не поддерживают JOIN, фильтруем по ключам подзапроса
+            ids = select_statement.with_only_columns(self.model.id)
+            statement = statement.where(self.model.id.in_(ids))
+        else:
+            statement = statement.where(select_statement.whereclause)
+        return statement.execution_options(synchronize_session="fetch"), params
+
+    async def _record_changes(
+        self,
+        values: dict[str, Any] | None = None,
+        expressions: F | None = None,
+        excludes: dict[InstrumentedAttribute, Any] | None = None,
+        **filters,
+    ) -> None:
+        """
+        Запоминает для сброса кэша строки, которые изменит массовая операция.
+
+        Дополнительный запрос выполняется, только если на изменения модели
+        подписан обработчик (см. invalidation_registry).
+        """
+        if not invalidation_registry.is_tracked(self.session, self.model):
+            return
+        select_statement, params = self.get_cached_statement(
+            expressions=expressions, excludes=excludes, order_by=[], **filters
+        )
+        statement = select_statement.with_only_columns(*self.model.__table__.columns)
+        rows = (await self.session.execute(statement, params)).mappings().all()
+        invalidation_registry.record(self.session, self.model, rows)
+        if values:
+            invalidation_registry.record(
+                self.session, self.model, [{**row, **values} for row in rows]
+            )
+
+    async def update_where(
+        self,
+        values: dict[str, Any],
+        expressions: F | None = None,
+        excludes: dict[InstrumentedAttribute, Any] | None = None,
+        returning: list[InstrumentedAttribute] | None = None,
+        **filters,
+    ) -> list[Row] | int:
+        statement, params = self._get_where_statement(
+            update(self.model).values(**values),
+            expressions=expressions,
+            excludes=excludes,
+            **filters,
+        )
+        await self._record_changes(values, expressions, excludes, **filters)
+        if returning:
+            statement = statement.returning(*returning)
+            result = await self.session.execute(statement, params)
+            return list(result.all())
+        result = await self.session.execute(statement, params)
+        return result.rowcount
+
+    async def delete_where(
+        self,
+        expressions: F | None = None,
+        excludes: dict[InstrumentedAttribute, Any] | None = None,
+        returning: list[InstrumentedAttribute] | None = None,
+        **filters,
+    ) -> list[Row] | int:
+        statement, params = self._get_where_statement(
+            delete(self.model),
+            expressions=expressions,
+            excludes=excludes,
+            **filters,
+        )
+        await self._record_changes(None, expressions, excludes, **filters)
+        if returning:
+            statement = statement.returning(*returning)
+            result = await self.session.execute(statement, params)
+            return list(result.all())
+        result = await self.session.execute(statement, params)
+        return result.rowcount
+
+    def get_dto_columns(self, dto: type[BaseModel]) -> list[InstrumentedAttribute]:
+        """Возвращает колонки модели, соответствующие полям DTO"""
+        columns = self.model.__mapper__.column_attrs
+        return [
+            getattr(self.model, field) for field in dto.model_fields if field in columns
+        ]
+
+    def _get_rows(self, rows: Iterable[dict | BaseModel]) -> list[dict[str, Any]]:
+        rows_data = [
+            (
+                row.model_dump(exclude_unset=True)
+                if isinstance(row, BaseModel)
+                else dict(row)
+            )
+            for row in rows
+        ]
+        if rows_data:
+            keys = rows_data[0].keys()
+            if any(row.keys() != keys for row in rows_data):
+                raise ValueError("Все записи должны содержать одинаковый набор полей")
+        return rows_data
+
+    def _get_batches(self, rows: list[dict[str, Any]]) -> Iterable[list[dict]]:
+        batch_size = max(self.max_query_params // len(self.model.__table__.columns), 1)
+        for start in range(0, len(rows), batch_size):
+            yield rows[start : start + batch_size]
+
+    async def _bulk_insert(
+        self,
+        rows: Iterable[dict | BaseModel],
+        returning: list[InstrumentedAttribute] | None = None,
+        conflict_keys: list[str] | None = None,
+        update_fields: list[str] | None = None,
+    ) -> list[Row] | int:
+        rows_data = self._get_rows(rows)
+        if conflict_keys:
+            if any(key not in row for row in rows_data for key in conflict_keys):
+                raise ValueError(f"Нет значений для ключей конфликта {conflict_keys}")
+            # В одном INSERT ... ON CONFLICT строку нельзя изменить дважды
+            unique_rows = {
+                tuple(row[k] for k in conflict_keys): row for row in rows_data
+            }
+            rows_data = list(unique_rows.values())
+        invalidation_registry.record(self.session, self.model, rows_data)
+        result_rows: list[Row] = []
+        count = 0
+        for batch in self._get_batches(rows_data):
+            statement = insert(self.model).values(batch)
+            if conflict_keys:
+                statement = self._on_conflict(
+                    statement, batch[0].keys(), conflict_keys, update_fields
+                )
+            if returning:
+                statement = statement.returning(*returning)
+            result = await self.session.execute(statement)
+            if returning:
+                result_rows.extend(result.all())
+            else:
+                count += result.rowcount
+        return result_rows if returning else count
+
+    def _on_conflict(self, statement, keys, conflict_keys, update_fields):
+        primary_keys = {c.key for c in self.model.__mapper__.primary_key}
+        update_fields = update_fields or [
+            k for k in keys if k not in conflict_keys and k not in primary_keys
+        ]
+        set_ = {field: statement.excluded[field] for field in update_fields}
+        if not set_:
+            return statement.on_conflict_do_nothing(index_elements=conflict_keys)
+        # onupdate не срабатывает для ON CONFLICT DO UPDATE, берем значение
+        # default, вычисленное для вставляемой строки
+        for column in self.model.__table__.columns:
+            if column.onupdate is not None and column.default is not None:
+                set_.setdefault(column.key, statement.excluded[column.key])
+        return statement.on_conflict_do_update(index_elements=conflict_keys, set_=set_)
+
+    async def bulk_create(
+        self,
+        rows: Iterable[dict | BaseModel],
+        returning: list[InstrumentedAttribute] | None = None,
+    ) -> list[Row] | int:
+        return await self._bulk_insert(rows, returning=returning)
+
+    async def bulk_upsert(
+        self,
+        rows: Iterable[dict | BaseModel],
+        conflict_keys: list[str],
+        update_fields: list[str] | None = None,
+        returning: list[InstrumentedAttribute] | None = None,
+    ) -> list[Row] | int:
+        return await self._bulk_insert(
+            rows,
+            returning=returning,
+            conflict_keys=conflict_keys,
+            update_fields=update_fields,
+        )
+
     async def get_or_create(
         self, filters: list[str], commit: bool = True, **model_data
     ):
@@ -351,6 +957,48 @@ class SARepository:
     def __init__(self, connection: DatabaseHelper):
         self._session: AsyncSession | None = None
         self._conn = connection
+        self._loaders: dict[tuple, Loader] = {}
+        for engine in (connection.engine, *connection.replicas):
+            instrument_engine(engine)
+            query_detector.instrument(engine)
+        self._detector_token = None
+
+    @property
+    def in_transaction(self) -> bool:
+        """Открыта ли транзакция репозитория (вызов внутри async with repo)"""
+        return self._session is not None
+
+    def loader(
+        self, model: type[T], key: str = "id", dto: type[BaseModel] | None = None
+    ) -> Loader:
+        """
+        Возвращает загрузчик объектов модели по ключу.
+
+        Одновременные вызовы loader(...).load(value) из разных корутин
+        объединяются в один запрос WHERE key IN (...). Загрузчик создается
+        один раз на репозиторий для каждой тройки (модель, ключ, DTO).
+
+        Args:
+            model: Модель для загрузки.
+            key: Имя уникального атрибута модели для поиска.
+            dto: Объект для преобразования результата в объект DTO.
+
+        Returns:
+            Loader: Загрузчик объектов.
+        """
+        loader_key = (model, key, dto)
+        if loader_key in self._loaders:
+            return self._loaders[loader_key]
+        if not hasattr(model, key):
+            raise ValueError(f"У модели <{model.__name__}> нет атрибута {key}")
+        if dto and key not in dto.model_fields:
+            raise ValueError(f"В DTO <{dto.__name__}> нет поля {key}")
+
+        async def fetch(keys: list) -> Sequence:
+            return await self.query(model).filter(dto=dto, **{f"{key}__in": keys})
+
+        self._loaders[loader_key] = Loader(fetch, key=key)
+        return self._loaders[loader_key]
 
     def stmt(self, model: type[T]):
         class StmtWrapper:
@@ -377,6 +1025,7 @@ class SARepository:
                     raise err
                 return result
 
+            @instrumented("create")
             async def create(
                 self, dto: BaseModel = None, **model_data
             ) -> T | BaseModel | None:
@@ -408,6 +1057,102 @@ class SARepository:
                     )
                     raise SQLAlchemyError(error_text) from err
 
+            @instrumented("bulk_create")
+            async def bulk_create(
+                self,
+                rows: Iterable[dict | BaseModel],
+                dto: type[BaseModel] | None = None,
+                returning: list[InstrumentedAttribute] | None = None,
+            ) -> list[BaseModel] | list[Row] | int:
+                """
+                Создает записи модели одним INSERT ... VALUES на пачку строк.
+
+                Пачки подбираются так, чтобы не превысить ограничение asyncpg
+                на количество параметров запроса. Объекты ORM не создаются.
+
+                Args:
+                    rows: Словари или DTO с одинаковым набором полей.
+                    dto: Объект для преобразования результата в объект DTO.
+                    returning: Колонки для RETURNING. По умолчанию колонки DTO.
+
+                Returns:
+                    list[BaseModel] | list[Row] | int: DTO, строки RETURNING
+                    или количество созданных записей.
+                """
+                try:
+                    if dto and not returning:
+                        returning = self._base_repo.get_dto_columns(dto)
+                    result = await self._base_repo.bulk_create(
+                        rows, returning=returning
+                    )
+                    if dto:
+                        return [self._to_dto(row, dto) for row in result]
+                    return result
+                except SQLAlchemyError as err:
+                    error_text = (
+                        f"Ошибка массового создания объектов "
+                        f"<{self._model.__name__}>.\n"
+                        f"Текст ошибки в исключении {str(err)}.\n"
+                    )
+                    sentry_message(
+                        message=error_text,
+                        level="error",
+                        title="REPO:bulk_create",
+                    )
+                    raise SQLAlchemyError(error_text) from err
+
+            @instrumented("bulk_upsert")
+            async def bulk_upsert(
+                self,
+                rows: Iterable[dict | BaseModel],
+                conflict_keys: list[str],
+                update_fields: list[str] | None = None,
+                dto: type[BaseModel] | None = None,
+                returning: list[InstrumentedAttribute] | None = None,
+            ) -> list[BaseModel] | list[Row] | int:
+                """
+                Создает или обновляет записи модели через
+                INSERT ... ON CONFLICT DO UPDATE пачками строк.
+
+                Args:
+                    rows: Словари или DTO с одинаковым набором полей.
+                    conflict_keys: Колонки уникального ограничения для ON CONFLICT.
+                    update_fields: Поля для обновления. По умолчанию все поля
+                    строк, кроме ключей конфликта и первичного ключа.
+                    dto: Объект для преобразования результата в объект DTO.
+                    returning: Колонки для RETURNING. По умолчанию колонки DTO.
+
+                Returns:
+                    list[BaseModel] | list[Row] | int: DTO, строки RETURNING
+                    или количество созданных и обновленных записей.
+                """
+                try:
+                    if dto and not returning:
+                        returning = self._base_repo.get_dto_columns(dto)
+                    result = await self._base_repo.bulk_upsert(
+                        rows,
+                        conflict_keys=conflict_keys,
+                        update_fields=update_fields,
+                        returning=returning,
+                    )
+                    if dto:
+                        return [self._to_dto(row, dto) for row in result]
+                    return result
+                except SQLAlchemyError as err:
+                    error_text = (
+                        f"Ошибка массового сохранения объектов "
+                        f"<{self._model.__name__}>.\n"
+                        f"Ключи конфликта {conflict_keys}.\n"
+                        f"Текст ошибки в исключении {str(err)}.\n"
+                    )
+                    sentry_message(
+                        message=error_text,
+                        level="error",
+                        title="REPO:bulk_upsert",
+                    )
+                    raise SQLAlchemyError(error_text) from err
+
+            @instrumented("delete")
             async def delete(self, instance: T) -> None:
                 """
                 Удаляет существующую запись модели из базы данных.
@@ -430,6 +1175,116 @@ class SARepository:
                     )
                     raise SQLAlchemyError(error_text) from err
 
+            @instrumented("update_where")
+            async def update_where(
+                self,
+                values: dict[str, Any],
+                expressions: F | None = None,
+                excludes: dict[InstrumentedAttribute, Any] | None = None,
+                dto: type[BaseModel] | None = None,
+                returning: list[InstrumentedAttribute] | None = None,
+                **filters,
+            ) -> list[BaseModel] | list[Row] | int:
+                """
+                Обновляет все записи модели, удовлетворяющие фильтрам,
+                одним запросом UPDATE ... WHERE без загрузки объектов.
+
+                Args:
+                    values: Атрибуты и значения для обновления.
+                    expressions: F условия OR для фильтрации записей.
+                    excludes: Словарь атрибутов и значений для исключения.
+                    dto: Объект для преобразования результата в объект DTO.
+                    returning: Колонки для RETURNING. По умолчанию колонки DTO.
+                    **filters: Именованные аргументы для добавления в фильтр запроса.
+
+                Returns:
+                    list[BaseModel] | list[Row] | int: DTO, строки RETURNING
+                    или количество обновленных записей.
+
+                Raises:
+                    ValueError: Если не передано ни одного фильтра.
+                """
+                try:
+                    if dto and not returning:
+                        returning = self._base_repo.get_dto_columns(dto)
+                    result = await self._base_repo.update_where(
+                        values,
+                        expressions=expressions,
+                        excludes=excludes,
+                        returning=returning,
+                        **filters,
+                    )
+                    if dto:
+                        return [self._to_dto(row, dto) for row in result]
+                    return result
+                except SQLAlchemyError as err:
+                    error_text = (
+                        f"Ошибка обновления объектов <{self._model.__name__}>.\n"
+                        f"Данные для фильтрации {filters}.\n"
+                        f"Данные для обновления {values}.\n"
+                        f"Текст ошибки в исключении {str(err)}.\n"
+                    )
+                    sentry_message(
+                        message=error_text,
+                        level="error",
+                        title="REPO:repo_update_where",
+                    )
+                    raise SQLAlchemyError(error_text) from err
+
+            @instrumented("delete_where")
+            async def delete_where(
+                self,
+                expressions: F | None = None,
+                excludes: dict[InstrumentedAttribute, Any] | None = None,
+                dto: type[BaseModel] | None = None,
+                returning: list[InstrumentedAttribute] | None = None,
+                **filters,
+            ) -> list[BaseModel] | list[Row] | int:
+                """
+                Удаляет все записи модели, удовлетворяющие фильтрам,
+                одним запросом DELETE ... WHERE без загрузки объектов.
+                Каскадное удаление выполняется только на уровне базы данных.
+
+                Args:
+                    expressions: F условия OR для фильтрации записей.
+                    excludes: Словарь атрибутов и значений для исключения.
+                    dto: Объект для преобразования результата в объект DTO.
+                    returning: Колонки для RETURNING. По умолчанию колонки DTO.
+                    **filters: Именованные аргументы для добавления в фильтр запроса.
+
+                Returns:
+                    list[BaseModel] | list[Row] | int: DTO, строки RETURNING
+                    или количество удаленных записей.
+
+                Raises:
+                    ValueError: Если не передано ни одного фильтра.
+                """
+                try:
+                    if dto and not returning:
+                        returning = self._base_repo.get_dto_columns(dto)
+                    result = await self._base_repo.delete_where(
+                        expressions=expressions,
+                        excludes=excludes,
+                        returning=returning,
+                        **filters,
+                    )
+                    if dto:
+                        return [self._to_dto(row, dto) for row in result]
+                    return result
+                except SQLAlchemyError as err:
+                    error_text = (
+                        f"Ошибка удаления объектов <{self._model.__name__}>.\n"
+                        f"Данные для фильтрации {filters}.\n"
+                        f"Текст ошибки в исключении {str(err)}.\n"
+                    )
+                    sentry_message(
+                        message=error_text,
+                        level="error",
+                        title="REPO:repo_delete_where",
+                    )
+                    raise SQLAlchemyError(error_text) from err
+
+            @instrumented("get_or_create")
             async def get_or_create(
                 self, filters: list[str], dto: BaseModel | None = None, **model_data
             ) -> tuple[T | BaseModel, bool]:
@@ -470,6 +1325,7 @@ class SARepository:
                     )
                     raise SQLAlchemyError(error_text) from err
 
+            @instrumented("update")
             async def update(
                 self, instance: T, dto: BaseModel | None = None, **model_data
             ) -> T | BaseModel:
@@ -507,6 +1363,7 @@ class SARepository:
                     )
                     raise SQLAlchemyError(error_text) from err
 
+            @instrumented("update_or_create")
             async def update_or_create(
                 self,
                 filters: dict[str, Any],
@@ -587,6 +1444,21 @@ class SARepository:
                     return None
                 return result
 
+            def _get_projection(
+                self, dto: BaseModel | None, *loads: list | None
+            ) -> list[InstrumentedAttribute] | None:
+                if not dto or any(loads):
+                    return None
+                return self._base_repo.get_projection(dto)
+
+            def _rows_to_dto(self, rows: Sequence[Row], dto: BaseModel) -> list:
+                data = [row._asdict() for row in rows]
+                try:
+                    return _get_list_adapter(dto).validate_python(data)
+                except ValidationError:
+                    return [self._to_dto(item, dto) for item in data]
+
+            @instrumented("all")
             async def all(
                 self,
                 joined_load: list[relationship] | None = None,  # type: ignore
@@ -609,11 +1481,15 @@ class SARepository:
                     Sequence[T]: Список объектов модели.
                 """
                 try:
+                    columns = self._get_projection(dto, joined_load, select_in_load)
                     result = await self._base_repo.all(
                         joined_load=joined_load,
                         select_in_load=select_in_load,
                         order_by=order_by,
+                        columns=columns,
                     )
+                    if columns:
+                        return self._rows_to_dto(result, dto)
                     if dto:
                         return [self._to_dto(obj, dto) for obj in result]
                     return result
@@ -632,6 +1508,7 @@ class SARepository:
                     if not self._session_exists:
                         await self._session.close()
 
+            @instrumented("count")
             async def count(
                 self,
                 excludes: dict[InstrumentedAttribute, Any] | None = None,
@@ -670,6 +1547,7 @@ class SARepository:
                     if not self._session_exists:
                         await self._session.close()
 
+            @instrumented("get")
             async def get(
                 self,
                 expressions: F | None = None,
@@ -702,13 +1580,17 @@ class SARepository:
                     MultipleResultsFound: Если найдено более одной записи.
                 """
                 try:
+                    columns = self._get_projection(dto, joined_load, select_in_load)
                     result = await self._base_repo.get(
                         expressions=expressions,
                         excludes=excludes,
                         joined_load=joined_load,
                         select_in_load=select_in_load,
+                        columns=columns,
                         **filters,
                     )
+                    if columns:
+                        return self._to_dto(result._asdict(), dto)
                     if dto:
                         return self._to_dto(result, dto)
                     return result
@@ -728,6 +1610,7 @@ class SARepository:
                     if not self._session_exists:
                         await self._session.close()
 
+            @instrumented("exists")
             async def exists(
                 self,
                 excludes: dict[InstrumentedAttribute, Any] | None = None,
@@ -765,6 +1648,7 @@ class SARepository:
                     if not self._session_exists:
                         await self._session.close()
 
+            @instrumented("filter")
             async def filter(
                 self,
                 expressions: F | None = None,
@@ -797,6 +1681,7 @@ class SARepository:
                     Sequence[T]: Список записей модели.
                 """
                 try:
+                    columns = self._get_projection(dto, joined_load, select_in_load)
                     result = await self._base_repo.filter(
                         expressions=expressions,
                         excludes=excludes,
@@ -805,8 +1690,11 @@ class SARepository:
                         order_by=order_by,
                         limit=limit,
                         offset=offset,
+                        columns=columns,
                         **filters,
                     )
+                    if columns:
+                        return self._rows_to_dto(result, dto)
                     if dto:
                         return [self._to_dto(obj, dto) for obj in result]
                     return result
@@ -826,6 +1714,145 @@ class SARepository:
                     if not self._session_exists:
                         await self._session.close()
 
+            @instrumented("paginate")
+            async def paginate(
+                self,
+                after: str | None = None,
+                order_by: list[InstrumentedAttribute] | None = None,
+                page_size: int = 50,
+                dto: BaseModel | None = None,
+                expressions: F | None = None,
+                excludes: dict[InstrumentedAttribute, Any] | None = None,
+                joined_load: list[relationship] | None = None,  # type: ignore
+                select_in_load: list[relationship] | None = None,  # type: ignore
+                **filters,
+            ) -> Page:
+                """
+                Возвращает страницу записей модели с keyset-пагинацией.
+
+                Вместо OFFSET следующая страница выбирается условием
+                (created_at, id) > (:created_at, :id) по колонкам сортировки,
+                поэтому время запроса не растет с номером страницы.
+
+                Args:
+                    after: Курсор из next_cursor предыдущей страницы.
+                    order_by: Колонки сортировки (asc/desc). По умолчанию
+                    ordering() модели. Первичный ключ добавляется в конец.
+                    page_size: Количество записей на странице.
+                    dto: Объект для преобразования результата в объект DTO.
+                    expressions: F условия OR для фильтрации записей.
+                    excludes: Словарь атрибутов и значений для исключения из результата.
+                    joined_load: Список отношений для использования joinedload.
+                    (many-to-one, one-to-one)
+                    select_in_load: Список отношений для использования selectinload.
+                    (one-to-many, many-to-many)
+                    **filters: Именованные аргументы для добавления в фильтр запроса.
+
+                Returns:
+                    Page: Записи страницы и курсор следующей страницы
+                    (None для последней страницы).
+
+                Raises:
+                    ValueError: Если курсор некорректен.
+                """
+                try:
+                    columns = self._get_projection(dto, joined_load, select_in_load)
+                    result = await self._base_repo.paginate(
+                        after=after,
+                        order_by=order_by,
+                        page_size=page_size,
+                        expressions=expressions,
+                        excludes=excludes,
+                        joined_load=joined_load,
+                        select_in_load=select_in_load,
+                        columns=columns,
+                        **filters,
+                    )
+                    if columns:
+                        items = self._rows_to_dto(result.items, dto)
+                        return Page(items=items, next_cursor=result.next_cursor)
+                    if dto:
+                        items = [self._to_dto(obj, dto) for obj in result.items]
+                        return Page(items=items, next_cursor=result.next_cursor)
+                    return result
+                except SQLAlchemyError as err:
+                    error_text = (
+                        f"Ошибка получения объекта <{self._model.__name__}>.\n"
+                        f"Данные для фильтрации {filters}.\n"
+                        f"Текст ошибки в исключении {str(err)}.\n"
+                    )
+                    sentry_message(
+                        message=error_text,
+                        level="error",
+                        title="REPO:repo_paginate",
+                    )
+                    raise SQLAlchemyError(error_text) from err
+                finally:
+                    if not self._session_exists:
+                        await self._session.close()
+
+            @instrumented("stream")
+            async def stream(
+                self,
+                batch_size: int = 1000,
+                dto: BaseModel | None = None,
+                expressions: F | None = None,
+                excludes: dict[InstrumentedAttribute, Any] | None = None,
+                order_by: list[InstrumentedAttribute] | None = None,
+                **filters,
+            ) -> AsyncGenerator[list[T] | list[BaseModel], None]:
+                """
+                Асинхронно перебирает записи модели пачками через серверный курсор.
+
+                В памяти одновременно находится не больше одной пачки, поэтому
+                подходит для обхода больших таблиц. При досрочном выходе из цикла
+                генератор нужно закрыть (contextlib.aclosing), чтобы освободить
+                курсор и сессию.
+
+                Args:
+                    batch_size: Количество записей в пачке.
+                    dto: Объект для преобразования результата в объект DTO.
+                    expressions: F условия OR для фильтрации записей.
+                    excludes: Словарь атрибутов и значений для исключения из результата.
+                    order_by: Список атрибутов для сортировки результата.
+                    **filters: Именованные аргументы для добавления в фильтр запроса.
+
+                Yields:
+                    list[T] | list[BaseModel]: Пачка записей модели или DTO.
+                """
+                try:
+                    columns = self._get_projection(dto)
+                    async for batch in self._base_repo.stream(
+                        batch_size=batch_size,
+                        expressions=expressions,
+                        excludes=excludes,
+                        order_by=order_by,
+                        columns=columns,
+                        **filters,
+                    ):
+                        if columns:
+                            yield self._rows_to_dto(batch, dto)
+                        elif dto:
+                            yield [self._to_dto(obj, dto) for obj in batch]
+                        else:
+                            yield batch
+                except SQLAlchemyError as err:
+                    error_text = (
+                        f"Ошибка получения объекта <{self._model.__name__}>.\n"
+                        f"Данные для фильтрации {filters}.\n"
+                        f"Текст ошибки в исключении {str(err)}.\n"
+                    )
+                    sentry_message(
+                        message=error_text,
+                        level="error",
+                        title="REPO:repo_stream",
+                    )
+                    raise SQLAlchemyError(error_text) from err
+                finally:
+                    if not self._session_exists:
+                        await self._session.close()
+
+            @instrumented("find")
             async def find(
                 self,
                 expressions: F | None = None,
@@ -857,14 +1884,18 @@ class SARepository:
                     или None, если не найдено ни одной.
                 """
                 try:
+                    columns = self._get_projection(dto, joined_load, select_in_load)
                     result = await self._base_repo.find(
                         expressions=expressions,
                         excludes=excludes,
                         joined_load=joined_load,
                         select_in_load=select_in_load,
                         order_by=order_by,
+                        columns=columns,
                         **filters,
                     )
+                    if columns:
+                        return self._to_dto(result and result._asdict(), dto)
                     if dto:
                         return self._to_dto(result, dto)
                     return result
@@ -884,6 +1915,7 @@ class SARepository:
                     if not self._session_exists:
                         await self._session.close()
 
+            @instrumented("get_or_none")
             async def get_or_none(self, dto: BaseModel | None = None, **filters):
                 """
                 Ищет единственную запись модели по заданным фильтрам и возвращает ее,
@@ -902,9 +1934,15 @@ class SARepository:
                     MultipleResultsFound: Если найдено более одной записи.
                 """
                 try:
+                    columns = self._get_projection(
+                        dto, filters.get("joined_load"), filters.get("select_in_load")
+                    )
                     result = await self._base_repo.get_or_none(
+                        columns=columns,
                         **filters,
                     )
+                    if columns:
+                        return self._to_dto(result and result._asdict(), dto)
                     if dto:
                         return self._to_dto(result, dto)
                     return result
@@ -925,12 +1963,20 @@ class SARepository:
                         await self._session.close()
 
         session_exists = self._session is not None
-        session = self._conn.session_factory() if not session_exists else self._session
+        session = (
+            self._conn.read_session_factory() if not session_exists else self._session
+        )
         return QueryWrapper(session, model, session_exists)
 
+    @instrumented("execute")
     async def execute(self, query: Select) -> Result:
         session_exists = self._session is not None
-        session = self._conn.session_factory() if not session_exists else self._session
+        if session_exists:
+            session = self._session
+        elif isinstance(query, Select):
+            session = self._conn.read_session_factory()
+        else:
+            session = self._conn.session_factory()
         try:
             result = await session.execute(query)
             return result
@@ -953,17 +1999,39 @@ class SARepository:
         if not self._session:
             raise ValueError("Вызов возможен только внутри контекстного менеджера")
 
+    async def _discard(self):
+        """Откатывает транзакцию, отбрасывает ее изменения и закрывает сессию"""
+        try:
+            await self._session.rollback()
+        finally:
+            invalidation_registry.pop(self._session)
+            await self._session.close()
+            self._session = None
+
     async def __aenter__(self):
+        self._detector_token = query_detector.start(type(self).__name__)
         self._session: AsyncSession = self._conn.session_factory()
+        invalidation_registry.begin(self._session)
         await self._session.begin()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if exc_type:
-            await self._session.rollback()
+        try:
+            if exc_type:
+                await self._discard()
+                return
+            try:
+                await self._session.commit()
+            except BaseException:
+                # коммит не прошел: изменения не публикуются, сессия
+                # закрывается, и репозиторий можно открыть заново
+                await self._discard()
+                raise
+            changes = invalidation_registry.pop(self._session)
             await self._session.close()
             self._session = None
-            return
-        await self._session.commit()
-        await self._session.close()
-        self._session = None
+            # кэш сбрасывается только после фиксации транзакции
+            await invalidation_registry.publish(changes)
+        finally:
+            query_detector.finish(self._detector_token)
+            self._detector_token = None
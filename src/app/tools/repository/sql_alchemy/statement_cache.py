@@ -0,0 +1,49 @@
+from collections import OrderedDict
+from collections.abc import Hashable
+
+from sqlalchemy import Select
+
+
+class StatementCache:
+    """
+    LRU-кэш параметризованных запросов репозитория.
+
+    Ключ - форма запроса (модель, ключи фильтров, операторы, подгрузки,
+    сортировка, наличие limit/offset), значение - готовый Select со
+    связанными параметрами вместо значений фильтров.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._statements: OrderedDict[Hashable, Select] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def get(self, key: Hashable) -> Select | None:
+        """Возвращает запрос по форме или None"""
+        statement = self._statements.get(key)
+        if statement is None:
+            self.misses += 1
+            return None
+        self._statements.move_to_end(key)
+        self.hits += 1
+        return statement
+
+    def set(self, key: Hashable, statement: Select) -> None:
+        """Сохраняет запрос, вытесняя самую старую форму при переполнении"""
+        self._statements[key] = statement
+        self._statements.move_to_end(key)
+        while len(self._statements) > self.maxsize:
+            self._statements.popitem(last=False)
+
+    def clear(self) -> None:
+        """Очищает кэш и счетчики"""
+        self._statements.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+statement_cache = StatementCache()
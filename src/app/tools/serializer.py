@@ -0,0 +1,108 @@
+import hashlib
+import json
+
+from functools import cache
+from typing import Protocol, TypeVar
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class SerializerProtocol(Protocol):
+    name: str
+
+    def dumps(self, obj: BaseModel) -> bytes:
+        """Преобразует DTO в байты"""
+        pass
+
+    def loads(self, data: bytes, dto: type[M]) -> M:
+        """Восстанавливает DTO из байтов"""
+        pass
+
+
+class JsonSerializer:
+    """JSON с ключами через model_dump_json/model_validate_json pydantic"""
+
+    name = "json"
+
+    def dumps(self, obj: BaseModel) -> bytes:
+        return obj.model_dump_json().encode()
+
+    def loads(self, data: bytes, dto: type[M]) -> M:
+        return dto.model_validate_json(data)
+
+
+@cache
+def _get_fields(dto: type[BaseModel]) -> tuple[tuple[str, ...], TypeAdapter]:
+    fields = dto.model_fields
+    types = tuple(field.annotation for field in fields.values())
+    return tuple(fields), TypeAdapter(tuple[types])
+
+
+class CompactSerializer:
+    """
+    Значения полей DTO списком без имен ключей.
+
+    JSON-массив разбирается TypeAdapter для кортежа типов полей, поэтому
+    даты и UUID восстанавливаются без промежуточных строк в Python.
+    """
+
+    name = "compact"
+
+    def dumps(self, obj: BaseModel) -> bytes:
+        names, adapter = _get_fields(type(obj))
+        return adapter.dump_json(tuple(getattr(obj, name) for name in names))
+
+    def loads(self, data: bytes, dto: type[M]) -> M:
+        names, adapter = _get_fields(dto)
+        values = adapter.validate_json(data)
+        return dto.model_validate(dict(zip(names, values, strict=True)))
+
+
+SERIALIZERS: dict[str, type[SerializerProtocol]] = {
+    JsonSerializer.name: JsonSerializer,
+    CompactSerializer.name: CompactSerializer,
+}
+
+
+@cache
+def schema_version(dto: type[BaseModel]) -> str:
+    """Короткий хэш JSON-схемы DTO, меняется при изменении полей"""
+    schema = json.dumps(dto.model_json_schema(), sort_keys=True)
+    return hashlib.blake2b(schema.encode(), digest_size=4).hexdigest()
+
+
+class VersionedCodec:
+    """
+    Сериализатор с заголовком "<формат>:<версия схемы>|".
+
+    Записи в другом формате или со старой версией схемы DTO при чтении
+    считаются отсутствующими. Записи без заголовка (старый формат кэша -
+    JSON-объект) читаются как JSON.
+    """
+
+    def __init__(self, serializer: SerializerProtocol):
+        self.serializer = serializer
+
+    def _header(self, dto: type[BaseModel]) -> bytes:
+        return f"{self.serializer.name}:{schema_version(dto)}|".encode()
+
+    def dumps(self, obj: BaseModel) -> bytes:
+        return self._header(type(obj)) + self.serializer.dumps(obj)
+
+    def loads(self, data: bytes | str | None, dto: type[M]) -> M | None:
+        if not data:
+            return None
+        if isinstance(data, str):
+            data = data.encode()
+        try:
+            if data.startswith(b"{"):
+                return dto.model_validate_json(data)
+            header = self._header(dto)
+            if not data.startswith(header):
+                return None
+            return self.serializer.loads(data[len(header) :], dto)
+        except (ValidationError, ValueError):
+            return None
@@ -25,6 +25,12 @@ class DatabaseConfig(BaseModel):
     echo_pool: bool = False
     pool_size: int = 30
     max_overflow: int = 10
+    slow_query_ms: float | None = None
+    detect_n_plus_one: bool = False
+    n_plus_one_threshold: int = 3
+    replica_urls: list[str] = []
+    replica_policy: str = "round_robin"
+    replica_retry_after: float = 30
 
     naming_convention: dict[str, str] = {
         "ix": "ix_%(column_0_label)s",
@@ -51,10 +57,30 @@ class RedisConfig(BaseModel):
     HOST: str = "localhost"
     PORT: int = 6379
     DB: int = 3
+    LOCAL_CACHE_SIZE: int = 0
+    LOCAL_CACHE_TTL: int = 60
+    SERIALIZER: str = "compact"
 
 
 class AIConfig(BaseModel):
     SERVICE_URL: str = "localhost"
+    POOL_LIMIT: int = 100
+    POOL_LIMIT_PER_HOST: int = 100
+    CONNECT_TIMEOUT: float = 10
+    READ_TIMEOUT: float = 120
+    DNS_TTL: int = 300
+    KEEPALIVE_TIMEOUT: float = 30
+    MAX_CONCURRENCY: int = 16
+    MAX_QUEUE: int = 1000
+    QUEUE_TIMEOUT: float = 60
+    DEADLINE: float = 180
+    RETRIES: int = 2
+    BACKOFF: float = 0.5
+    BACKOFF_MAX: float = 5
+    BREAKER_THRESHOLD: int = 5
+    BREAKER_RECOVERY_TIMEOUT: float = 30
+    ASSESSMENT_CACHE_SIZE: int = 10000
+    ASSESSMENT_CACHE_TTL: int = 60 * 60 * 24
 
 
 class Config(BaseSettings):
@@ -1,5 +1,11 @@
-from collections.abc import AsyncGenerator
+import itertools
+import time
 
+from collections.abc import AsyncGenerator, Sequence
+from typing import Protocol
+
+from sqlalchemy import Engine
+from sqlalchemy.exc import InterfaceError, OperationalError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -10,6 +16,78 @@ from sqlalchemy.ext.asyncio import (
 from core.config import config
 
 
+class ReplicaPolicy(Protocol):
+    def choose(self, engines: Sequence[AsyncEngine]) -> AsyncEngine:
+        """Выбирает реплику для чтения"""
+        pass
+
+
+class RoundRobinPolicy:
+    """Реплики выбираются по очереди"""
+
+    def __init__(self):
+        self._counter = itertools.count()
+
+    def choose(self, engines: Sequence[AsyncEngine]) -> AsyncEngine:
+        return engines[next(self._counter) % len(engines)]
+
+
+class LeastConnectionsPolicy:
+    """Выбирается реплика с наименьшим числом занятых соединений пула"""
+
+    def choose(self, engines: Sequence[AsyncEngine]) -> AsyncEngine:
+        return min(engines, key=lambda engine: engine.pool.checkedout())
+
+
+REPLICA_POLICIES: dict[str, type[ReplicaPolicy]] = {
+    "round_robin": RoundRobinPolicy,
+    "least_connections": LeastConnectionsPolicy,
+}
+
+
+class ReplicaSession(AsyncSession):
+    """
+    Сессия чтения с реплики.
+
+    Если реплика недоступна, она помечается недоступной на
+    replica_retry_after секунд, а запрос повторяется на основной базе.
+    scalars и stream_scalars вызывают execute и stream, поэтому отдельно
+    не переопределяются; get и get_one идут мимо execute.
+    """
+
+    def __init__(self, *args, helper: "DatabaseHelper", **kwargs):
+        super().__init__(*args, **kwargs)
+        self._helper = helper
+
+    async def _with_fallback(self, method: str, *args, **kwargs):
+        try:
+            return await getattr(super(), method)(*args, **kwargs)
+        except (OperationalError, InterfaceError, OSError):
+            replica = self.sync_session.bind
+            if replica is self._helper.engine.sync_engine:
+                raise
+            self._helper.mark_replica_down(replica)
+            await self.close()
+            self.bind = self._helper.engine
+            self.sync_session.bind = self._helper.engine.sync_engine
+            return await getattr(super(), method)(*args, **kwargs)
+
+    async def execute(self, *args, **kwargs):
+        return await self._with_fallback("execute", *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await self._with_fallback("scalar", *args, **kwargs)
+
+    async def stream(self, *args, **kwargs):
+        return await self._with_fallback("stream", *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await self._with_fallback("get", *args, **kwargs)
+
+    async def get_one(self, *args, **kwargs):
+        return await self._with_fallback("get_one", *args, **kwargs)
+
+
 class DatabaseHelper:
     def __init__(
         self,
@@ -18,6 +96,9 @@ class DatabaseHelper:
         echo_pool: bool = False,
         pool_size: int = 30,
         max_overflow: int = 10,
+        replica_urls: Sequence[str] = (),
+        replica_policy: ReplicaPolicy | None = None,
+        replica_retry_after: float = 30,
     ) -> None:
         self.engine: AsyncEngine = create_async_engine(
             url=url,
@@ -32,9 +113,63 @@ class DatabaseHelper:
             autocommit=False,
             expire_on_commit=False,
         )
+        self.replicas: list[AsyncEngine] = [
+            create_async_engine(
+                url=replica_url,
+                echo=echo,
+                echo_pool=echo_pool,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_pre_ping=True,
+            )
+            for replica_url in replica_urls
+        ]
+        self.replica_policy = replica_policy or RoundRobinPolicy()
+        self.replica_retry_after = replica_retry_after
+        self._replica_down_until: dict[Engine, float] = {}
+        self._read_session_factory: async_sessionmaker[ReplicaSession] = (
+            async_sessionmaker(
+                bind=self.engine,
+                class_=ReplicaSession,
+                helper=self,
+                autoflush=False,
+                autocommit=False,
+                expire_on_commit=False,
+            )
+        )
+
+    def choose_replica(self) -> AsyncEngine | None:
+        """Возвращает доступную реплику по политике или None"""
+        now = time.monotonic()
+        available = [
+            engine
+            for engine in self.replicas
+            if self._replica_down_until.get(engine.sync_engine, 0) <= now
+        ]
+        if not available:
+            return None
+        return self.replica_policy.choose(available)
+
+    def mark_replica_down(self, replica: Engine) -> None:
+        """Исключает реплику из выбора на replica_retry_after секунд"""
+        self._replica_down_until[replica] = time.monotonic() + self.replica_retry_after
+
+    def read_session_factory(self) -> AsyncSession:
+        """
+        Возвращает сессию только для чтения.
+
+        Без реплик или если все реплики недоступны - обычная сессия
+        основной базы.
+        """
+        replica = self.choose_replica()
+        if replica is None:
+            return self.session_factory()
+        return self._read_session_factory(bind=replica)
 
     async def dispose(self) -> None:
         await self.engine.dispose()
+        for replica in self.replicas:
+            await replica.dispose()
 
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
         async with self.session_factory() as session:
@@ -47,4 +182,7 @@ db_conn = DatabaseHelper(
     echo_pool=config.db.echo_pool,
     pool_size=config.db.pool_size,
     max_overflow=config.db.max_overflow,
+    replica_urls=config.db.replica_urls,
+    replica_policy=REPLICA_POLICIES[config.db.replica_policy](),
+    replica_retry_after=config.db.replica_retry_after,
 )
@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, Integer, Text
+from sqlalchemy import ForeignKey, Index, Integer, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from model.base import Base, int_pk
@@ -8,6 +8,7 @@ from model.base import Base, int_pk
 
 class AIAssessment(Base):
     __tablename__ = "ai_assessment"
+    __table_args__ = (Index("ix_ai_assessment_created_at_id", "created_at", "id"),)
 
     id: Mapped[int_pk]
     text: Mapped[str] = mapped_column(Text, nullable=False, doc="Текст оценки")
@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, SmallInteger, Text
+from sqlalchemy import ForeignKey, Index, SmallInteger, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from model.base import Base, int_pk
@@ -8,6 +8,10 @@ from model.base import Base, int_pk
 
 class Answer(Base):
     __tablename__ = "answer"
+    __table_args__ = (
+        Index("ix_answer_created_at_id", "created_at", "id"),
+        Index("ix_answer_user_id_created_at", "user_id", "created_at"),
+    )
 
     id: Mapped[int_pk]
     text: Mapped[str] = mapped_column(Text, nullable=False, doc="Текст ответа")
@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from model.base import Base, int_pk
@@ -8,6 +8,9 @@ from model.base import Base, int_pk
 
 class UserQuestion(Base):
     __tablename__ = "user_question"
+    __table_args__ = (
+        Index("ix_user_question_user_id_question_id", "user_id", "question_id"),
+    )
 
     id: Mapped[int_pk]
     user_id: Mapped[UUID] = mapped_column(
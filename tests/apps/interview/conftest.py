@@ -1,5 +1,11 @@
+import asyncio
+import json
+
 import pytest
 
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
 from app.apps.interview.repository.question import SQLAlchemyQuestionRepositoryV1
 from app.apps.interview.repository.question_technology import (
     SQLAlchemyQuestionTechnologyRepositoryV1,
@@ -101,3 +107,60 @@ async def init_data(session):
             "q_sql_2": q_sql_2,
             "q_sql_3": q_sql_3,
         }
+
+
+LLM_DELTAS = ["", " Оценка", " 7/10.", " Ответ (почти) полный", "! "]
+
+
+@pytest.fixture(scope="function")
+async def llm_server():
+    """
+    Заглушка сервиса LLM.
+
+    Запросы со stream получают ответ SSE по частям LLM_DELTAS, остальные -
+    JSON с полным текстом; запрос с "broken" получает ответ не в JSON.
+    Адреса клиентских соединений запоминаются в peers.
+
+    Сбои задаются списком faults: каждый запрос забирает первый элемент -
+    "error" (ответ 503), "reset" (закрытие соединения без ответа), "slow"
+    (ответ через секунду) или "cut" (обрыв потока после первой части).
+    """
+    peers = []
+    faults = []
+
+    async def handler(request: web.Request) -> web.StreamResponse:
+        peers.append(request.transport.get_extra_info("peername"))
+        data = await request.json()
+        fault = faults.pop(0) if faults else None
+        if fault == "error":
+            return web.json_response({"error": "overloaded"}, status=503)
+        if fault == "reset":
+            request.transport.close()
+            return web.Response()
+        if fault == "slow":
+            await asyncio.sleep(1)
+        if data.get("broken"):
+            return web.Response(text="not json")
+        if not data.get("stream"):
+            content = "".join(LLM_DELTAS)
+            return web.json_response({"choices": [{"message": {"content": content}}]})
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await response.write(b": ping\n\n")
+        for delta in LLM_DELTAS:
+            chunk = {"choices": [{"delta": {"content": delta}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            if fault == "cut":
+                request.transport.close()
+                return response
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", handler)
+    server = TestServer(app)
+    await server.start_server()
+    server.peers = peers
+    server.faults = faults
+    yield server
+    await server.close()
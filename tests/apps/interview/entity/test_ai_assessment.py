@@ -0,0 +1,53 @@
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.apps.interview.entity import ai_assessment
+from app.apps.interview.entity.ai_assessment import Priority
+
+
+@pytest.mark.app
+async def test_normalize_text_to_markdown_by_chunks():
+    text = "Оценка 7/10. Итог: [list](url) - *good*_!"
+    chunks = [text[i : i + 3] for i in range(0, len(text), 3)]
+    assert "".join(
+        ai_assessment.normalize_text_to_markdown(chunk) for chunk in chunks
+    ) == ai_assessment.normalize_text_to_markdown(text)
+    assert ai_assessment.normalize_text_to_markdown("a.b (c)") == r"a\.b \(c\)"
+
+
+@pytest.mark.app
+async def test_extract_delta_from_llm_chunk():
+    extract = ai_assessment.extract_delta_from_llm_chunk
+    assert extract({"choices": [{"delta": {"content": "abc"}}]}) == "abc"
+    assert extract({"choices": [{"delta": {"role": "assistant"}}]}) == ""
+    assert extract({"choices": [{"message": {"content": "full"}}]}) == "full"
+    assert extract({"choices": []}) == ""
+    assert extract({"error": "overloaded"}) == ""
+
+
+@pytest.mark.app
+async def test_get_priority():
+    now = datetime(2026, 1, 1)
+    user = SimpleNamespace(subscription=None)
+    assert ai_assessment.get_priority(user, now) == Priority.DEFAULT
+    user.subscription = now + timedelta(days=1)
+    assert ai_assessment.get_priority(user, now) == Priority.SUBSCRIBED
+    user.subscription = now - timedelta(days=1)
+    assert ai_assessment.get_priority(user, now) == Priority.DEFAULT
+    user.subscription = datetime.now(UTC) + timedelta(days=1)
+    assert ai_assessment.get_priority(user) == Priority.SUBSCRIBED
+
+
+@pytest.mark.app
+async def test_get_assessment_key():
+    assert ai_assessment.normalize_answer("  Не  ЗНАЮ ёлка...\n") == "не знаю елка"
+    assert ai_assessment.normalize_answer("a.b()") == "a.b()"
+    key = ai_assessment.get_assessment_key(1, "Не знаю", "prompt", 0.7, -1)
+    assert key.startswith("assessment:")
+    assert key == ai_assessment.get_assessment_key(1, " не знаю!", "prompt", 0.7, -1)
+    assert key != ai_assessment.get_assessment_key(2, "не знаю", "prompt", 0.7, -1)
+    assert key != ai_assessment.get_assessment_key(1, "знаю", "prompt", 0.7, -1)
+    assert key != ai_assessment.get_assessment_key(1, "не знаю", "other", 0.7, -1)
+    assert key != ai_assessment.get_assessment_key(1, "не знаю", "prompt", 0.2, -1)
@@ -1,10 +1,14 @@
+import random
+
+from collections import Counter
 from datetime import datetime
 
 import pytest
 import pytz
 
 from app.apps.interview.dto.question import QuestionDto
-from app.apps.interview.entity.question import QuestionEntity
+from app.apps.interview.entity.question import QuestionEntity, QuestionSampler
+from app.tools.alias import AliasTable
 
 
 @pytest.mark.app
@@ -45,3 +49,56 @@ async def test_get_random_question_empty_questions():
     questions = []
     question = QuestionEntity.get_random_question(questions)
     assert question is None
+
+
+@pytest.mark.app
+async def test_alias_table():
+    weights = [1, 0, 3, 6]
+    table = AliasTable(weights)
+    rng = random.Random(1)
+    counts = Counter(table.sample(rng) for _ in range(100_000))
+    assert counts[1] == 0
+    for index, weight in enumerate(weights):
+        assert counts[index] / 100_000 == pytest.approx(weight / 10, abs=0.01)
+    with pytest.raises(ValueError):
+        AliasTable([0, 0])
+
+
+@pytest.mark.app
+async def test_get_target_complexity():
+    assert QuestionEntity.get_target_complexity([]) == 5
+    assert QuestionEntity.get_target_complexity([1, 1]) == 1
+    assert QuestionEntity.get_target_complexity([10, 9, 10]) == 9
+    assert QuestionEntity.get_target_complexity([5, 6]) == 5
+
+
+@pytest.mark.app
+async def test_sampler_weighted():
+    sampler = QuestionSampler()
+    assert sampler.missing(["sql", "python"]) == ["python", "sql"]
+    sampler.load(
+        ["python", "sql"],
+        [("python", 1, 1), ("python", 9, 2), ("python", 9, 3), ("sql", 5, 4)],
+    )
+    assert sampler.missing(["python", "go"]) == ["go"]
+    rng = random.Random(1)
+    counts = Counter(sampler.sample(["python"], 9, k=10_000, rng=rng))
+    assert counts[2] + counts[3] > 0.99 * 10_000
+    assert counts[2] == pytest.approx(counts[3], rel=0.1)
+    counts = Counter(sampler.sample(["python"], 1, k=10_000, rng=rng))
+    assert counts[1] > 0.99 * 10_000
+    assert sampler.sample(["go"], 5) == []
+
+
+@pytest.mark.app
+async def test_sampler_update():
+    sampler = QuestionSampler()
+    sampler.load(["python"], [("python", 9, 1), ("python", 9, 2), ("python", 1, 3)])
+    assert set(sampler.sample(["python"], 9, k=1000)) >= {1, 2}
+    sampler.mark_changed([1, 3, 5])
+    assert sampler.pending == {1, 3, 5}
+    # 1 снят с публикации, 3 стал сложным, 5 - вопрос незагруженной технологии
+    sampler.update([1, 3, 5], [("python", 9, 3), ("go", 9, 5)])
+    assert not sampler.pending
+    assert set(sampler.sample(["python"], 9, k=1000)) == {2, 3}
+    assert sampler.sample(["go"], 9) == []
@@ -0,0 +1,53 @@
+import pytest
+
+from app.apps.interview.entity.review import (
+    DAY,
+    MIN_EASINESS,
+    ReviewState,
+    quality_from_score,
+    replay,
+    review,
+)
+
+
+@pytest.mark.app
+async def test_quality_from_score():
+    assert [quality_from_score(score) for score in (0, 1, 5, 6, 10, 11)] == [
+        0,
+        0,
+        2,
+        3,
+        5,
+        5,
+    ]
+
+
+@pytest.mark.app
+async def test_review_intervals():
+    state = review(None, 10, 0)
+    assert state == ReviewState(1, 1.0, 2.6, DAY)
+    state = review(state, 10, state.due)
+    assert (state.repetitions, state.interval) == (2, 6.0)
+    state = review(state, 10, state.due)
+    assert (state.repetitions, state.interval) == (3, round(6 * 2.7))
+    assert state.due == pytest.approx(DAY * (1 + 6 + 16))
+
+
+@pytest.mark.app
+async def test_review_failed():
+    state = review(ReviewState(4, 40, 1.4, 0), 2, 100)
+    assert state.repetitions == 0
+    assert state.interval == 1.0
+    assert state.easiness == MIN_EASINESS
+    assert state.due == 100 + DAY
+
+
+@pytest.mark.app
+async def test_replay():
+    assert replay([]) is None
+    scores = [(9, 0), (4, DAY), (8, 2 * DAY)]
+    state = None
+    for score, answered_at in scores:
+        state = review(state, score, answered_at)
+    assert replay(scores) == state
+    assert ReviewState.loads(state.dumps(), state.due) == pytest.approx(state, 1e-3)
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+import pytest
+
+from app.apps.interview.repository.answer import SAAnswerRepoV2
+from core.database import DatabaseHelper
+from model import AIAssessment, Answer
+
+
+@pytest.mark.app
+async def test_stream_scores(database, session, init_data):
+    user = init_data["user"]
+    q_sql_1, q_sql_2 = init_data["q_sql_1"], init_data["q_sql_2"]
+    async with session.begin():
+        first = Answer(text="1", user_id=user.id, question_id=q_sql_2.id, score=3)
+        second = Answer(text="2", user_id=user.id, question_id=q_sql_2.id, score=4)
+        other = Answer(text="3", user_id=user.id, question_id=q_sql_1.id, score=5)
+        session.add_all([first, second, other])
+        await session.flush()
+        second.created_at = first.created_at + timedelta(minutes=1)
+        session.add(
+            AIAssessment(
+                text="Оценка 9/10",
+                score=9,
+                user_id=user.id,
+                question_id=q_sql_2.id,
+                answer_id=second.id,
+            )
+        )
+
+    answer_repo = SAAnswerRepoV2(DatabaseHelper(url=database))
+    batches = [
+        batch async for batch in answer_repo.stream_scores([user.id], batch_size=2)
+    ]
+    assert [len(batch) for batch in batches] == [2, 1]
+    scores = [score for batch in batches for score in batch]
+    assert [(s.question_id, s.score) for s in scores] == [
+        (q_sql_1.id, 5),
+        (q_sql_2.id, 3),
+        (q_sql_2.id, 9),
+    ]
+    assert [batch async for batch in answer_repo.stream_scores([])] == []
+    assert await answer_repo.get_last_scores(user.id, limit=2) == [9, 5]
@@ -0,0 +1,34 @@
+import pytest
+
+from app.apps.interview.entity.question import QuestionEntity
+from app.apps.interview.repository.question import SAQuestionRepoV2
+from core.database import DatabaseHelper
+
+
+@pytest.mark.app
+async def test_get_question_complexities(database, init_data):
+    question_repo = SAQuestionRepoV2(DatabaseHelper(url=database))
+    rows = await question_repo.get_question_complexities(technologies=["sql", "go"])
+    assert sorted(rows) == sorted(
+        ("sql", 5, init_data[f"q_sql_{i}"].id) for i in range(1, 4)
+    )
+    q_sql_1 = init_data["q_sql_1"].id
+    rows = await question_repo.get_question_complexities(question_ids=[q_sql_1])
+    assert rows == [("sql", 5, q_sql_1)]
+
+
+@pytest.mark.app
+async def test_update_question_marks_sampler(database, init_data, mocker):
+    mocker.patch("app.tools.cache.cache_service.delete")
+    mocker.patch(
+        "app.apps.interview.repository.question_cache.redis_question_repo.delete_question_pools"
+    )
+    sampler = mocker.patch.object(QuestionEntity, "sampler")
+    question_repo = SAQuestionRepoV2(DatabaseHelper(url=database))
+    q_sql_1 = init_data["q_sql_1"].id
+    async with question_repo:
+        await question_repo.stmt(question_repo.model).update_where(
+            {"complexity": 8}, id=q_sql_1
+        )
+    [ids], _ = sampler.mark_changed.call_args
+    assert ids == {q_sql_1}
@@ -0,0 +1,15 @@
+import pytest
+
+from app.apps.interview.repository.question import SAQuestionRepoV2
+from core.database import DatabaseHelper
+
+
+@pytest.mark.app
+async def test_get_question_pools_python_sql(database, init_data):
+    question_repo = SAQuestionRepoV2(DatabaseHelper(url=database))
+    pools = await question_repo.get_question_pools(["python", "sql", "go"])
+    assert {technology: sorted(ids) for technology, ids in pools.items()} == {
+        "python": sorted(init_data[f"q_python_{i}"].id for i in range(1, 4)),
+        "sql": sorted(init_data[f"q_sql_{i}"].id for i in range(1, 4)),
+        "go": [],
+    }
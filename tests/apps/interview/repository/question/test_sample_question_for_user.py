@@ -0,0 +1,38 @@
+import pytest
+
+from app.apps.interview.dto.question import QuestionDto
+from app.apps.interview.repository.question import SAQuestionRepoV2
+from core.database import DatabaseHelper
+
+
+@pytest.mark.app
+async def test_sample_question_for_user_unanswered(database, init_data):
+    question_repo = SAQuestionRepoV2(DatabaseHelper(url=database))
+    questions = await question_repo.sample_question_for_user(
+        user_id=init_data["user"].id, technologies=["python", "sql"]
+    )
+    assert len(questions) == 1
+    assert isinstance(questions[0], QuestionDto)
+    assert questions[0].id == init_data["q_sql_3"].id
+
+
+@pytest.mark.app
+async def test_sample_question_for_user_answered_fallback(database, init_data):
+    question_repo = SAQuestionRepoV2(DatabaseHelper(url=database))
+    questions = await question_repo.sample_question_for_user(
+        user_id=init_data["user"].id, technologies=["python", "sql"], k=4
+    )
+    assert len(questions) == 4
+    assert questions[0].id == init_data["q_sql_3"].id
+    assert len({question.id for question in questions}) == 4
+
+
+@pytest.mark.app
+async def test_sample_question_for_user_all_answered(database, init_data):
+    question_repo = SAQuestionRepoV2(DatabaseHelper(url=database))
+    questions = await question_repo.sample_question_for_user(
+        user_id=init_data["user"].id, technologies=["python"], k=10
+    )
+    assert sorted(question.id for question in questions) == sorted(
+        init_data[f"q_python_{i}"].id for i in range(1, 4)
+    )
@@ -0,0 +1,138 @@
+from uuid import uuid4
+
+import pytest
+
+from redis.asyncio.client import Pipeline
+
+from app.apps.interview.entity.review import ReviewState
+from app.apps.interview.repository.question_cache import (
+    QuestionChoice,
+    RedisQuestionRepo,
+)
+from app.tools.bitmap import to_bitmap
+from app.tools.cache import Cache
+
+
+@pytest.fixture(scope="function")
+def pipeline(mocker):
+    """Команды конвейера и ответы Redis на них"""
+    pipeline = {"commands": [], "results": []}
+
+    async def execute(pipe, raise_on_error=True):
+        pipeline["commands"].append([args for args, _ in pipe.command_stack])
+        return pipeline["results"].pop(0)
+
+    mocker.patch.object(Pipeline, "execute", execute)
+    return pipeline
+
+
+@pytest.mark.cache
+async def test_question_cache_choose_question(pipeline):
+    user_id = uuid4()
+    pipeline["results"] = [[[1, [1, 1], 7], [(b"4", 100.0)]]]
+    choice = await RedisQuestionRepo(Cache()).choose_question(
+        user_id, ["sql", "python", "sql"]
+    )
+    assert choice == QuestionChoice(7, [], True, (4, 100.0))
+    [commands] = pipeline["commands"]
+    assert [args[0] for args in commands] == ["EVALSHA", "ZRANGE"]
+    # случайный бит выбирается в Redis, карта кандидатов не читается
+    assert commands[0][2:7] == (
+        5,
+        f"user_id:{user_id}:seen_questions",
+        f"user_id:{user_id}:candidates",
+        f"user_id:{user_id}:candidates_seen",
+        "question_pool:python",
+    )
+    assert commands[0][7] == "question_pool:sql"
+    assert 0 <= commands[0][8] < 1
+
+
+@pytest.mark.cache
+async def test_question_cache_choose_question_all_seen(pipeline):
+    pipeline["results"] = [[[1, [1], None], []]]
+    choice = await RedisQuestionRepo(Cache()).choose_question(uuid4(), ["python"])
+    assert choice == QuestionChoice(None, [], True)
+    assert choice.all_seen
+
+
+@pytest.mark.cache
+async def test_question_cache_choose_any_question(mocker):
+    cache = Cache()
+    repo = RedisQuestionRepo(cache)
+    user_id = uuid4()
+    evalsha = mocker.patch.object(
+        cache.redis_cache, "evalsha", new_callable=mocker.AsyncMock, return_value=3
+    )
+    assert await repo.choose_any_question(user_id, ["python"]) == 3
+    _, numkeys, *keys, _, built_bit = evalsha.await_args.args
+    assert numkeys == 2
+    assert keys == [f"user_id:{user_id}:candidates", "question_pool:python"]
+    assert built_bit == 0
+
+
+@pytest.mark.cache
+async def test_question_cache_choose_question_missing(pipeline):
+    pipeline["results"] = [[[0, [1, 0], None], []]]
+    choice = await RedisQuestionRepo(Cache()).choose_question(
+        uuid4(), ["python", "sql"]
+    )
+    assert choice == QuestionChoice(None, ["sql"], False)
+    assert not choice.complete
+
+
+@pytest.mark.cache
+async def test_question_cache_set_question_pools(pipeline):
+    pipeline["results"] = [[True] * 4]
+    await RedisQuestionRepo(Cache()).set_question_pools({"python": [1, 2], "go": []})
+    [commands] = pipeline["commands"]
+    assert ("SET", "question_pool:python", b"\xe0", "EX", 86400) in commands
+    assert ("SET", "question_pool:go", b"\x80", "EX", 86400) in commands
+    assert ("SADD", "question_pool:technologies", "python", "go") in commands
+
+
+@pytest.mark.cache
+async def test_question_cache_seen_questions(mocker):
+    cache = Cache()
+    repo = RedisQuestionRepo(cache)
+    user_id = uuid4()
+    get = mocker.patch.object(cache.redis_cache, "get", new_callable=mocker.AsyncMock)
+    get.return_value = to_bitmap([0, 5, 9])
+    assert await repo.get_seen_questions(user_id) == [5, 9]
+    get.return_value = to_bitmap([5])
+    assert await repo.get_seen_questions(user_id) is None
+    set_ = mocker.patch.object(cache.redis_cache, "set", new_callable=mocker.AsyncMock)
+    await repo.set_seen_questions(user_id, [5, 9])
+    set_.assert_awaited_once_with(
+        f"user_id:{user_id}:seen_questions", to_bitmap([0, 5, 9]), 60 * 60 * 24 * 7
+    )
+
+
+@pytest.mark.cache
+async def test_question_cache_review_states(pipeline):
+    user_id = uuid4()
+    state = ReviewState(2, 6, 2.5, 1000.0)
+    pipeline["results"] = [[True] * 5, [b"2:6:2.5", 1000.0, None, None]]
+    cache = Cache()
+    repo = RedisQuestionRepo(cache)
+    await repo.set_review_states([(user_id, 3, state)], replace=True)
+    assert await repo.get_review_states([(user_id, 3), (user_id, 4)]) == [
+        state,
+        None,
+    ]
+    commands = pipeline["commands"][0]
+    assert commands[0][0] == "DEL"
+    assert ("HSET", f"user_id:{user_id}:review_state", 3, "2:6:2.5") in commands
+    assert ("ZADD", f"user_id:{user_id}:review_queue", 1000.0, 3) in commands
+
+
+@pytest.mark.cache
+async def test_question_cache_filter_unseen_questions(pipeline):
+    user_id = uuid4()
+    pipeline["results"] = [[1, 0, 0]]
+    assert await RedisQuestionRepo(Cache()).filter_unseen_questions(
+        user_id, [5, 7, 5]
+    ) == [7, 5]
+    [commands] = pipeline["commands"]
+    assert commands[0] == ("GETBIT", f"user_id:{user_id}:seen_questions", 5)
+    assert await RedisQuestionRepo(Cache()).filter_unseen_questions(user_id, []) == []
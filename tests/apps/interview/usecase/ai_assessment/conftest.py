@@ -0,0 +1,31 @@
+import pytest
+
+from app.apps.interview.repository.ai_assessment import AIAssessmentRepository
+from app.apps.interview.repository.answer import SAAnswerRepoV2
+from app.apps.interview.utils.request_service import RequestService
+from app.apps.user.dto.user import UserDto
+from core.database import DatabaseHelper
+
+
+@pytest.fixture(scope="function")
+async def assessment_data(database, init_data, llm_server, mocker):
+    mocker.patch("app.tools.cache.cache_service.get_stack", return_value=["sql"])
+    answer = await SAAnswerRepoV2(DatabaseHelper(url=database)).create_answer(
+        text="answer",
+        user_id=init_data["user"].id,
+        question_id=init_data["q_sql_3"].id,
+    )
+    service = RequestService(str(llm_server.make_url("/v1/chat/completions")))
+    repo = AIAssessmentRepository(
+        system_prompt_assessment="assessment",
+        system_prompt_help="help",
+        llm_request_service=service,
+        connection=DatabaseHelper(url=database),
+    )
+    yield {
+        "user": UserDto.model_validate(init_data["user"]),
+        "question": init_data["q_sql_3"],
+        "answer": answer,
+        "repo": repo,
+    }
+    await service.close()
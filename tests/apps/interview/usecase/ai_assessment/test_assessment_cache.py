@@ -0,0 +1,56 @@
+import pytest
+
+from app.apps.interview.repository.ai_assessment import AIAssessmentRepository
+from app.apps.interview.repository.answer import SAAnswerRepoV2
+from app.apps.interview.usecase.ai_assessment import AIAssessmentUseCase
+from app.apps.interview.utils.assessment_cache import AssessmentCache
+from app.tools.cache import cache_service
+from core.database import DatabaseHelper
+
+
+@pytest.mark.app
+@pytest.mark.parametrize("stream", [False, True])
+async def test_get_ai_assessment_cached(
+    assessment_data, database, llm_server, mocker, stream
+):
+    create = mocker.spy(AIAssessmentRepository, "create_ai_assessment")
+    answer = await SAAnswerRepoV2(DatabaseHelper(url=database)).create_answer(
+        text="  ANSWER. ",
+        user_id=assessment_data["user"].id,
+        question_id=assessment_data["question"].id,
+    )
+    cache = AssessmentCache(maxsize=10, ttl=60)
+    uc = AIAssessmentUseCase(
+        cache_service=cache_service,
+        ai_assessment_repo=assessment_data["repo"],
+        stream=stream,
+        assessment_cache=cache,
+    )
+    user, question = assessment_data["user"], assessment_data["question"]
+    first = await uc.get_ai_assessment(user, question, assessment_data["answer"])
+    second = await uc.get_ai_assessment(user, question, answer)
+    # второй ответ оценен без запроса к LLM
+    assert len(llm_server.peers) == 1
+    assert create.call_count == 2
+    assert second.answer_id == answer.id
+    assert (second.text, second.score) == (first.text, first.score)
+    snapshot = cache.snapshot()
+    assert snapshot["hits"] == snapshot["misses"] == 1
+    assert snapshot["hit_rate"] == 0.5
+    assert snapshot["size"] == 1
+    assert snapshot["saved_llm_seconds"] > 0
+
+
+@pytest.mark.app
+async def test_stream_ai_assessment_cached(assessment_data):
+    uc = AIAssessmentUseCase(
+        cache_service=cache_service,
+        ai_assessment_repo=assessment_data["repo"],
+        assessment_cache=AssessmentCache(),
+    )
+    data = [assessment_data[key] for key in ("user", "question", "answer")]
+    streamed = [chunk async for chunk in uc.stream_ai_assessment(*data)]
+    cached = [chunk async for chunk in uc.stream_ai_assessment(*data)]
+    assert len(cached) == 2
+    assert cached[0].text == "".join(chunk.text for chunk in streamed).rstrip()
+    assert cached[1].assessment.text == streamed[-1].assessment.text
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.apps.interview.dto.ai_assessment import AIAssessmentDTO
+from app.apps.interview.entity.ai_assessment import normalize_text_to_markdown
+from app.apps.interview.repository.ai_assessment import AIAssessmentRepository
+from app.apps.interview.usecase.ai_assessment import AIAssessmentUseCase
+from app.apps.interview.utils.scheduler import AssessmentScheduler
+from app.tools.cache import cache_service
+from tests.apps.interview.conftest import LLM_DELTAS
+
+
+@pytest.mark.app
+async def test_stream_ai_assessment(assessment_data, mocker):
+    create = mocker.spy(AIAssessmentRepository, "create_ai_assessment")
+    uc = AIAssessmentUseCase(
+        cache_service=cache_service, ai_assessment_repo=assessment_data["repo"]
+    )
+    chunks = [
+        chunk
+        async for chunk in uc.stream_ai_assessment(
+            assessment_data["user"],
+            assessment_data["question"],
+            assessment_data["answer"],
+        )
+    ]
+    text = normalize_text_to_markdown("".join(LLM_DELTAS).strip())
+    *parts, last = chunks
+    assert all(chunk.assessment is None for chunk in parts)
+    assert [chunk.text for chunk in parts][0] == "Оценка"
+    assert "".join(chunk.text for chunk in parts).rstrip() == text
+    assert isinstance(last.assessment, AIAssessmentDTO)
+    assert last.assessment.text == text
+    assert last.assessment.score == 7
+    assert create.call_count == 1
+
+
+@pytest.mark.app
+async def test_get_ai_assessment_stream(assessment_data):
+    data = [assessment_data[key] for key in ("user", "question", "answer")]
+    streamed = await AIAssessmentUseCase(
+        cache_service=cache_service,
+        ai_assessment_repo=assessment_data["repo"],
+        stream=True,
+    ).get_ai_assessment(*data)
+    whole = await AIAssessmentUseCase(
+        cache_service=cache_service, ai_assessment_repo=assessment_data["repo"]
+    ).get_ai_assessment(*data)
+    assert streamed.text == whole.text
+    assert streamed.score == whole.score == 7
+
+
+@pytest.mark.app
+async def test_get_ai_assessment_scheduled(assessment_data, mocker):
+    repo = assessment_data["repo"]
+    scheduler = AssessmentScheduler(repo._llm_request_service, max_concurrency=1)
+    mocker.patch.object(repo, "_llm_request_service", scheduler)
+    user = assessment_data["user"].model_copy(
+        update={"subscription": datetime.now() + timedelta(days=30)}
+    )
+    data = [user, assessment_data["question"], assessment_data["answer"]]
+    for stream in (False, True):
+        assessment = await AIAssessmentUseCase(
+            cache_service=cache_service, ai_assessment_repo=repo, stream=stream
+        ).get_ai_assessment(*data)
+        assert assessment.score == 7
+    snapshot = scheduler.snapshot()
+    assert snapshot["submitted"] == 2
+    assert snapshot["active"] == 0
+    assert snapshot["wait_ms"]["subscribed"]["count"] == 2
@@ -1,23 +1,34 @@
+import time
+
 import pytest
 
 from app.apps.interview.dto.question import QuestionDto
-from app.apps.interview.entity.question import QuestionEntity
+from app.apps.interview.entity.question import QuestionEntity, QuestionSampler
+from app.apps.interview.repository.answer import SAAnswerRepoV2
 from app.apps.interview.repository.question import (
     SAQuestionRepoV2,
 )
+from app.apps.interview.repository.question_cache import (
+    QuestionChoice,
+    redis_question_repo,
+)
 from app.apps.interview.repository.user_question import (
     SAUserQuestionRepoV2,
 )
 from app.apps.interview.usecase.question import QuestionUseCase
 from app.apps.user.repository.user import SAUserRepositoryV2
-from app.tools.cache import cache_service
+from app.tools.cache import UserContext, cache_service
 from core.database import DatabaseHelper
 
 
 @pytest.mark.app
 async def test_get_question_training(database, init_data, mocker):
     cache_service_str = "app.tools.cache.cache_service"
-    mocker.patch(f"{cache_service_str}.get_stack", return_value=["python", "sql"])
+    mocker.patch(
+        f"{cache_service_str}.get_user_context",
+        return_value=UserContext(None, ["python", "sql"], None),
+    )
+    mocker.patch(f"{cache_service_str}.set_user_context")
     mocker.patch(f"{cache_service_str}.set_user_last_question", return_value=None)
 
     user_question_repo = SAUserQuestionRepoV2(DatabaseHelper(url=database))
@@ -27,6 +38,7 @@ async def test_get_question_training(database, init_data, mocker):
         cache_service=cache_service,
         user_repo=SAUserRepositoryV2(DatabaseHelper(url=database)),
         question_repo=SAQuestionRepoV2(DatabaseHelper(url=database)),
+        question_cache_repo=redis_question_repo,
         user_question_repo=SAUserQuestionRepoV2(DatabaseHelper(url=database)),
     )
     question = await uc.get_question_training(user_tg_id=init_data["user"].tg_id)
@@ -38,10 +50,45 @@ async def test_get_question_training(database, init_data, mocker):
     assert user_question is not None
 
 
+@pytest.mark.app
+async def test_get_question_training_cached_context(database, init_data, mocker):
+    cache_service_str = "app.tools.cache.cache_service"
+    user = await SAUserRepositoryV2(DatabaseHelper(url=database)).find_user(
+        init_data["user"].tg_id
+    )
+    get_context = mocker.patch(
+        f"{cache_service_str}.get_user_context",
+        return_value=UserContext(user, ["python", "sql"], None),
+    )
+    set_context = mocker.patch(f"{cache_service_str}.set_user_context")
+    get_stack = mocker.patch(f"{cache_service_str}.get_stack")
+    mocker.patch(f"{cache_service_str}.set_user_last_question", return_value=None)
+    find_user = mocker.spy(SAUserRepositoryV2, "find_user")
+
+    uc = QuestionUseCase(
+        question_entity=QuestionEntity,
+        cache_service=cache_service,
+        user_repo=SAUserRepositoryV2(DatabaseHelper(url=database)),
+        question_repo=SAQuestionRepoV2(DatabaseHelper(url=database)),
+        question_cache_repo=redis_question_repo,
+        user_question_repo=SAUserQuestionRepoV2(DatabaseHelper(url=database)),
+    )
+    question = await uc.get_question_training(user_tg_id=init_data["user"].tg_id)
+    assert question.id == init_data["q_sql_3"].id
+    get_context.assert_awaited_once_with(init_data["user"].tg_id)
+    find_user.assert_not_called()
+    get_stack.assert_not_called()
+    set_context.assert_not_called()
+
+
 @pytest.mark.app
 async def test_get_question_training_all_answered(database, init_data, mocker):
     cache_service_str = "app.tools.cache.cache_service"
-    mocker.patch(f"{cache_service_str}.get_stack", return_value=["python"])
+    mocker.patch(
+        f"{cache_service_str}.get_user_context",
+        return_value=UserContext(None, ["python"], None),
+    )
+    mocker.patch(f"{cache_service_str}.set_user_context")
     mocker.patch(f"{cache_service_str}.set_user_last_question", return_value=None)
 
     user_question_repo = SAUserQuestionRepoV2(DatabaseHelper(url=database))
@@ -51,6 +98,7 @@ async def test_get_question_training_all_answered(database, init_data, mocker):
         cache_service=cache_service,
         user_repo=SAUserRepositoryV2(DatabaseHelper(url=database)),
         question_repo=SAQuestionRepoV2(DatabaseHelper(url=database)),
+        question_cache_repo=redis_question_repo,
         user_question_repo=SAUserQuestionRepoV2(DatabaseHelper(url=database)),
     )
     question = await uc.get_question_training(user_tg_id=init_data["user"].tg_id)
@@ -68,7 +116,228 @@ async def test_get_question_training_no_user(database, init_data):
         cache_service=cache_service,
         user_repo=SAUserRepositoryV2(DatabaseHelper(url=database)),
         question_repo=SAQuestionRepoV2(DatabaseHelper(url=database)),
+        question_cache_repo=redis_question_repo,
         user_question_repo=SAUserQuestionRepoV2(DatabaseHelper(url=database)),
     )
     question = await uc.get_question_training(user_tg_id=None)
     assert question is None
+
+
+@pytest.mark.app
+async def test_get_question_training_pools(database, init_data, mocker):
+    cache_service_str = "app.tools.cache.cache_service"
+    question_cache_str = (
+        "app.apps.interview.repository.question_cache.redis_question_repo"
+    )
+    mocker.patch(
+        f"{cache_service_str}.get_user_context",
+        return_value=UserContext(None, ["python", "sql"], None),
+    )
+    mocker.patch(f"{cache_service_str}.set_user_context")
+    mocker.patch(f"{cache_service_str}.set_user_last_question", return_value=None)
+    choose = mocker.patch(
+        f"{question_cache_str}.choose_question",
+        side_effect=[
+            QuestionChoice(None, ["python", "sql"], False),
+            QuestionChoice(init_data["q_sql_3"].id, [], True),
+        ],
+    )
+    set_pools = mocker.patch(f"{question_cache_str}.set_question_pools")
+    set_seen = mocker.patch(f"{question_cache_str}.set_seen_questions")
+    get_questions = mocker.spy(SAQuestionRepoV2, "get_questions_for_user")
+
+    uc = QuestionUseCase(
+        question_entity=QuestionEntity,
+        cache_service=cache_service,
+        user_repo=SAUserRepositoryV2(DatabaseHelper(url=database)),
+        question_repo=SAQuestionRepoV2(DatabaseHelper(url=database)),
+        question_cache_repo=redis_question_repo,
+        user_question_repo=SAUserQuestionRepoV2(DatabaseHelper(url=database)),
+    )
+    question = await uc.get_question_training(user_tg_id=init_data["user"].tg_id)
+    assert question.id == init_data["q_sql_3"].id
+    assert choose.call_count == 2
+    [pools], _ = set_pools.call_args
+    assert sorted(pools) == ["python", "sql"]
+    assert sorted(pools["sql"]) == sorted(
+        init_data[f"q_sql_{i}"].id for i in range(1, 4)
+    )
+    user_id, seen = set_seen.call_args.args
+    assert user_id == init_data["user"].id
+    assert len(seen) == 5
+    get_questions.assert_not_called()
+
+
+@pytest.mark.app
+async def test_check_seen_questions(database, init_data, mocker):
+    question_cache_str = (
+        "app.apps.interview.repository.question_cache.redis_question_repo"
+    )
+    answered = [init_data[f"q_python_{i}"].id for i in range(1, 4)] + [
+        init_data["q_sql_1"].id,
+        init_data["q_sql_2"].id,
+    ]
+    mocker.patch(
+        f"{question_cache_str}.get_seen_questions",
+        return_value=answered[1:] + [init_data["q_sql_3"].id],
+    )
+    set_seen = mocker.patch(f"{question_cache_str}.set_seen_questions")
+
+    uc = QuestionUseCase(
+        question_entity=QuestionEntity,
+        cache_service=cache_service,
+        user_repo=SAUserRepositoryV2(DatabaseHelper(url=database)),
+        question_repo=SAQuestionRepoV2(DatabaseHelper(url=database)),
+        question_cache_repo=redis_question_repo,
+        user_question_repo=SAUserQuestionRepoV2(DatabaseHelper(url=database)),
+    )
+    check = await uc.check_seen_questions(init_data["user"].id)
+    assert check.built
+    assert check.missing == [answered[0]]
+    assert check.extra == [init_data["q_sql_3"].id]
+    assert not check.consistent
+    set_seen.assert_awaited_once_with(init_data["user"].id, sorted(answered))
+
+
+@pytest.mark.app
+async def test_create_user_question_marks_seen(database, init_data, mocker):
+    add_seen = mocker.patch(
+        "app.apps.interview.repository.question_cache.redis_question_repo.add_seen_questions"
+    )
+    user_question_repo = SAUserQuestionRepoV2(DatabaseHelper(url=database))
+    await user_question_repo.create_object(
+        init_data["user"].id, init_data["q_sql_3"].id
+    )
+    add_seen.assert_awaited_once_with([(init_data["user"].id, init_data["q_sql_3"].id)])
+
+
+@pytest.mark.app
+async def test_get_question_training_review(database, init_data, mocker):
+    cache_service_str = "app.tools.cache.cache_service"
+    question_cache_str = (
+        "app.apps.interview.repository.question_cache.redis_question_repo"
+    )
+    mocker.patch(
+        f"{cache_service_str}.get_user_context",
+        return_value=UserContext(None, ["python", "sql"], None),
+    )
+    mocker.patch(f"{cache_service_str}.set_user_context")
+    mocker.patch(f"{cache_service_str}.set_user_last_question", return_value=None)
+    q_sql_1, q_sql_3 = init_data["q_sql_1"].id, init_data["q_sql_3"].id
+    mocker.patch(
+        f"{question_cache_str}.choose_question",
+        side_effect=[
+            QuestionChoice(q_sql_3, [], True, (q_sql_1, time.time() - 1)),
+            QuestionChoice(q_sql_3, [], True, (q_sql_1, time.time() + 3600)),
+            QuestionChoice(None, [], True, (q_sql_1, time.time() + 3600)),
+            QuestionChoice(None, [], True),
+        ],
+    )
+    choose_any = mocker.patch(
+        f"{question_cache_str}.choose_any_question", return_value=q_sql_3
+    )
+
+    uc = QuestionUseCase(
+        question_entity=QuestionEntity,
+        cache_service=cache_service,
+        user_repo=SAUserRepositoryV2(DatabaseHelper(url=database)),
+        question_repo=SAQuestionRepoV2(DatabaseHelper(url=database)),
+        question_cache_repo=redis_question_repo,
+        user_question_repo=SAUserQuestionRepoV2(DatabaseHelper(url=database)),
+    )
+    tg_id = init_data["user"].tg_id
+    assert [(await uc.get_question_training(tg_id)).id for _ in range(4)] == [
+        q_sql_1,
+        q_sql_3,
+        q_sql_1,
+        q_sql_3,
+    ]
+    choose_any.assert_awaited_once()
+
+
+@pytest.mark.app
+async def test_get_question_training_review_no_user_question(
+    database, init_data, mocker
+):
+    cache_service_str = "app.tools.cache.cache_service"
+    question_cache_str = (
+        "app.apps.interview.repository.question_cache.redis_question_repo"
+    )
+    mocker.patch(
+        f"{cache_service_str}.get_user_context",
+        return_value=UserContext(None, ["python", "sql"], None),
+    )
+    mocker.patch(f"{cache_service_str}.set_user_context")
+    set_last_question = mocker.patch(
+        f"{cache_service_str}.set_user_last_question", return_value=None
+    )
+    q_sql_1, q_sql_3 = init_data["q_sql_1"].id, init_data["q_sql_3"].id
+    mocker.patch(
+        f"{question_cache_str}.choose_question",
+        side_effect=[
+            QuestionChoice(q_sql_3, [], True, (q_sql_1, time.time() - 1)),
+            QuestionChoice(None, [], True),
+        ],
+    )
+    mocker.patch(f"{question_cache_str}.choose_any_question", return_value=q_sql_1)
+    create_object = mocker.spy(SAUserQuestionRepoV2, "create_object")
+
+    user_question_repo = SAUserQuestionRepoV2(DatabaseHelper(url=database))
+    uc = QuestionUseCase(
+        question_entity=QuestionEntity,
+        cache_service=cache_service,
+        user_repo=SAUserRepositoryV2(DatabaseHelper(url=database)),
+        question_repo=SAQuestionRepoV2(DatabaseHelper(url=database)),
+        question_cache_repo=redis_question_repo,
+        user_question_repo=user_question_repo,
+    )
+    user_id = init_data["user"].id
+    for _ in range(2):
+        question = await uc.get_question_training(init_data["user"].tg_id)
+        assert question.id == q_sql_1
+        set_last_question.assert_awaited_with(user_id, q_sql_1)
+    create_object.assert_not_called()
+    assert (await user_question_repo.get_question_ids(user_id)).count(q_sql_1) == 1
+
+
+@pytest.mark.app
+async def test_get_question_training_by_complexity(database, init_data, mocker):
+    cache_service_str = "app.tools.cache.cache_service"
+    question_cache_str = (
+        "app.apps.interview.repository.question_cache.redis_question_repo"
+    )
+    mocker.patch(
+        f"{cache_service_str}.get_user_context",
+        return_value=UserContext(None, ["sql"], None),
+    )
+    mocker.patch(f"{cache_service_str}.set_user_context")
+    mocker.patch(f"{cache_service_str}.set_user_last_question", return_value=None)
+    q_sql_2, q_sql_3 = init_data["q_sql_2"].id, init_data["q_sql_3"].id
+    mocker.patch(
+        f"{question_cache_str}.choose_question",
+        return_value=QuestionChoice(q_sql_3, [], True),
+    )
+    filter_unseen = mocker.patch(
+        f"{question_cache_str}.filter_unseen_questions", return_value=[q_sql_2]
+    )
+    mocker.patch.object(QuestionEntity, "sampler", QuestionSampler())
+
+    uc = QuestionUseCase(
+        question_entity=QuestionEntity,
+        cache_service=cache_service,
+        user_repo=SAUserRepositoryV2(DatabaseHelper(url=database)),
+        question_repo=SAQuestionRepoV2(DatabaseHelper(url=database)),
+        question_cache_repo=redis_question_repo,
+        user_question_repo=SAUserQuestionRepoV2(DatabaseHelper(url=database)),
+        answer_repo=SAAnswerRepoV2(DatabaseHelper(url=database)),
+    )
+    question = await uc.get_question_training(user_tg_id=init_data["user"].tg_id)
+    assert question.id == q_sql_2
+    user_id, candidates = filter_unseen.call_args.args
+    assert user_id == init_data["user"].id
+    assert set(candidates) <= {init_data[f"q_sql_{i}"].id for i in range(1, 4)}
+    assert QuestionEntity.sampler.missing(["sql"]) == []
+
+    filter_unseen.return_value = []
+    question = await uc.get_question_training(user_tg_id=init_data["user"].tg_id)
+    assert question.id == q_sql_3
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+
+from app.apps.interview.dto.answer import AnswerScore
+from app.apps.interview.entity.review import ReviewState, replay, review
+from app.apps.interview.repository.answer import SAAnswerRepoV2
+from app.apps.interview.repository.question_cache import redis_question_repo
+from app.apps.interview.usecase.review import ReviewUseCase
+from core.database import DatabaseHelper
+from model import Answer
+
+
+@pytest.mark.app
+async def test_record(database, init_data, mocker):
+    question_cache_str = (
+        "app.apps.interview.repository.question_cache.redis_question_repo"
+    )
+    state = ReviewState(1, 1.0, 2.6, 0)
+    mocker.patch(f"{question_cache_str}.get_review_states", return_value=[state, None])
+    set_states = mocker.patch(f"{question_cache_str}.set_review_states")
+    user_id = init_data["user"].id
+    answered_at = datetime(2026, 1, 1, tzinfo=pytz.utc)
+    scores = [
+        AnswerScore(user_id, init_data["q_sql_1"].id, 10, answered_at),
+        AnswerScore(user_id, init_data["q_sql_2"].id, 2, answered_at),
+    ]
+
+    uc = ReviewUseCase(
+        question_cache_repo=redis_question_repo,
+        answer_repo=SAAnswerRepoV2(DatabaseHelper(url=database)),
+    )
+    states = await uc.record(scores)
+    assert states == [
+        review(state, 10, answered_at.timestamp()),
+        review(None, 2, answered_at.timestamp()),
+    ]
+    [saved], _ = set_states.call_args
+    assert saved == [
+        (user_id, init_data["q_sql_1"].id, states[0]),
+        (user_id, init_data["q_sql_2"].id, states[1]),
+    ]
+
+
+@pytest.mark.app
+async def test_reschedule(database, session, init_data, mocker):
+    set_states = mocker.patch(
+        "app.apps.interview.repository.question_cache.redis_question_repo.set_review_states"
+    )
+    user = init_data["user"]
+    start = datetime(2026, 1, 1, tzinfo=pytz.utc)
+    history = {
+        init_data["q_sql_1"].id: [8, 3, 9],
+        init_data["q_sql_2"].id: [10],
+    }
+    async with session.begin():
+        for question_id, scores in history.items():
+            for day, score in enumerate(scores):
+                session.add(
+                    Answer(
+                        text="answer",
+                        user_id=user.id,
+                        question_id=question_id,
+                        score=score,
+                        created_at=start + timedelta(days=day),
+                    )
+                )
+
+    uc = ReviewUseCase(
+        question_cache_repo=redis_question_repo,
+        answer_repo=SAAnswerRepoV2(DatabaseHelper(url=database)),
+    )
+    assert await uc.reschedule([user.id], batch_size=2) == 2
+    [saved], kwargs = set_states.call_args
+    assert kwargs == {"replace": True}
+    assert sorted(saved) == sorted(
+        (
+            user.id,
+            question_id,
+            replay(
+                (score, (start + timedelta(days=day)).timestamp())
+                for day, score in enumerate(scores)
+            ),
+        )
+        for question_id, scores in history.items()
+    )
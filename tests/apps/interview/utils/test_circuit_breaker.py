@@ -0,0 +1,31 @@
+import pytest
+
+from app.apps.interview.utils.circuit_breaker import BreakerState, CircuitBreaker
+
+
+@pytest.mark.app
+async def test_circuit_breaker(mocker):
+    now = mocker.patch("time.monotonic", return_value=100.0)
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == BreakerState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == BreakerState.OPEN
+    assert not breaker.allow()
+    # пробный запрос после recovery_timeout, остальные отклоняются
+    now.return_value = 110.0
+    assert breaker.allow()
+    assert breaker.state == BreakerState.HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == BreakerState.OPEN
+    now.return_value = 120.0
+    assert breaker.allow()
+    # пробный запрос завис - через recovery_timeout пропускается следующий
+    now.return_value = 130.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == BreakerState.CLOSED
+    assert breaker.snapshot() == {"state": "closed", "failures": 0, "opened": 2}
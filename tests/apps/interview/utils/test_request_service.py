@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from app.apps.interview.utils.circuit_breaker import BreakerState, CircuitBreaker
+from app.apps.interview.utils.request_service import RequestService, iter_sse_data
+from tests.apps.interview.conftest import LLM_DELTAS
+
+
+@pytest.mark.app
+async def test_send_request_llm_reuses_connections(llm_server):
+    url = str(llm_server.make_url("/v1/chat/completions"))
+    async with RequestService(url, limit=2) as service:
+        responses = await asyncio.gather(
+            *[service.send_request_llm({"messages": []}) for _ in range(10)]
+        )
+        assert not service.session.closed
+    content = "".join(LLM_DELTAS)
+    assert responses == [{"choices": [{"message": {"content": content}}]}] * 10
+    assert len(llm_server.peers) == 10
+    assert len(set(llm_server.peers)) <= 2
+
+
+@pytest.mark.app
+async def test_send_request_llm_not_json(llm_server):
+    service = RequestService(str(llm_server.make_url("/v1/chat/completions")))
+    assert await service.send_request_llm({"broken": True}) is None
+    session = service.session
+    await service.close()
+    assert session.closed
+    # после close сессия создается заново
+    assert await service.send_request_llm({"messages": []}) is not None
+    await service.close()
+
+
+@pytest.mark.app
+async def test_stream_request_llm(llm_server):
+    url = str(llm_server.make_url("/v1/chat/completions"))
+    async with RequestService(url) as service:
+        chunks = [chunk async for chunk in service.stream_request_llm({})]
+        assert [chunk["choices"][0]["delta"]["content"] for chunk in chunks] == (
+            LLM_DELTAS
+        )
+        chunks = [chunk async for chunk in service.stream_request_llm({"broken": 1})]
+        assert chunks == []
+
+
+@pytest.mark.app
+async def test_iter_sse_data():
+    async def lines():
+        for line in [
+            b": comment\n",
+            b"event: message\n",
+            b"data: first\r\n",
+            b"data:second\n",
+            b"\n",
+            b"\n",
+            b"data: {}\n",
+        ]:
+            yield line
+
+    assert [data async for data in iter_sse_data(lines())] == ["first\nsecond", "{}"]
+
+
+@pytest.mark.app
+async def test_send_request_llm_retries(llm_server):
+    llm_server.faults.extend(["error", "reset"])
+    url = str(llm_server.make_url("/v1/chat/completions"))
+    async with RequestService(url, backoff=0.01) as service:
+        response = await service.send_request_llm({"messages": []})
+        assert response["choices"][0]["message"]["content"] == "".join(LLM_DELTAS)
+        snapshot = service.snapshot()
+    assert len(llm_server.peers) == 3
+    assert snapshot["requests"] == 1
+    assert snapshot["retries"] == 2
+    assert snapshot["failed"] == 0
+    assert snapshot["breaker"]["state"] == "closed"
+
+
+@pytest.mark.app
+async def test_send_request_llm_deadline(llm_server):
+    llm_server.faults.extend(["slow", "slow"])
+    url = str(llm_server.make_url("/v1/chat/completions"))
+    async with RequestService(url, deadline=0.3, backoff=0.01) as service:
+        start = time.perf_counter()
+        assert await service.send_request_llm({"messages": []}) is None
+        assert time.perf_counter() - start < 0.6
+        assert service.snapshot()["failed"] == 1
+
+
+@pytest.mark.app
+async def test_send_request_llm_circuit_breaker(llm_server):
+    llm_server.faults.extend(["error"] * 3)
+    url = str(llm_server.make_url("/v1/chat/completions"))
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=0.1)
+    async with RequestService(url, backoff=0.01, breaker=breaker) as service:
+        assert await service.send_request_llm({"messages": []}) is None
+        assert breaker.state == BreakerState.OPEN
+        # сервис не получает запросов, пока выключатель открыт
+        assert await service.send_request_llm({"messages": []}) is None
+        assert len(llm_server.peers) == 3
+        await asyncio.sleep(0.1)
+        assert await service.send_request_llm({"messages": []}) is not None
+        snapshot = service.snapshot()
+    assert snapshot["rejected"] == 1
+    assert snapshot["failed"] == 1
+    assert snapshot["breaker"] == {"state": "closed", "failures": 0, "opened": 1}
+
+
+@pytest.mark.app
+async def test_stream_request_llm_retries_until_response(llm_server):
+    llm_server.faults.extend(["error", "cut"])
+    url = str(llm_server.make_url("/v1/chat/completions"))
+    async with RequestService(url, backoff=0.01) as service:
+        chunks = []
+        # обрыв после начала потока не повторяется
+        with pytest.raises(aiohttp.ClientPayloadError):
+            async for chunk in service.stream_request_llm({}):
+                chunks.append(chunk)
+        assert len(chunks) == 1
+        chunks = [chunk async for chunk in service.stream_request_llm({})]
+        assert len(chunks) == len(LLM_DELTAS)
+        snapshot = service.snapshot()
+    assert snapshot["retries"] == 1
+    assert snapshot["failed"] == 1
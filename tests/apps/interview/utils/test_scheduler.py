@@ -0,0 +1,159 @@
+import asyncio
+import gc
+
+import pytest
+
+from app.apps.interview.entity.ai_assessment import Priority
+from app.apps.interview.utils.scheduler import AssessmentQueueFull, AssessmentScheduler
+
+
+class FakeRequestService:
+    """Сервис запросов, ответы которого отпускаются вручную"""
+
+    def __init__(self):
+        self.started: list[str] = []
+        self.events: dict[str, asyncio.Event] = {}
+
+    async def send_request_llm(self, data: dict) -> dict | None:
+        name = data["name"]
+        self.started.append(name)
+        event = self.events.setdefault(name, asyncio.Event())
+        await event.wait()
+        return {"name": name}
+
+    async def stream_request_llm(self, data: dict):
+        for part in ("a", "b"):
+            yield {"name": data["name"], "part": part}
+
+    async def close(self):
+        pass
+
+    def finish(self, name: str):
+        self.events.setdefault(name, asyncio.Event()).set()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def submit(scheduler, name, user_id=None, priority=Priority.DEFAULT):
+    return asyncio.create_task(
+        scheduler.send_request_llm({"name": name}, user_id=user_id, priority=priority)
+    )
+
+
+@pytest.mark.app
+async def test_scheduler_priority_and_fairness():
+    service = FakeRequestService()
+    scheduler = AssessmentScheduler(service, max_concurrency=1, max_queue=10)
+    tasks = [submit(scheduler, "first", "x")]
+    await settle()
+    # пользователь a отправил три ответа подряд, b и c - по одному
+    tasks += [submit(scheduler, f"a{i}", "a") for i in range(3)]
+    tasks += [submit(scheduler, "b0", "b"), submit(scheduler, "c0", "c")]
+    tasks.append(submit(scheduler, "vip", "v", Priority.SUBSCRIBED))
+    await settle()
+    snapshot = scheduler.snapshot()
+    assert snapshot["active"] == 1
+    assert snapshot["queue_depth"] == {"subscribed": 1, "default": 5}
+    for name in ["first", "vip", "a0", "b0", "c0", "a1", "a2"]:
+        assert service.started[-1] == name
+        service.finish(name)
+        await settle()
+    results = await asyncio.gather(*tasks)
+    assert [result["name"] for result in results][:2] == ["first", "a0"]
+    snapshot = scheduler.snapshot()
+    assert snapshot["active"] == 0
+    assert snapshot["queued"] == 0
+    assert snapshot["submitted"] == 7
+    assert snapshot["wait_ms"]["subscribed"]["count"] == 1
+    assert snapshot["wait_ms"]["default"]["count"] == 6
+
+
+@pytest.mark.app
+async def test_scheduler_backpressure():
+    service = FakeRequestService()
+    scheduler = AssessmentScheduler(service, max_concurrency=2, max_queue=1)
+    running = [submit(scheduler, "r0"), submit(scheduler, "r1")]
+    await settle()
+    queued = submit(scheduler, "q0")
+    await settle()
+    with pytest.raises(AssessmentQueueFull):
+        await scheduler.send_request_llm({"name": "rejected"})
+    assert scheduler.snapshot()["rejected"] == 1
+    for name in ["r0", "r1", "q0"]:
+        service.finish(name)
+    await asyncio.gather(*running, queued)
+    assert service.started == ["r0", "r1", "q0"]
+
+
+@pytest.mark.app
+async def test_scheduler_timeout_and_cancel():
+    service = FakeRequestService()
+    scheduler = AssessmentScheduler(
+        service, max_concurrency=1, max_queue=10, queue_timeout=0.01
+    )
+    running = submit(scheduler, "r0")
+    await settle()
+    with pytest.raises(TimeoutError):
+        await scheduler.send_request_llm({"name": "late"})
+    cancelled = submit(scheduler, "cancelled", "u")
+    await settle()
+    assert scheduler.snapshot()["queued"] == 1
+    cancelled.cancel()
+    await settle()
+    snapshot = scheduler.snapshot()
+    assert snapshot["queued"] == 0
+    assert snapshot["timed_out"] == 1
+    service.finish("r0")
+    await running
+    # место освобождено, новый запрос выполняется сразу
+    service.finish("next")
+    assert await scheduler.send_request_llm({"name": "next"}) == {"name": "next"}
+    assert scheduler.snapshot()["active"] == 0
+    assert service.started == ["r0", "next"]
+
+
+@pytest.mark.app
+async def test_scheduler_cancel_after_grant_releases_slot():
+    service = FakeRequestService()
+    scheduler = AssessmentScheduler(service, max_concurrency=1, max_queue=10)
+    await scheduler.acquire()
+    waiter = asyncio.create_task(scheduler.acquire("u"))
+    await settle()
+    # место отдано ожидающему, но задача отменена до продолжения
+    scheduler.release()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert scheduler.snapshot()["active"] == 0
+
+
+@pytest.mark.app
+async def test_scheduler_stream_holds_slot():
+    service = FakeRequestService()
+    scheduler = AssessmentScheduler(service, max_concurrency=1, max_queue=10)
+    stream = scheduler.stream_request_llm({"name": "s"}, user_id="u")
+    assert (await anext(stream))["part"] == "a"
+    assert scheduler.snapshot()["active"] == 1
+    assert [chunk["part"] async for chunk in stream] == ["b"]
+    assert scheduler.snapshot()["active"] == 0
+
+
+@pytest.mark.app
+async def test_scheduler_abandoned_stream_releases_slot():
+    service = FakeRequestService()
+    scheduler = AssessmentScheduler(service, max_concurrency=1, max_queue=10)
+    stream = scheduler.stream_request_llm({"name": "s"}, user_id="u")
+    assert (await anext(stream))["part"] == "a"
+    task = submit(scheduler, "next", user_id="v")
+    await settle()
+    assert scheduler.snapshot()["queued"] == 1
+    # поток брошен без aclose: место освобождается при сборке генератора
+    del stream
+    gc.collect()
+    await settle()
+    service.finish("next")
+    assert await task == {"name": "next"}
+    assert scheduler.snapshot()["active"] == 0
@@ -0,0 +1,17 @@
+import pytest
+
+from app.tools.bitmap import from_bitmap, to_bitmap
+
+
+@pytest.mark.cache
+def test_bitmap_redis_bit_order():
+    assert to_bitmap([0]) == b"\x80"
+    assert to_bitmap([7, 8]) == b"\x01\x80"
+    assert to_bitmap([]) == b""
+
+
+@pytest.mark.cache
+def test_bitmap_round_trip():
+    offsets = [0, 3, 64, 65, 1000, 4095]
+    assert from_bitmap(to_bitmap(offsets)) == offsets
+    assert from_bitmap(b"") == []
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from pydantic import BaseModel
+from redis import RedisError
+
+from app.tools import cache_aside
+from app.tools.cache import Cache
+from app.tools.cache_aside import cached
+
+
+class ItemDto(BaseModel):
+    id: int
+    name: str
+
+
+@pytest.fixture(scope="function")
+def storage(mocker):
+    """Cache, в котором Redis заменен словарем"""
+    cache = Cache()
+    data = {}
+
+    async def get(key):
+        return data.get(key)
+
+    async def set_(key, value, expire):
+        data[key] = value
+
+    async def delete(key):
+        data.pop(key, None)
+
+    mocker.patch.object(cache.redis_cache, "get", side_effect=get)
+    mocker.patch.object(cache.redis_cache, "set", side_effect=set_)
+    mocker.patch.object(cache.redis_cache, "delete", side_effect=delete)
+    return cache, data
+
+
+def make_repo(cache: Cache, delay: float = 0, **options):
+    class Repo:
+        calls = 0
+
+        @cached(key="item:{id}", dto=ItemDto, cache=cache, **options)
+        async def find(self, id: int) -> ItemDto | None:
+            Repo.calls += 1
+            await asyncio.sleep(delay)
+            return ItemDto(id=id, name=f"item{id}") if id > 0 else None
+
+    return Repo
+
+
+@pytest.mark.cache
+async def test_cache_aside_hit(storage):
+    cache, data = storage
+    repo = make_repo(cache)
+    assert await repo().find(1) == ItemDto(id=1, name="item1")
+    assert await repo().find(id=1) == ItemDto(id=1, name="item1")
+    assert repo.calls == 1
+    assert list(data) == ["item:1"]
+    assert repo.find.key_for(repo(), 1) == "item:1"
+
+
+@pytest.mark.cache
+async def test_cache_aside_negative(storage):
+    cache, data = storage
+    repo = make_repo(cache)
+    assert await repo().find(-1) is None
+    assert await repo().find(-1) is None
+    assert repo.calls == 1
+
+    repo = make_repo(cache, negative_ttl=None)
+    await repo().find(-2)
+    await repo().find(-2)
+    assert repo.calls == 2
+    assert "item:-2" not in data
+
+
+@pytest.mark.cache
+async def test_cache_aside_single_flight(storage):
+    cache, _ = storage
+    repo = make_repo(cache, delay=0.01)
+    result = await asyncio.gather(*(repo().find(1) for _ in range(10)))
+    assert all(item.id == 1 for item in result)
+    assert repo.calls == 1
+
+
+@pytest.mark.cache
+async def test_cache_aside_early_refresh(storage, mocker):
+    cache, _ = storage
+    repo = make_repo(cache, delay=0.01, ttl=60)
+    now = cache_aside.time.time()
+    await repo().find(1)
+
+    # за 0.1 с до истечения при пересчете ~0.01 с обновление маловероятно
+    mocker.patch.object(cache_aside.time, "time", return_value=now + 59.9)
+    mocker.patch.object(cache_aside.random, "random", return_value=0.5)
+    await repo().find(1)
+    assert repo.calls == 1
+
+    mocker.patch.object(cache_aside.random, "random", return_value=1 - 1e-9)
+    await repo().find(1)
+    assert repo.calls == 2
+
+
+@pytest.mark.cache
+async def test_cache_aside_invalidate(storage):
+    cache, data = storage
+    repo = make_repo(cache)
+    await repo().find(1)
+    await repo.find.invalidate(repo(), id=1)
+    assert data == {}
+    await repo().find(1)
+    assert repo.calls == 2
+
+
+@pytest.mark.cache
+async def test_cache_aside_redis_error(mocker):
+    cache = Cache()
+    mocker.patch.object(cache.redis_cache, "get", side_effect=RedisError)
+    mocker.patch.object(cache.redis_cache, "set", side_effect=RedisError)
+    repo = make_repo(cache, delay=0.01)
+    result = await asyncio.gather(repo().find(1), repo().find(1))
+    assert result == [ItemDto(id=1, name="item1")] * 2
+    assert repo.calls == 1
+
+
+@pytest.mark.cache
+async def test_cache_aside_in_transaction(storage):
+    cache, data = storage
+    repo = make_repo(cache)
+    in_transaction = repo()
+    in_transaction.in_transaction = True
+    assert await in_transaction.find(1) == ItemDto(id=1, name="item1")
+    assert data == {}
+    assert await repo().find(1) == ItemDto(id=1, name="item1")
+    assert await in_transaction.find(1) == ItemDto(id=1, name="item1")
+    # в транзакции значение читается из базы, а не из кэша
+    assert repo.calls == 3
+    assert list(data) == ["item:1"]
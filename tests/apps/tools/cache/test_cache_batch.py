@@ -0,0 +1,127 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from redis import RedisError
+from redis.asyncio.client import Pipeline
+
+from app.apps.user.dto.user import UserDto
+from app.tools.cache import Cache, UserContext
+from app.tools.local_cache import LocalCache
+
+
+@pytest.fixture(scope="function")
+def user():
+    return UserDto(
+        id=uuid4(),
+        tg_id=123,
+        tg_url="url",
+        first_name="Иван",
+        last_name=None,
+        tg_username=None,
+        coins=0,
+        is_active=True,
+        is_admin=False,
+        subscription=None,
+        created_at=datetime(2025, 1, 1),
+        updated_at=datetime(2025, 1, 1),
+    )
+
+
+@pytest.fixture(scope="function")
+def executed(mocker):
+    """Команды, отправленные конвейером, и число обращений к Redis"""
+    executed = []
+
+    async def execute(pipe, raise_on_error=True):
+        executed.append([cmd for cmd, _ in pipe.command_stack])
+        return [True] * len(pipe.command_stack)
+
+    mocker.patch.object(Pipeline, "execute", execute)
+    return executed
+
+
+@pytest.mark.cache
+async def test_cache_get_user_context(user, mocker):
+    cache = Cache()
+    evalsha = mocker.patch.object(
+        cache.redis_cache,
+        "evalsha",
+        new_callable=mocker.AsyncMock,
+        return_value=[cache.codec.dumps(user), b'["python", "sql"]', b"42"],
+    )
+    context = await cache.get_user_context(user.tg_id)
+    assert context == UserContext(user=user, stack=["python", "sql"], last_question=42)
+    # ключи стека и последнего вопроса строятся в Redis по сохраненному user_id
+    _, numkeys, *args = evalsha.await_args.args
+    assert numkeys == 2
+    assert args == [
+        f"user:{user.tg_id}",
+        f"user:{user.tg_id}:id",
+        "user_id:%s:stack",
+        "user_id:%s:last_question",
+    ]
+
+
+@pytest.mark.cache
+async def test_cache_get_user_context_empty(user, mocker):
+    cache = Cache()
+    mocker.patch.object(
+        cache.redis_cache,
+        "evalsha",
+        new_callable=mocker.AsyncMock,
+        return_value=[None, None, None],
+    )
+    context = await cache.get_user_context(user.tg_id)
+    assert context == UserContext(user=None, stack=None, last_question=None)
+    assert await cache.mget([]) == []
+
+
+@pytest.mark.cache
+async def test_cache_get_user_context_local(user, mocker):
+    cache = Cache(local_cache=LocalCache())
+    mocker.patch.object(cache, "_get_local", return_value=cache.local_cache)
+    cache.local_cache.set(f"user:{user.tg_id}", cache.codec.dumps(user))
+    evalsha = mocker.patch.object(cache.redis_cache, "evalsha")
+    mget = mocker.patch.object(
+        cache.redis_cache,
+        "mget",
+        new_callable=mocker.AsyncMock,
+        return_value=[b'["go"]', None],
+    )
+    context = await cache.get_user_context(user.tg_id)
+    assert context == UserContext(user=user, stack=["go"], last_question=None)
+    evalsha.assert_not_called()
+    mget.assert_awaited_once_with(
+        [f"user_id:{user.id}:stack", f"user_id:{user.id}:last_question"]
+    )
+
+
+@pytest.mark.cache
+async def test_cache_set_user_context_one_round_trip(user, executed):
+    cache = Cache()
+    await cache.set_user_context(user, stack=["python"], last_question=7)
+    assert len(executed) == 1
+    [commands] = executed
+    assert [cmd[:2] for cmd in commands] == [
+        ("SET", f"user:{user.tg_id}"),
+        ("SET", f"user:{user.tg_id}:id"),
+        ("SET", f"user_id:{user.id}:stack"),
+        ("SET", f"user_id:{user.id}:last_question"),
+    ]
+    assert cache.codec.loads(commands[0][2], UserDto) == user
+    assert commands[1][2] == str(user.id)
+    assert commands[3][2] == "7"
+
+
+@pytest.mark.cache
+async def test_cache_mset(executed):
+    await Cache().mset({"a": "1", "b": "2"}, expire=10)
+    assert executed == [[("SET", "a", "1", "EX", 10), ("SET", "b", "2", "EX", 10)]]
+
+
+@pytest.mark.cache
+async def test_cache_mset_redis_error(mocker):
+    mocker.patch.object(Pipeline, "execute", side_effect=RedisError)
+    await Cache().mset({"a": "1"})
@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+
+from redis.asyncio.client import Pipeline
+
+from app.tools import local_cache as local_cache_module
+from app.tools.cache import INVALIDATION_CHANNEL, Cache
+from app.tools.local_cache import LocalCache
+
+
+@pytest.fixture(scope="function")
+def clock(mocker):
+    clock = mocker.patch.object(local_cache_module.time, "monotonic", return_value=0)
+    return clock
+
+
+@pytest.fixture(scope="function")
+async def cache(mocker):
+    """Cache с L1, подписка на канал инвалидации считается установленной"""
+    stop = asyncio.Event()
+
+    async def listen(self):
+        self._subscribed = True
+        await stop.wait()
+
+    mocker.patch.object(Cache, "_listen", listen)
+    cache = Cache(local_cache=LocalCache(maxsize=10, ttl=60))
+    cache._get_local()
+    await asyncio.sleep(0)
+    yield cache
+    stop.set()
+    await cache._listener
+
+
+@pytest.fixture(scope="function")
+def executed(mocker):
+    executed = []
+
+    async def execute(pipe, raise_on_error=True):
+        executed.append([cmd for cmd, _ in pipe.command_stack])
+        return [True] * len(pipe.command_stack)
+
+    mocker.patch.object(Pipeline, "execute", execute)
+    return executed
+
+
+@pytest.mark.cache
+async def test_local_cache_lru_ttl(clock):
+    cache = LocalCache(maxsize=2, ttl=60)
+    cache.set("user:1", "a")
+    cache.set("user:2", "b", ttl=10)
+    assert cache.get("user:1") == "a"
+    cache.set("user_id:1:stack", "c")
+    assert "user:2" not in cache
+    assert cache.get("user:1") == "a"
+
+    clock.return_value = 61
+    assert cache.get("user:1") is None
+    assert cache.get("user_id:1:stack") is None
+    assert cache.stats() == {
+        "stack": {"hits": 0, "misses": 1},
+        "user": {"hits": 2, "misses": 1},
+    }
+
+
+@pytest.mark.cache
+async def test_local_cache_family(clock):
+    cache = LocalCache(family=lambda key: key.partition(":")[0])
+    cache.set("assessment:1", "a")
+    assert cache.get("assessment:1") == "a"
+    assert cache.get("assessment:2") is None
+    assert cache.stats() == {"assessment": {"hits": 1, "misses": 1}}
+
+
+@pytest.mark.cache
+async def test_cache_local_hits(cache, mocker):
+    mget = mocker.patch.object(
+        cache.redis_cache, "mget", new_callable=mocker.AsyncMock, return_value=[b"1"]
+    )
+    assert await cache.get("user_id:u:last_question") == "1"
+    assert await cache.get("user_id:u:last_question") == "1"
+    mget.assert_awaited_once()
+    assert cache.local_stats() == {"last_question": {"hits": 1, "misses": 1}}
+
+
+@pytest.mark.cache
+async def test_cache_local_invalidation(cache, mocker):
+    mget = mocker.patch.object(
+        cache.redis_cache, "mget", new_callable=mocker.AsyncMock, return_value=[b"1"]
+    )
+    await cache.get("a")
+    cache._invalidate(f"{cache.worker_id} a".encode())
+    await cache.get("a")
+    assert mget.await_count == 1
+
+    cache._invalidate(b"other-worker a b")
+    await cache.get("a")
+    assert mget.await_count == 2
+
+
+@pytest.mark.cache
+async def test_cache_local_set_publishes(cache, executed):
+    await cache.set("a", "1", expire=10)
+    await cache.mset({"b": "2", "c": "3"})
+    assert executed == [
+        [
+            ("SET", "a", "1", "EX", 10),
+            ("PUBLISH", INVALIDATION_CHANNEL, f"{cache.worker_id} a"),
+        ],
+        [
+            ("SET", "b", "2", "EX", 60),
+            ("SET", "c", "3", "EX", 60),
+            ("PUBLISH", INVALIDATION_CHANNEL, f"{cache.worker_id} b c"),
+        ],
+    ]
+    assert await cache.mget(["a", "b", "c"]) == ["1", "2", "3"]
+
+    await cache.delete("a")
+    assert executed[-1] == [
+        ("DEL", "a"),
+        ("PUBLISH", INVALIDATION_CHANNEL, f"{cache.worker_id} a"),
+    ]
+    assert "a" not in cache.local_cache
+
+
+@pytest.mark.cache
+async def test_cache_local_not_subscribed(mocker):
+    async def listen(self):
+        pass
+
+    mocker.patch.object(Cache, "_listen", listen)
+    cache = Cache(local_cache=LocalCache())
+    mget = mocker.patch.object(
+        cache.redis_cache, "get", new_callable=mocker.AsyncMock, return_value=b"1"
+    )
+    await cache.get("a")
+    await cache.get("a")
+    assert mget.await_count == 2
+    assert len(cache.local_cache) == 0
+
+
+@pytest.mark.cache
+@pytest.mark.parametrize("change", ["set", "delete", "invalidate"])
+async def test_cache_local_change_during_read(cache, executed, mocker, change):
+    requested, release = asyncio.Event(), asyncio.Event()
+
+    async def mget(keys):
+        requested.set()
+        await release.wait()
+        return [b"old"]
+
+    mocker.patch.object(cache.redis_cache, "mget", mget)
+    reader = asyncio.create_task(cache.get("a"))
+    await requested.wait()
+    # ключ меняется, пока чтение ждет ответа Redis
+    if change == "set":
+        await cache.set("a", "new")
+    elif change == "delete":
+        await cache.delete("a")
+    else:
+        cache._invalidate(b"other-worker a")
+    release.set()
+    assert await reader == "old"
+    assert cache.local_cache.get("a") == (b"new" if change == "set" else None)
+    assert not cache._reading
+    assert not cache._versions
@@ -0,0 +1,84 @@
+import json
+
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from pydantic import BaseModel
+
+from app.apps.user.dto.user import UserDto
+from app.tools.cache import Cache
+from app.tools.serializer import CompactSerializer, JsonSerializer, VersionedCodec
+
+
+@pytest.fixture(scope="function")
+def user():
+    return UserDto(
+        id=uuid4(),
+        tg_id=123,
+        tg_url="url",
+        first_name="Иван",
+        last_name=None,
+        tg_username="ivan",
+        coins=10,
+        is_active=True,
+        is_admin=False,
+        subscription=datetime(2026, 1, 1, 12, 30),
+        created_at=datetime(2025, 1, 1),
+        updated_at=datetime(2025, 1, 2),
+    )
+
+
+@pytest.mark.cache
+@pytest.mark.parametrize("serializer", [JsonSerializer(), CompactSerializer()])
+async def test_serializer_round_trip(user, serializer):
+    codec = VersionedCodec(serializer)
+    data = codec.dumps(user)
+    assert data.startswith(f"{serializer.name}:".encode())
+    assert codec.loads(data, UserDto) == user
+
+
+@pytest.mark.cache
+async def test_serializer_compact_smaller(user):
+    compact = VersionedCodec(CompactSerializer()).dumps(user)
+    assert len(compact) < len(VersionedCodec(JsonSerializer()).dumps(user))
+    assert b"first_name" not in compact
+
+
+@pytest.mark.cache
+async def test_serializer_version_mismatch(user):
+    class UserDtoV2(UserDto):
+        locale: str = "ru"
+
+    codec = VersionedCodec(CompactSerializer())
+    data = codec.dumps(user)
+    assert codec.loads(data, UserDtoV2) is None
+    assert VersionedCodec(JsonSerializer()).loads(data, UserDto) is None
+    assert codec.loads(b"compact:garbage", UserDto) is None
+    assert codec.loads(None, UserDto) is None
+
+
+@pytest.mark.cache
+async def test_serializer_legacy_entry(user):
+    legacy = user.model_dump(mode="json")
+    legacy["created_at"] = user.created_at.strftime("%Y-%m-%d %H:%M:%S")
+    codec = VersionedCodec(CompactSerializer())
+    assert codec.loads(json.dumps(legacy), UserDto) == user
+
+    class Other(BaseModel):
+        value: int
+
+    assert codec.loads(json.dumps(legacy), Other) is None
+
+
+@pytest.mark.cache
+async def test_cache_get_user_codec(user, mocker):
+    cache = Cache(serializer=JsonSerializer())
+    mocker.patch.object(
+        cache.redis_cache,
+        "get",
+        new_callable=mocker.AsyncMock,
+        return_value=cache.codec.dumps(user),
+    )
+    assert await cache.get_user(f"user:{user.tg_id}") == user
@@ -0,0 +1,100 @@
+from datetime import date
+
+import pytest
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.tools.repository.sql_alchemy.sql_alchemy_v2 import BaseRepository
+from tests.apps.tools.repository.v2.conftest import DriverSchema
+from tests.apps.tools.repository.v2.models import Driver
+
+
+def make_drivers(count: int, start: int = 0) -> list[dict]:
+    return [
+        {
+            "first_name": f"Имя{i}",
+            "last_name": f"Фамилия{i}",
+            "patronymic": "Николаевич",
+            "birth_date": date(1990, 1, 1),
+            "phone_number": f"+7{i:010d}",
+        }
+        for i in range(start, start + count)
+    ]
+
+
+@pytest.mark.repo
+@pytest.mark.repo_bulk_create
+async def test_bulk_create_drivers_count(repo):
+    async with repo:
+        count = await repo.stmt(Driver).bulk_create(make_drivers(10))
+    assert count == 10
+    assert await repo.query(Driver).count() == 10
+
+
+@pytest.mark.repo
+@pytest.mark.repo_bulk_create
+async def test_bulk_create_drivers_dto(repo):
+    async with repo:
+        drivers = await repo.stmt(Driver).bulk_create(
+            make_drivers(3), dto=DriverSchema
+        )
+    assert len(drivers) == 3
+    assert all(isinstance(driver, DriverSchema) for driver in drivers)
+    assert {driver.phone_number for driver in drivers} == {
+        "+70000000000",
+        "+70000000001",
+        "+70000000002",
+    }
+
+
+@pytest.mark.repo
+@pytest.mark.repo_bulk_create
+async def test_bulk_create_drivers_returning(repo):
+    async with repo:
+        rows = await repo.stmt(Driver).bulk_create(
+            make_drivers(2), returning=[Driver.id, Driver.phone_number]
+        )
+    assert [row.phone_number for row in rows] == ["+70000000000", "+70000000001"]
+    assert all(row.id for row in rows)
+
+
+@pytest.mark.repo
+@pytest.mark.repo_bulk_create
+async def test_bulk_create_drivers_batches(repo, mocker):
+    columns_count = len(Driver.__table__.columns)
+    mocker.patch.object(BaseRepository, "max_query_params", columns_count * 4)
+    execute = mocker.spy(repo._conn.session_factory.class_, "execute")
+    async with repo:
+        drivers = await repo.stmt(Driver).bulk_create(
+            make_drivers(10), dto=DriverSchema
+        )
+    assert len(drivers) == 10
+    assert execute.call_count == 3
+    assert await repo.query(Driver).count() == 10
+
+
+@pytest.mark.repo
+@pytest.mark.repo_bulk_create
+async def test_bulk_create_drivers_empty(repo):
+    async with repo:
+        assert await repo.stmt(Driver).bulk_create([]) == 0
+        assert await repo.stmt(Driver).bulk_create([], dto=DriverSchema) == []
+
+
+@pytest.mark.repo
+@pytest.mark.repo_bulk_create
+async def test_bulk_create_drivers_different_fields(repo):
+    rows = make_drivers(2)
+    rows[1].pop("patronymic")
+    with pytest.raises(ValueError):
+        async with repo:
+            await repo.stmt(Driver).bulk_create(rows)
+
+
+@pytest.mark.repo
+@pytest.mark.repo_bulk_create
+async def test_bulk_create_drivers_unique_error(repo):
+    with pytest.raises(SQLAlchemyError):
+        async with repo:
+            await repo.stmt(Driver).bulk_create(make_drivers(2) + make_drivers(1))
+    assert await repo.query(Driver).count() == 0
@@ -0,0 +1,67 @@
+import pytest
+
+from tests.apps.tools.repository.v2.bulk_create.test_bulk_create_driver import (
+    make_drivers,
+)
+from tests.apps.tools.repository.v2.conftest import DriverSchema
+from tests.apps.tools.repository.v2.models import Driver
+
+
+@pytest.mark.repo
+@pytest.mark.repo_bulk_upsert
+async def test_bulk_upsert_drivers_insert_and_update(init_data, repo):
+    ivan_before = await repo.query(Driver).get(id=init_data["ivan"].id)
+    rows = make_drivers(2)
+    rows[0]["phone_number"] = init_data["ivan"].phone_number
+    rows[0]["first_name"] = "Иван2"
+    async with repo:
+        drivers = await repo.stmt(Driver).bulk_upsert(
+            rows, conflict_keys=["phone_number"], dto=DriverSchema
+        )
+    assert len(drivers) == 2
+    assert drivers[0].id == init_data["ivan"].id
+    assert drivers[0].first_name == "Иван2"
+    assert await repo.query(Driver).count() == 3
+
+    ivan = await repo.query(Driver).get(id=init_data["ivan"].id)
+    assert ivan.first_name == "Иван2"
+    assert ivan.updated_at > ivan_before.updated_at
+    assert ivan.created_at == ivan_before.created_at
+
+
+@pytest.mark.repo
+@pytest.mark.repo_bulk_upsert
+async def test_bulk_upsert_drivers_update_fields(init_data, repo):
+    rows = make_drivers(1)
+    rows[0]["phone_number"] = init_data["ivan"].phone_number
+    async with repo:
+        count = await repo.stmt(Driver).bulk_upsert(
+            rows, conflict_keys=["phone_number"], update_fields=["last_name"]
+        )
+    assert count == 1
+    ivan = await repo.query(Driver).get(id=init_data["ivan"].id)
+    assert ivan.last_name == rows[0]["last_name"]
+    assert ivan.first_name == init_data["ivan"].first_name
+
+
+@pytest.mark.repo
+@pytest.mark.repo_bulk_upsert
+async def test_bulk_upsert_drivers_duplicates_in_rows(repo):
+    rows = make_drivers(1) + make_drivers(1)
+    rows[1]["first_name"] = "Последний"
+    async with repo:
+        drivers = await repo.stmt(Driver).bulk_upsert(
+            rows, conflict_keys=["phone_number"], dto=DriverSchema
+        )
+    assert len(drivers) == 1
+    assert drivers[0].first_name == "Последний"
+
+
+@pytest.mark.repo
+@pytest.mark.repo_bulk_upsert
+async def test_bulk_upsert_drivers_no_conflict_key_value(repo):
+    rows = make_drivers(1)
+    rows[0].pop("phone_number")
+    with pytest.raises(ValueError):
+        async with repo:
+            await repo.stmt(Driver).bulk_upsert(rows, conflict_keys=["phone_number"])
@@ -0,0 +1,50 @@
+import pytest
+
+from tests.apps.tools.repository.v2.conftest import CarSchema
+from tests.apps.tools.repository.v2.models import Car, Driver
+
+
+@pytest.mark.repo
+@pytest.mark.repo_delete_where
+async def test_delete_where_cars_count(init_data, repo):
+    async with repo:
+        count = await repo.stmt(Car).delete_where(year__lte=2022)
+    assert count == 2
+    assert await repo.query(Car).count() == 0
+
+
+@pytest.mark.repo
+@pytest.mark.repo_delete_where
+async def test_delete_where_cars_dto(init_data, repo):
+    async with repo:
+        cars = await repo.stmt(Car).delete_where(is_broken=True, dto=CarSchema)
+    assert len(cars) == 1
+    assert cars[0].driver_id == init_data["oleg"].id
+    assert await repo.query(Car).count() == 1
+
+
+@pytest.mark.repo
+@pytest.mark.repo_delete_where
+async def test_delete_where_drivers_join_filter_cascade(init_data, repo):
+    async with repo:
+        count = await repo.stmt(Driver).delete_where(join__cars__is_broken=True)
+    assert count == 1
+    assert not await repo.query(Driver).exists(id=init_data["oleg"].id)
+    assert await repo.query(Car).count() == 1
+
+
+@pytest.mark.repo
+@pytest.mark.repo_delete_where
+async def test_delete_where_no_matches(init_data, repo):
+    async with repo:
+        count = await repo.stmt(Car).delete_where(vendor="Lada")
+    assert count == 0
+    assert await repo.query(Car).count() == 2
+
+
+@pytest.mark.repo
+@pytest.mark.repo_delete_where
+async def test_delete_where_no_filters(init_data, repo):
+    with pytest.raises(ValueError):
+        async with repo:
+            await repo.stmt(Car).delete_where()
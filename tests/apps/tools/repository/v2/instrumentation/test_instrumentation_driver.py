@@ -0,0 +1,102 @@
+import logging
+
+from datetime import date
+
+import pytest
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.tools.metrics import Histogram
+from app.tools.repository.sql_alchemy.instrumentation import query_stats
+from tests.apps.tools.repository.v2.models import Driver
+
+
+@pytest.fixture(scope="function")
+def events():
+    events = []
+    query_stats.reset()
+    query_stats.add_hook(events.append)
+    yield events
+    query_stats.remove_hook(events.append)
+    query_stats.slow_query_ms = None
+    query_stats.reset()
+
+
+def driver_data(i: int) -> dict:
+    return {
+        "first_name": f"Имя{i}",
+        "last_name": "Петров",
+        "birth_date": date(1990, 1, 1),
+        "phone_number": f"+7{i:010d}",
+    }
+
+
+@pytest.mark.repo
+@pytest.mark.repo_instrumentation
+async def test_instrumentation_histogram():
+    histogram = Histogram()
+    for value in range(1, 1001):
+        histogram.record(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 1000
+    assert snapshot["min"] == 1
+    assert snapshot["max"] == 1000
+    assert snapshot["p50"] == pytest.approx(500, rel=0.01)
+    assert snapshot["p99"] == pytest.approx(990, rel=0.01)
+    assert Histogram().snapshot()["p50"] == 0
+
+
+@pytest.mark.repo
+@pytest.mark.repo_instrumentation
+async def test_instrumentation_drivers_events(repo, events):
+    async with repo:
+        await repo.stmt(Driver).bulk_create([driver_data(i) for i in range(3)])
+    drivers = await repo.query(Driver).filter(last_name="Петров")
+    await repo.query(Driver).filter(last_name="Иванов")
+    await repo.execute(select(Driver.id))
+
+    assert [(e.model, e.operation) for e in events] == [
+        ("Driver", "bulk_create"),
+        ("Driver", "filter"),
+        ("Driver", "filter"),
+        ("", "execute"),
+    ]
+    assert events[0].rows == 3
+    assert events[1].rows == len(drivers) == 3
+    assert events[2].rows == 0
+    assert events[1].shape == events[2].shape
+    assert events[1].shape != events[3].shape
+    assert "FROM driver" in events[1].statements[0]
+    assert all(e.duration_ms > 0 and not e.error for e in events)
+
+    snapshot = query_stats.snapshot()
+    assert snapshot["Driver.filter"]["count"] == 2
+    assert snapshot["Driver.bulk_create"]["count"] == 1
+
+
+@pytest.mark.repo
+@pytest.mark.repo_instrumentation
+async def test_instrumentation_drivers_stream_and_error(repo, events):
+    async with repo:
+        await repo.stmt(Driver).bulk_create([driver_data(i) for i in range(5)])
+    batches = [b async for b in repo.query(Driver).stream(batch_size=2)]
+    assert len(batches) == 3
+    with pytest.raises(SQLAlchemyError):
+        await repo.query(Driver).get(first_name="Нет")
+
+    stream_event, get_event = events[1:]
+    assert stream_event.operation == "stream"
+    assert stream_event.rows == 5
+    assert get_event.operation == "get"
+    assert get_event.error
+
+
+@pytest.mark.repo
+@pytest.mark.repo_instrumentation
+async def test_instrumentation_drivers_slow_query(repo, events, caplog):
+    query_stats.slow_query_ms = 0
+    with caplog.at_level(logging.WARNING):
+        await repo.query(Driver).count()
+    assert "Driver.count" in caplog.text
+    assert "FROM driver" in caplog.text
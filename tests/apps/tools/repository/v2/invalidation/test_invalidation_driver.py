@@ -0,0 +1,171 @@
+from datetime import date
+
+import pytest
+
+from sqlalchemy.exc import IntegrityError
+
+from app.tools.repository.sql_alchemy.invalidation import (
+    INVALIDATIONS_KEY,
+    invalidation_registry,
+)
+from tests.apps.tools.repository.v2.models import Driver
+
+
+@pytest.fixture(scope="function")
+def changes():
+    published = []
+
+    async def handler(model_changes):
+        published.append(model_changes)
+
+    invalidation_registry.register(Driver, handler)
+    yield published
+    invalidation_registry.unregister(Driver, handler)
+
+
+def phones(model_changes) -> list[str]:
+    return sorted(change.values["phone_number"] for change in model_changes)
+
+
+@pytest.mark.repo
+@pytest.mark.repo_invalidation
+async def test_invalidation_drivers_after_commit(init_data, repo, changes):
+    async with repo:
+        await repo.stmt(Driver).update(init_data["ivan"], phone_number="+70000000000")
+        await repo.stmt(Driver).delete(init_data["oleg"])
+        assert changes == []
+    assert len(changes) == 1
+    assert phones(changes[0]) == ["+70000000000", "+71234567890", "+71234567891"]
+    assert {change.pk for change in changes[0]} == {
+        init_data["ivan"].id,
+        init_data["oleg"].id,
+    }
+
+
+@pytest.mark.repo
+@pytest.mark.repo_invalidation
+async def test_invalidation_drivers_create(repo, changes):
+    async with repo:
+        driver = await repo.stmt(Driver).create(
+            first_name="Иван",
+            last_name="Петров",
+            birth_date=date(1990, 1, 1),
+            phone_number="+71234567890",
+        )
+    [[change]] = changes
+    assert change.pk == driver.id
+    assert change.values["phone_number"] == "+71234567890"
+
+
+@pytest.mark.repo
+@pytest.mark.repo_invalidation
+async def test_invalidation_drivers_rollback(init_data, repo, changes):
+    with pytest.raises(RuntimeError):
+        async with repo:
+            await repo.stmt(Driver).delete(init_data["ivan"])
+            raise RuntimeError
+    assert changes == []
+    async with repo:
+        pass
+    assert changes == []
+
+
+@pytest.mark.repo
+@pytest.mark.repo_invalidation
+async def test_invalidation_drivers_update_where(init_data, repo, changes):
+    async with repo:
+        await repo.stmt(Driver).update_where(
+            {"phone_number": "+70000000000"}, first_name="Иван"
+        )
+    [model_changes] = changes
+    assert phones(model_changes) == ["+70000000000", "+71234567890"]
+    assert {change.pk for change in model_changes} == {init_data["ivan"].id}
+
+
+@pytest.mark.repo
+@pytest.mark.repo_invalidation
+async def test_invalidation_drivers_delete_where(init_data, repo, changes):
+    async with repo:
+        await repo.stmt(Driver).delete_where(patronymic="Николаевич")
+    [model_changes] = changes
+    assert phones(model_changes) == ["+71234567890", "+71234567891"]
+
+
+@pytest.mark.repo
+@pytest.mark.repo_invalidation
+async def test_invalidation_drivers_bulk_create(repo, changes):
+    async with repo:
+        await repo.stmt(Driver).bulk_create(
+            [
+                {
+                    "first_name": f"Имя{i}",
+                    "last_name": "Петров",
+                    "birth_date": date(1990, 1, 1),
+                    "phone_number": f"+7{i:010d}",
+                }
+                for i in range(2)
+            ]
+        )
+    [model_changes] = changes
+    assert phones(model_changes) == ["+70000000000", "+70000000001"]
+
+
+@pytest.mark.repo
+@pytest.mark.repo_invalidation
+async def test_invalidation_drivers_handler_error(init_data, repo, changes):
+    async def broken(model_changes):
+        raise ConnectionError
+
+    invalidation_registry.register(Driver, broken)
+    try:
+        async with repo:
+            await repo.stmt(Driver).delete(init_data["ivan"])
+    finally:
+        invalidation_registry.unregister(Driver, broken)
+    assert len(changes) == 1
+    assert await repo.query(Driver).count() == 1
+
+
+@pytest.mark.repo
+@pytest.mark.repo_invalidation
+async def test_invalidation_drivers_dependencies(init_data, repo):
+    deleted = []
+
+    async def handler(model_changes, cache):
+        cache.extend(change.pk for change in model_changes)
+
+    invalidation_registry.register(Driver, handler, cache=deleted)
+    try:
+        async with repo:
+            await repo.stmt(Driver).delete(init_data["ivan"])
+    finally:
+        invalidation_registry.unregister(Driver, handler)
+    assert deleted == [init_data["ivan"].id]
+    assert not invalidation_registry.watches(Driver)
+
+
+@pytest.mark.repo
+@pytest.mark.repo_invalidation
+async def test_invalidation_drivers_commit_error(init_data, repo, changes):
+    with pytest.raises(IntegrityError):
+        async with repo:
+            session = repo._session
+            await repo.stmt(Driver).update(
+                init_data["ivan"], phone_number="+70000000000"
+            )
+            # уникальность нарушается при flush во время коммита
+            session.add(
+                Driver(
+                    first_name="Иван",
+                    last_name="Петров",
+                    birth_date=date(1990, 1, 1),
+                    phone_number="+71234567891",
+                )
+            )
+    assert changes == []
+    assert INVALIDATIONS_KEY not in session.info
+    assert repo._session is None
+    async with repo:
+        await repo.stmt(Driver).delete(init_data["oleg"])
+    [[change]] = changes
+    assert change.pk == init_data["oleg"].id
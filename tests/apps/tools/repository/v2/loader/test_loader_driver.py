@@ -0,0 +1,113 @@
+import asyncio
+
+from datetime import date
+from uuid import uuid4
+
+import pytest
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.tools.repository.sql_alchemy.loader import Loader
+from app.tools.repository.sql_alchemy.sql_alchemy_v2 import SARepository
+from tests.apps.tools.repository.v2.conftest import DriverSchema, LicenseSchema
+from tests.apps.tools.repository.v2.models import Driver
+
+
+@pytest.fixture(scope="function")
+async def drivers(repo):
+    async with repo:
+        await repo.stmt(Driver).bulk_create(
+            [
+                {
+                    "first_name": f"Имя{i}",
+                    "last_name": "Петров",
+                    "birth_date": date(1990, 1, 1),
+                    "phone_number": f"+7{i:010d}",
+                }
+                for i in range(5)
+            ]
+        )
+    return await repo.query(Driver).all()
+
+
+@pytest.fixture(scope="function")
+def fresh_repo(db_conn):
+    return SARepository(db_conn)
+
+
+@pytest.mark.repo
+@pytest.mark.repo_loader
+async def test_loader_drivers_one_batch(repo, drivers, mocker):
+    async def fetch(keys):
+        return await repo.query(Driver).filter(id__in=keys)
+
+    fetch = mocker.AsyncMock(side_effect=fetch)
+    loader = Loader(fetch, key="id")
+    missing = uuid4()
+    result = await asyncio.gather(
+        *(loader.load(d.id) for d in reversed(drivers)), loader.load(missing)
+    )
+    assert [d.id for d in result[:-1]] == [d.id for d in reversed(drivers)]
+    assert result[-1] is None
+    fetch.assert_awaited_once()
+    assert loader.batches == 1
+    assert loader.max_batch == 6
+
+
+@pytest.mark.repo
+@pytest.mark.repo_loader
+async def test_loader_drivers_dedupe(fresh_repo, drivers):
+    loader = fresh_repo.loader(Driver, "phone_number", DriverSchema)
+    phone = drivers[0].phone_number
+    result = await loader.load_many([phone, phone, drivers[1].phone_number, phone])
+    assert all(isinstance(d, DriverSchema) for d in result)
+    assert result[0] is result[1] is result[3]
+    assert loader.loads == 4
+    assert loader.hits == 2
+    assert loader.batches == 1
+    assert loader.mean_batch_size == 2
+
+
+@pytest.mark.repo
+@pytest.mark.repo_loader
+async def test_loader_drivers_next_tick_new_batch(fresh_repo, drivers):
+    loader = fresh_repo.loader(Driver)
+    assert loader is fresh_repo.loader(Driver)
+    first = await loader.load(drivers[0].id)
+    second = await loader.load(drivers[0].id)
+    assert first.id == second.id
+    assert loader.batches == 2
+    assert loader.hits == 0
+
+
+@pytest.mark.repo
+@pytest.mark.repo_loader
+async def test_loader_drivers_batch_split(repo, drivers):
+    async def fetch(keys):
+        return await repo.query(Driver).filter(id__in=keys)
+
+    loader = Loader(fetch, key="id", max_batch_size=2)
+    result = await loader.load_many([d.id for d in drivers])
+    assert [d.id for d in result] == [d.id for d in drivers]
+    assert loader.batches == 3
+
+
+@pytest.mark.repo
+@pytest.mark.repo_loader
+async def test_loader_drivers_error(mocker):
+    fetch = mocker.AsyncMock(side_effect=SQLAlchemyError("ошибка"))
+    loader = Loader(fetch, key="id")
+    result = await asyncio.gather(
+        loader.load(1), loader.load(2), return_exceptions=True
+    )
+    assert all(isinstance(err, SQLAlchemyError) for err in result)
+    fetch.assert_awaited_once()
+
+
+@pytest.mark.repo
+@pytest.mark.repo_loader
+async def test_loader_drivers_wrong_key(repo):
+    with pytest.raises(ValueError):
+        repo.loader(Driver, "unknown")
+    with pytest.raises(ValueError):
+        repo.loader(Driver, "phone_number", dto=LicenseSchema)
@@ -0,0 +1,89 @@
+from datetime import date
+
+import pytest
+
+from app.tools.repository.sql_alchemy.sql_alchemy_v2 import Page
+from tests.apps.tools.repository.v2.conftest import DriverSchema
+from tests.apps.tools.repository.v2.models import Driver
+
+
+@pytest.fixture(scope="function")
+async def drivers(repo):
+    async with repo:
+        await repo.stmt(Driver).bulk_create(
+            [
+                {
+                    "first_name": f"Имя{i}",
+                    "last_name": "Петров" if i % 2 else "Иванов",
+                    "birth_date": date(1990, 1, 1 + i % 3),
+                    "phone_number": f"+7{i:010d}",
+                }
+                for i in range(7)
+            ]
+        )
+    return await repo.query(Driver).filter(order_by=[Driver.created_at, Driver.id])
+
+
+async def collect_pages(repo, **kwargs) -> list[list]:
+    pages = []
+    cursor = None
+    while True:
+        page = await repo.query(Driver).paginate(after=cursor, **kwargs)
+        pages.append(page.items)
+        cursor = page.next_cursor
+        if not cursor:
+            return pages
+
+
+@pytest.mark.repo
+@pytest.mark.repo_paginate
+async def test_paginate_drivers_all_pages(repo, drivers):
+    pages = await collect_pages(repo, page_size=3)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [d.id for page in pages for d in page] == [d.id for d in drivers]
+
+
+@pytest.mark.repo
+@pytest.mark.repo_paginate
+async def test_paginate_drivers_exact_page_size(repo, drivers):
+    page = await repo.query(Driver).paginate(page_size=7)
+    assert isinstance(page, Page)
+    assert len(page.items) == 7
+    assert page.next_cursor is None
+
+
+@pytest.mark.repo
+@pytest.mark.repo_paginate
+async def test_paginate_drivers_desc_order(repo, drivers):
+    pages = await collect_pages(repo, page_size=2, order_by=[Driver.created_at.desc()])
+    ids = [d.id for page in pages for d in page]
+    expected = sorted(drivers, key=lambda d: (d.created_at, d.id), reverse=True)
+    assert ids == [d.id for d in expected]
+
+
+@pytest.mark.repo
+@pytest.mark.repo_paginate
+async def test_paginate_drivers_mixed_order(repo, drivers):
+    order_by = [Driver.birth_date.desc(), Driver.phone_number]
+    pages = await collect_pages(repo, page_size=2, order_by=order_by)
+    phones = [d.phone_number for page in pages for d in page]
+    expected = sorted(drivers, key=lambda d: d.phone_number)
+    expected = sorted(expected, key=lambda d: d.birth_date, reverse=True)
+    assert phones == [d.phone_number for d in expected]
+
+
+@pytest.mark.repo
+@pytest.mark.repo_paginate
+async def test_paginate_drivers_filters_dto(repo, drivers):
+    pages = await collect_pages(repo, page_size=2, last_name="Петров", dto=DriverSchema)
+    items = [d for page in pages for d in page]
+    assert len(items) == 3
+    assert all(isinstance(d, DriverSchema) for d in items)
+    assert {d.last_name for d in items} == {"Петров"}
+
+
+@pytest.mark.repo
+@pytest.mark.repo_paginate
+async def test_paginate_drivers_bad_cursor(repo, drivers):
+    with pytest.raises(ValueError):
+        await repo.query(Driver).paginate(after="bad-cursor")
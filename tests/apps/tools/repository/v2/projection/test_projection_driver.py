@@ -0,0 +1,83 @@
+from datetime import date
+
+import pytest
+
+from tests.apps.tools.repository.v2.conftest import (
+    DriverSchema,
+    DriverWithInLoadsSchema,
+)
+from tests.apps.tools.repository.v2.models import Driver
+
+
+@pytest.fixture(scope="function")
+async def drivers(repo):
+    async with repo:
+        await repo.stmt(Driver).bulk_create(
+            [
+                {
+                    "first_name": f"Имя{i}",
+                    "last_name": "Петров" if i % 2 else "Иванов",
+                    "birth_date": date(1990, 1, 1),
+                    "phone_number": f"+7{i:010d}",
+                }
+                for i in range(5)
+            ]
+        )
+    return await repo.query(Driver).all(order_by=[Driver.id])
+
+
+@pytest.mark.repo
+@pytest.mark.repo_projection
+async def test_projection_driver_columns(repo):
+    columns = repo.query(Driver)._base_repo.get_projection(DriverSchema)
+    assert [c.key for c in columns] == list(DriverSchema.model_fields)
+    assert repo.query(Driver)._base_repo.get_projection(DriverWithInLoadsSchema) is None
+
+
+@pytest.mark.repo
+@pytest.mark.repo_projection
+async def test_projection_drivers_all(repo, drivers):
+    result = await repo.query(Driver).all(dto=DriverSchema, order_by=[Driver.id])
+    assert result == [DriverSchema.model_validate(d) for d in drivers]
+
+
+@pytest.mark.repo
+@pytest.mark.repo_projection
+async def test_projection_drivers_filter_find_get(repo, drivers):
+    result = await repo.query(Driver).filter(dto=DriverSchema, last_name="Петров")
+    assert len(result) == 2
+    assert all(isinstance(d, DriverSchema) for d in result)
+
+    driver = await repo.query(Driver).get(dto=DriverSchema, id=drivers[0].id)
+    assert driver == DriverSchema.model_validate(drivers[0])
+
+    driver = await repo.query(Driver).find(dto=DriverSchema, first_name="Нет")
+    assert driver is None
+
+    driver = await repo.query(Driver).get_or_none(dto=DriverSchema, id=drivers[1].id)
+    assert driver == DriverSchema.model_validate(drivers[1])
+
+
+@pytest.mark.repo
+@pytest.mark.repo_projection
+async def test_projection_drivers_with_loads_fallback(repo, drivers):
+    result = await repo.query(Driver).all(
+        dto=DriverWithInLoadsSchema,
+        select_in_load=[Driver.cars],
+        joined_load=[Driver.license],
+    )
+    assert len(result) == 5
+    assert all(d.cars == [] for d in result)
+
+
+@pytest.mark.repo
+@pytest.mark.repo_projection
+async def test_projection_drivers_paginate(repo, drivers):
+    page = await repo.query(Driver).paginate(dto=DriverSchema, page_size=3)
+    assert len(page.items) == 3
+    assert all(isinstance(d, DriverSchema) for d in page.items)
+    page = await repo.query(Driver).paginate(
+        dto=DriverSchema, page_size=3, after=page.next_cursor
+    )
+    assert len(page.items) == 2
+    assert page.next_cursor is None
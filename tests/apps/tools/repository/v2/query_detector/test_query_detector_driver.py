@@ -0,0 +1,76 @@
+import pytest
+
+from app.tools.repository.sql_alchemy.query_detector import query_detector
+from tests.apps.tools.repository.v2.models import Car, Driver
+
+
+@pytest.fixture(scope="function")
+def detector():
+    query_detector.enabled = True
+    query_detector.reports.clear()
+    yield query_detector
+    query_detector.enabled = False
+    query_detector.reports.clear()
+
+
+@pytest.mark.repo
+@pytest.mark.repo_query_detector
+async def test_query_detector_repeated_in_transaction(repo, init_data, detector):
+    drivers = [init_data["ivan"], init_data["oleg"], init_data["ivan"]]
+    async with repo:
+        for driver in drivers:
+            await repo.query(Car).find(driver_id=driver.id)
+        await repo.query(Driver).count()
+
+    assert len(detector.reports) == 1
+    report = detector.reports[0]
+    assert report.name == "SARepository"
+    assert report.statements == 4
+    [(sql, call_sites)] = report.repeated.items()
+    assert "FROM car" in sql
+    assert len(call_sites) == 3
+    assert all(__file__ in call_site for call_site in call_sites)
+    assert "test_query_detector_repeated_in_transaction" in report.format()
+
+
+@pytest.mark.repo
+@pytest.mark.repo_query_detector
+async def test_query_detector_lazy_load(repo, init_data, detector):
+    async with repo:
+        drivers = await repo.query(Driver).all()
+        await repo._session.run_sync(lambda _: [d.cars for d in drivers])
+
+    [report] = detector.reports
+    assert not report.repeated
+    assert len(report.lazy_loads) == 2
+    assert all(rel == "Driver.cars" for rel, _ in report.lazy_loads)
+    assert all(__file__ in call_site for _, call_site in report.lazy_loads)
+
+
+@pytest.mark.repo
+@pytest.mark.repo_query_detector
+async def test_query_detector_track_use_case(repo, init_data, detector):
+    @detector.track("UseCase.run")
+    async def run():
+        for _ in range(3):
+            await repo.query(Driver).find(first_name="Иван")
+
+    await run()
+    [report] = detector.reports
+    assert report.name == "UseCase.run"
+    assert report.statements == 3
+
+
+@pytest.mark.repo
+@pytest.mark.repo_query_detector
+async def test_query_detector_no_problems_or_disabled(repo, init_data, detector):
+    async with repo:
+        await repo.query(Driver).find(first_name="Иван")
+        await repo.query(Car).all(select_in_load=[Car.driver])
+    assert not detector.reports
+
+    detector.enabled = False
+    async with repo:
+        for _ in range(3):
+            await repo.query(Driver).find(first_name="Иван")
+    assert not detector.reports
@@ -0,0 +1,115 @@
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+from sqlalchemy import event, make_url, select, update
+
+from app.tools.repository.sql_alchemy.sql_alchemy_v2 import SARepository
+from core.database import DatabaseHelper, LeastConnectionsPolicy, ReplicaSession
+from tests.apps.tools.repository.v2.models import Driver
+
+
+def count_statements(conn: DatabaseHelper) -> Counter:
+    counter = Counter()
+    for name, engine in [("primary", conn.engine)] + [
+        (f"replica{i}", replica) for i, replica in enumerate(conn.replicas)
+    ]:
+        event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            lambda *args, name=name: counter.update([name]),
+        )
+    return counter
+
+
+@pytest.fixture(scope="function")
+async def replica_conn(database):
+    conn = DatabaseHelper(url=database, replica_urls=[database, database])
+    yield conn
+    await conn.dispose()
+
+
+@pytest.mark.repo
+@pytest.mark.repo_replica
+async def test_replica_drivers_round_robin(replica_conn, init_data):
+    counter = count_statements(replica_conn)
+    repo = SARepository(replica_conn)
+    drivers = await repo.query(Driver).all()
+    assert len(drivers) == 2
+    assert await repo.query(Driver).count() == 2
+    await repo.execute(select(Driver.id))
+    assert counter == {"replica0": 2, "replica1": 1}
+
+
+@pytest.mark.repo
+@pytest.mark.repo_replica
+async def test_replica_drivers_read_your_writes(replica_conn, init_data):
+    counter = count_statements(replica_conn)
+    repo = SARepository(replica_conn)
+    async with repo:
+        await repo.stmt(Driver).update(init_data["ivan"], first_name="Петр")
+        driver = await repo.query(Driver).get(id=init_data["ivan"].id)
+        assert driver.first_name == "Петр"
+    await repo.execute(update(Driver).values(last_name="Сидоров"))
+    assert set(counter) == {"primary"}
+
+
+@pytest.mark.repo
+@pytest.mark.repo_replica
+async def test_replica_drivers_fallback(database, init_data):
+    broken = make_url(database).set(port=1).render_as_string(hide_password=False)
+    conn = DatabaseHelper(url=database, replica_urls=[broken])
+    counter = count_statements(conn)
+    repo = SARepository(conn)
+    try:
+        session = conn.read_session_factory()
+        assert isinstance(session, ReplicaSession)
+        await session.close()
+
+        drivers = await repo.query(Driver).all()
+        assert len(drivers) == 2
+        assert counter["primary"] == 1
+        assert conn.choose_replica() is None
+        assert not isinstance(conn.read_session_factory(), ReplicaSession)
+    finally:
+        await conn.dispose()
+
+
+@pytest.mark.repo
+@pytest.mark.repo_replica
+@pytest.mark.parametrize("method", ["scalars", "stream_scalars", "get", "get_one"])
+async def test_replica_drivers_session_fallback(database, init_data, method):
+    broken = make_url(database).set(port=1).render_as_string(hide_password=False)
+    conn = DatabaseHelper(url=database, replica_urls=[broken])
+    counter = count_statements(conn)
+    try:
+        async with conn.read_session_factory() as session:
+            assert isinstance(session, ReplicaSession)
+            if method == "scalars":
+                drivers = list(await session.scalars(select(Driver)))
+            elif method == "stream_scalars":
+                result = await session.stream_scalars(select(Driver))
+                drivers = [driver async for driver in result]
+            else:
+                driver = await getattr(session, method)(Driver, init_data["ivan"].id)
+                drivers = [driver]
+        assert {driver.id for driver in drivers} <= {
+            init_data["ivan"].id,
+            init_data["oleg"].id,
+        }
+        assert len(drivers) == (1 if method.startswith("get") else 2)
+        assert counter["primary"] == 1
+        assert conn.choose_replica() is None
+    finally:
+        await conn.dispose()
+
+
+@pytest.mark.repo
+@pytest.mark.repo_replica
+async def test_replica_least_connections():
+    engines = [
+        SimpleNamespace(pool=SimpleNamespace(checkedout=lambda n=n: n))
+        for n in (3, 1, 2)
+    ]
+    assert LeastConnectionsPolicy().choose(engines) is engines[1]
@@ -0,0 +1,121 @@
+from datetime import date
+
+import pytest
+
+from sqlalchemy import select
+
+from app.tools.repository.sql_alchemy.sql_alchemy_v2 import F
+from app.tools.repository.sql_alchemy.statement_cache import statement_cache
+from tests.apps.tools.repository.v2.models import Car, Driver
+
+
+@pytest.fixture(scope="function", autouse=True)
+def clear_statement_cache():
+    statement_cache.clear()
+    yield
+    statement_cache.clear()
+
+
+@pytest.mark.repo
+@pytest.mark.repo_statement_cache
+async def test_statement_cache_reuses_shape(init_data, repo):
+    ivan = await repo.query(Driver).find(phone_number=init_data["ivan"].phone_number)
+    oleg = await repo.query(Driver).find(phone_number=init_data["oleg"].phone_number)
+    assert ivan.id == init_data["ivan"].id
+    assert oleg.id == init_data["oleg"].id
+    assert statement_cache.misses == 1
+    assert statement_cache.hits == 1
+    assert len(statement_cache) == 1
+
+
+@pytest.mark.repo
+@pytest.mark.repo_statement_cache
+async def test_statement_cache_none_value_changes_shape(init_data, repo):
+    drivers = await repo.query(Driver).filter(last_name=None)
+    assert drivers == []
+    drivers = await repo.query(Driver).filter(last_name=init_data["ivan"].last_name)
+    assert len(drivers) == 1
+    assert len(statement_cache) == 2
+
+
+@pytest.mark.repo
+@pytest.mark.repo_statement_cache
+async def test_statement_cache_in_different_lengths(init_data, repo):
+    drivers = await repo.query(Driver).filter(last_name__in=["Петров"])
+    assert len(drivers) == 1
+    drivers = await repo.query(Driver).filter(last_name__in=["Петров", "Иванов"])
+    assert len(drivers) == 2
+    drivers = await repo.query(Driver).filter(last_name__in=[])
+    assert drivers == []
+    assert len(statement_cache) == 1
+
+
+@pytest.mark.repo
+@pytest.mark.repo_statement_cache
+async def test_statement_cache_like_between(init_data, repo):
+    drivers = await repo.query(Driver).filter(
+        first_name__ilike="ива",
+        birth_date__between=(date(1989, 1, 1), date(1990, 1, 1)),
+    )
+    assert [d.id for d in drivers] == [init_data["ivan"].id]
+    drivers = await repo.query(Driver).filter(
+        first_name__ilike="оле",
+        birth_date__between=(date(1990, 1, 2), date(1991, 1, 1)),
+    )
+    assert [d.id for d in drivers] == [init_data["oleg"].id]
+    assert len(statement_cache) == 1
+
+
+@pytest.mark.repo
+@pytest.mark.repo_statement_cache
+async def test_statement_cache_f_expressions(init_data, repo):
+    def expressions(color: str, year: int):
+        return F(join__cars__color=color) | F(join__cars__year__gte=year)
+
+    drivers = await repo.query(Driver).filter(expressions("Серый", 2030))
+    assert [d.id for d in drivers] == [init_data["ivan"].id]
+    drivers = await repo.query(Driver).filter(expressions("Синий", 2021))
+    assert {d.id for d in drivers} == {init_data["ivan"].id, init_data["oleg"].id}
+    drivers = await repo.query(Driver).filter(expressions("Синий", 2030))
+    assert drivers == []
+    assert len(statement_cache) == 1
+
+
+@pytest.mark.repo
+@pytest.mark.repo_statement_cache
+async def test_statement_cache_excludes(init_data, repo):
+    drivers = await repo.query(Driver).filter(
+        patronymic="Николаевич",
+        excludes={Driver.id: init_data["ivan"].id},
+    )
+    assert [d.id for d in drivers] == [init_data["oleg"].id]
+    drivers = await repo.query(Driver).filter(
+        patronymic="Николаевич",
+        excludes={Driver.id: init_data["oleg"].id},
+    )
+    assert [d.id for d in drivers] == [init_data["ivan"].id]
+    count = await repo.query(Driver).count(
+        excludes={Driver.id: init_data["oleg"].id},
+    )
+    assert count == 1
+    assert len(statement_cache) == 2
+
+
+@pytest.mark.repo
+@pytest.mark.repo_statement_cache
+async def test_statement_cache_limit_offset(init_data, repo):
+    first = await repo.query(Driver).filter(limit=1, offset=0)
+    second = await repo.query(Driver).filter(limit=1, offset=1)
+    assert len(first) == len(second) == 1
+    assert first[0].id != second[0].id
+    assert len(statement_cache) == 1
+
+
+@pytest.mark.repo
+@pytest.mark.repo_statement_cache
+async def test_statement_cache_subquery_not_cached(init_data, repo):
+    drivers = await repo.query(Driver).filter(
+        id__in=select(Car.driver_id).where(Car.is_broken == True),
+    )
+    assert [d.id for d in drivers] == [init_data["oleg"].id]
+    assert len(statement_cache) == 0
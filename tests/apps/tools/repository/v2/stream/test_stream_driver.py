@@ -0,0 +1,65 @@
+from contextlib import aclosing
+from datetime import date
+
+import pytest
+
+from tests.apps.tools.repository.v2.conftest import DriverSchema
+from tests.apps.tools.repository.v2.models import Driver
+
+
+@pytest.fixture(scope="function")
+async def drivers(repo):
+    async with repo:
+        await repo.stmt(Driver).bulk_create(
+            [
+                {
+                    "first_name": f"Имя{i}",
+                    "last_name": "Петров" if i % 2 else "Иванов",
+                    "birth_date": date(1990, 1, 1),
+                    "phone_number": f"+7{i:010d}",
+                }
+                for i in range(5)
+            ]
+        )
+    return await repo.query(Driver).all()
+
+
+@pytest.mark.repo
+@pytest.mark.repo_stream
+async def test_stream_drivers_batches(repo, drivers):
+    batches = [batch async for batch in repo.query(Driver).stream(batch_size=2)]
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert all(isinstance(d, Driver) for batch in batches for d in batch)
+    assert [d.id for batch in batches for d in batch] == [d.id for d in drivers]
+
+
+@pytest.mark.repo
+@pytest.mark.repo_stream
+async def test_stream_drivers_dto_filters(repo, drivers):
+    batches = [
+        batch
+        async for batch in repo.query(Driver).stream(
+            batch_size=10, dto=DriverSchema, last_name="Петров"
+        )
+    ]
+    assert len(batches) == 1
+    assert len(batches[0]) == 2
+    assert all(isinstance(d, DriverSchema) for d in batches[0])
+
+
+@pytest.mark.repo
+@pytest.mark.repo_stream
+async def test_stream_drivers_early_exit(repo, drivers):
+    async with aclosing(repo.query(Driver).stream(batch_size=1)) as batches:
+        async for batch in batches:
+            assert len(batch) == 1
+            break
+    assert await repo.query(Driver).count() == 5
+
+
+@pytest.mark.repo
+@pytest.mark.repo_stream
+async def test_stream_drivers_inside_transaction(repo, drivers):
+    async with repo:
+        batches = [batch async for batch in repo.query(Driver).stream(batch_size=3)]
+    assert sum(len(batch) for batch in batches) == 5
@@ -0,0 +1,65 @@
+import pytest
+
+from app.tools.repository.sql_alchemy.sql_alchemy_v2 import F
+from tests.apps.tools.repository.v2.conftest import CarSchema, DriverSchema
+from tests.apps.tools.repository.v2.models import Car, Driver
+
+
+@pytest.mark.repo
+@pytest.mark.repo_update_where
+async def test_update_where_drivers_count(init_data, repo):
+    async with repo:
+        count = await repo.stmt(Driver).update_where(
+            {"patronymic": "Петрович"}, patronymic="Николаевич"
+        )
+    assert count == 2
+    assert await repo.query(Driver).count(patronymic="Петрович") == 2
+
+
+@pytest.mark.repo
+@pytest.mark.repo_update_where
+async def test_update_where_cars_dto(init_data, repo):
+    async with repo:
+        cars = await repo.stmt(Car).update_where(
+            {"is_broken": False}, is_broken=True, dto=CarSchema
+        )
+    assert len(cars) == 1
+    assert isinstance(cars[0], CarSchema)
+    assert cars[0].driver_id == init_data["oleg"].id
+    assert cars[0].is_broken is False
+
+
+@pytest.mark.repo
+@pytest.mark.repo_update_where
+async def test_update_where_drivers_join_filter(init_data, repo):
+    async with repo:
+        drivers = await repo.stmt(Driver).update_where(
+            {"patronymic": "Петрович"},
+            join__cars__year__gte=2022,
+            dto=DriverSchema,
+        )
+    assert [driver.id for driver in drivers] == [init_data["ivan"].id]
+    oleg = await repo.query(Driver).get(id=init_data["oleg"].id)
+    assert oleg.patronymic == "Николаевич"
+
+
+@pytest.mark.repo
+@pytest.mark.repo_update_where
+async def test_update_where_drivers_f_expressions_excludes(init_data, repo):
+    async with repo:
+        count = await repo.stmt(Driver).update_where(
+            {"patronymic": "Петрович"},
+            F(last_name="Петров") | F(last_name="Иванов"),
+            excludes={Driver.id: init_data["oleg"].id},
+        )
+    assert count == 1
+    ivan = await repo.query(Driver).get(id=init_data["ivan"].id)
+    assert ivan.patronymic == "Петрович"
+
+
+@pytest.mark.repo
+@pytest.mark.repo_update_where
+async def test_update_where_drivers_no_filters(init_data, repo):
+    with pytest.raises(ValueError):
+        async with repo:
+            await repo.stmt(Driver).update_where({"patronymic": "Петрович"})